@@ -0,0 +1,35 @@
+"""add cached_responses
+
+Revision ID: 8b41e6d0c2f3
+Revises: 3f9c2a1d7b10
+Create Date: 2026-10-18 10:02:37.540961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41e6d0c2f3'
+down_revision: Union[str, None] = '3f9c2a1d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cached_responses',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('response', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index(op.f('ix_cached_responses_expires_at'), 'cached_responses', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cached_responses_expires_at'), table_name='cached_responses')
+    op.drop_table('cached_responses')
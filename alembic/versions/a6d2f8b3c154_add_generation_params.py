@@ -0,0 +1,30 @@
+"""add generation model and params
+
+Revision ID: a6d2f8b3c154
+Revises: f4b7c1e9a052
+Create Date: 2026-10-18 15:02:17.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2f8b3c154'
+down_revision: Union[str, None] = 'f4b7c1e9a052'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('generated_texts', sa.Column('model', sa.String(length=64), nullable=True))
+    op.add_column('generated_texts', sa.Column('params', sa.JSON(), nullable=True))
+    op.add_column('generation_jobs', sa.Column('params', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('generation_jobs', 'params')
+    op.drop_column('generated_texts', 'params')
+    op.drop_column('generated_texts', 'model')
@@ -0,0 +1,26 @@
+"""add cached response model
+
+Revision ID: b2d9e6f1a047
+Revises: f6a1c3d8b274
+Create Date: 2026-10-20 10:26:41.337905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d9e6f1a047'
+down_revision: Union[str, None] = 'f6a1c3d8b274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('cached_responses', sa.Column('model', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('cached_responses', 'model')
@@ -0,0 +1,48 @@
+"""add conversations
+
+Revision ID: b8e4a1d7f263
+Revises: a6d2f8b3c154
+Create Date: 2026-10-18 15:41:09.731820
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4a1d7f263'
+down_revision: Union[str, None] = 'a6d2f8b3c154'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'conversations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=True),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('summary_through_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_conversations_user_id', 'conversations', ['user_id'])
+    op.add_column('generated_texts', sa.Column('conversation_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'generated_texts_conversation_id_fkey', 'generated_texts', 'conversations',
+        ['conversation_id'], ['id'], ondelete='SET NULL',
+    )
+    op.create_index('ix_generated_texts_conversation_id_id', 'generated_texts', ['conversation_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_generated_texts_conversation_id_id', table_name='generated_texts')
+    op.drop_constraint('generated_texts_conversation_id_fkey', 'generated_texts', type_='foreignkey')
+    op.drop_column('generated_texts', 'conversation_id')
+    op.drop_index('ix_conversations_user_id', table_name='conversations')
+    op.drop_table('conversations')
@@ -0,0 +1,47 @@
+"""compress generated text bodies
+
+Revision ID: c1e5b7d9a360
+Revises: d3c7a9e5f418
+Create Date: 2026-10-18 17:02:14.380519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services import body_codec
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1e5b7d9a360'
+down_revision: Union[str, None] = 'd3c7a9e5f418'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rewrite(codec: str, threshold: int) -> None:
+    # Existing rows are re-encoded in id-ordered batches under the given
+    # policy; nothing to do when generating offline SQL.
+    if op.get_context().as_sql:
+        return
+    body_codec.rewrite_bodies(op.get_bind(), codec, threshold)
+
+
+def upgrade() -> None:
+    op.add_column('generated_texts', sa.Column('prompt_blob', sa.LargeBinary(), nullable=True))
+    op.add_column('generated_texts', sa.Column('response_blob', sa.LargeBinary(), nullable=True))
+    op.alter_column('generated_texts', 'prompt', existing_type=sa.Text(), nullable=True)
+    op.alter_column('generated_texts', 'response', existing_type=sa.Text(), nullable=True)
+    # Converts existing rows only when BODY_COMPRESSION is set; rerun with
+    # `alembic downgrade d3c7a9e5f418 && alembic upgrade head` after changing it.
+    if body_codec.codec != 'none':
+        _rewrite(body_codec.codec, body_codec.min_bytes)
+
+
+def downgrade() -> None:
+    _rewrite('none', 0)
+    op.alter_column('generated_texts', 'response', existing_type=sa.Text(), nullable=False)
+    op.alter_column('generated_texts', 'prompt', existing_type=sa.Text(), nullable=False)
+    op.drop_column('generated_texts', 'response_blob')
+    op.drop_column('generated_texts', 'prompt_blob')
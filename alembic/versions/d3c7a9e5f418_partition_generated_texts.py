@@ -0,0 +1,126 @@
+"""partition generated_texts by month
+
+Revision ID: d3c7a9e5f418
+Revises: b8e4a1d7f263
+Create Date: 2026-10-18 16:12:47.508316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3c7a9e5f418'
+down_revision: Union[str, None] = 'b8e4a1d7f263'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = 'id, user_id, prompt, response, "timestamp", model, params, conversation_id'
+
+# Monthly partitions from the oldest row up to three months ahead, named like
+# app.services.partition_maintenance.partition_name(). Later months are
+# created by `python -m app.maintenance partitions`.
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    month date := date_trunc('month', coalesce(
+        (SELECT min("timestamp") FROM generated_texts_unpartitioned), now() AT TIME ZONE 'utc'))::date;
+    last_month date := (date_trunc('month', now() AT TIME ZONE 'utc') + interval '3 months')::date;
+BEGIN
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF generated_texts FOR VALUES FROM (%L) TO (%L)',
+            'generated_texts_p' || to_char(month, 'YYYY_MM'), month, (month + interval '1 month')::date
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+END $$
+"""
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_generated_texts_user_timestamp_id', 'generated_texts', ['user_id', 'timestamp', 'id'])
+    op.create_index('ix_generated_texts_conversation_id_id', 'generated_texts', ['conversation_id', 'id'])
+    op.create_index(
+        'ix_generated_texts_search',
+        'generated_texts',
+        [sa.text("to_tsvector('english'::regconfig, prompt || ' ' || response)")],
+        postgresql_using='gin',
+    )
+    op.create_foreign_key('generated_texts_user_id_fkey', 'generated_texts', 'users', ['user_id'], ['id'])
+    op.create_foreign_key(
+        'generated_texts_conversation_id_fkey', 'generated_texts', 'conversations',
+        ['conversation_id'], ['id'], ondelete='SET NULL',
+    )
+
+
+def upgrade() -> None:
+    # Rewrites the table in one transaction: run it in a maintenance window.
+    # A foreign key cannot reference a partitioned table by id alone, so
+    # generation_jobs.generated_text_id becomes a plain column.
+    op.drop_constraint('generation_jobs_generated_text_id_fkey', 'generation_jobs', type_='foreignkey')
+    op.execute("UPDATE generated_texts SET \"timestamp\" = now() AT TIME ZONE 'utc' WHERE \"timestamp\" IS NULL")
+    op.rename_table('generated_texts', 'generated_texts_unpartitioned')
+    op.execute('ALTER SEQUENCE generated_texts_id_seq OWNED BY NONE')
+    op.execute("""
+        CREATE TABLE generated_texts (
+            id integer NOT NULL DEFAULT nextval('generated_texts_id_seq'),
+            user_id integer NOT NULL,
+            prompt text NOT NULL,
+            response text NOT NULL,
+            "timestamp" timestamp without time zone NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+            model varchar(64),
+            params json,
+            conversation_id integer
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.execute(CREATE_PARTITIONS)
+    # Rows outside every monthly partition land here instead of failing.
+    op.execute('CREATE TABLE generated_texts_default PARTITION OF generated_texts DEFAULT')
+    op.execute(f'INSERT INTO generated_texts ({COLUMNS}) SELECT {COLUMNS} FROM generated_texts_unpartitioned')
+    op.drop_table('generated_texts_unpartitioned')
+    op.execute('ALTER SEQUENCE generated_texts_id_seq OWNED BY generated_texts.id')
+
+    op.create_primary_key('generated_texts_pkey', 'generated_texts', ['id', 'timestamp'])
+    op.create_index('ix_generated_texts_timestamp', 'generated_texts', ['timestamp'])
+    _create_indexes()
+    op.execute('ANALYZE generated_texts')
+
+
+def downgrade() -> None:
+    op.rename_table('generated_texts', 'generated_texts_partitioned')
+    op.execute('ALTER SEQUENCE generated_texts_id_seq OWNED BY NONE')
+    for name in ('ix_generated_texts_user_timestamp_id', 'ix_generated_texts_conversation_id_id',
+                 'ix_generated_texts_search', 'ix_generated_texts_timestamp'):
+        op.drop_index(name, table_name='generated_texts_partitioned')
+    op.drop_constraint('generated_texts_pkey', 'generated_texts_partitioned', type_='primary')
+    op.drop_constraint('generated_texts_user_id_fkey', 'generated_texts_partitioned', type_='foreignkey')
+    op.drop_constraint('generated_texts_conversation_id_fkey', 'generated_texts_partitioned', type_='foreignkey')
+    op.execute("""
+        CREATE TABLE generated_texts (
+            id integer NOT NULL DEFAULT nextval('generated_texts_id_seq'),
+            user_id integer NOT NULL,
+            prompt text NOT NULL,
+            response text NOT NULL,
+            "timestamp" timestamp without time zone,
+            model varchar(64),
+            params json,
+            conversation_id integer,
+            CONSTRAINT generated_texts_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f'INSERT INTO generated_texts ({COLUMNS}) SELECT {COLUMNS} FROM generated_texts_partitioned')
+    op.drop_table('generated_texts_partitioned')
+    op.execute('ALTER SEQUENCE generated_texts_id_seq OWNED BY generated_texts.id')
+    _create_indexes()
+
+    op.execute(
+        'UPDATE generation_jobs SET generated_text_id = NULL WHERE generated_text_id IS NOT NULL '
+        'AND NOT EXISTS (SELECT 1 FROM generated_texts WHERE generated_texts.id = generation_jobs.generated_text_id)'
+    )
+    op.create_foreign_key(
+        'generation_jobs_generated_text_id_fkey', 'generation_jobs', 'generated_texts',
+        ['generated_text_id'], ['id'], ondelete='SET NULL',
+    )
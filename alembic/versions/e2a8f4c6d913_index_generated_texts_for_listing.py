@@ -0,0 +1,44 @@
+"""index generated_texts for listing and search
+
+Revision ID: e2a8f4c6d913
+Revises: c57d9e2a4b81
+Create Date: 2026-10-18 12:41:09.377145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a8f4c6d913'
+down_revision: Union[str, None] = 'c57d9e2a4b81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built CONCURRENTLY so large tables stay writable during the migration.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_generated_texts_user_timestamp_id',
+            'generated_texts',
+            ['user_id', 'timestamp', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_generated_texts_search',
+            'generated_texts',
+            [sa.text("to_tsvector('english'::regconfig, prompt || ' ' || response)")],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_generated_texts_search', table_name='generated_texts', postgresql_concurrently=True)
+        op.drop_index('ix_generated_texts_user_timestamp_id', table_name='generated_texts', postgresql_concurrently=True)
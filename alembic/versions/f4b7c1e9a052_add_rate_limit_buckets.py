@@ -0,0 +1,32 @@
+"""add rate_limit_buckets
+
+Revision ID: f4b7c1e9a052
+Revises: e2a8f4c6d913
+Create Date: 2026-10-18 14:08:55.204671
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b7c1e9a052'
+down_revision: Union[str, None] = 'e2a8f4c6d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'rate_limit_buckets',
+        sa.Column('key', sa.String(length=128), nullable=False),
+        sa.Column('tokens', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rate_limit_buckets')
@@ -0,0 +1,40 @@
+"""coalesce bodies in the search index
+
+Revision ID: f6a1c3d8b274
+Revises: c1e5b7d9a360
+Create Date: 2026-10-19 09:14:52.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a1c3d8b274'
+down_revision: Union[str, None] = 'c1e5b7d9a360'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match app.models._search_vector; a compressed (NULL) body would
+# otherwise make the whole expression NULL and hide the row from search.
+def upgrade() -> None:
+    op.drop_index('ix_generated_texts_search', table_name='generated_texts')
+    op.create_index(
+        'ix_generated_texts_search',
+        'generated_texts',
+        [sa.text("to_tsvector('english'::regconfig, coalesce(prompt, '') || ' ' || coalesce(response, ''))")],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_generated_texts_search', table_name='generated_texts')
+    op.create_index(
+        'ix_generated_texts_search',
+        'generated_texts',
+        [sa.text("to_tsvector('english'::regconfig, prompt || ' ' || response)")],
+        postgresql_using='gin',
+    )
@@ -0,0 +1,52 @@
+import argparse
+import logging
+import sys
+from datetime import datetime
+from app.config import Config
+from app.models import db
+from app.repositories.generated_text_repository import GeneratedTextRepository
+from app.services.text_export import EXPORT_FORMATS, export_chunks, read_rows
+
+logger = logging.getLogger(__name__)
+
+def export_texts(args):
+    repo = GeneratedTextRepository(db.session)
+    rows = repo.iter_rows(user_id=args.user_id, start=args.start, end=args.end, batch_size=Config.EXPORT_BATCH_SIZE)
+    out = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+    try:
+        for chunk in export_chunks(rows, args.format, Config.EXPORT_BATCH_SIZE):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+def import_texts(args):
+    repo = GeneratedTextRepository(db.session)
+    imported = repo.bulk_import(read_rows(args.input, args.format), batch_size=Config.IMPORT_BATCH_SIZE)
+    logger.info("Imported %d generated texts from %s", imported, args.input)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk export and import of generated texts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Stream rows to a file ('-' for stdout).")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    export.add_argument("--user-id", type=int, help="Only this user's rows (default: the whole table)")
+    export.add_argument("--from", dest="start", type=datetime.fromisoformat)
+    export.add_argument("--to", dest="end", type=datetime.fromisoformat)
+    export.add_argument("--output", default="-")
+    export.set_defaults(handler=export_texts)
+
+    load = commands.add_parser("import", help="Append rows from an export file.")
+    load.add_argument("input")
+    load.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    load.set_defaults(handler=import_texts)
+
+    args = parser.parse_args(argv)
+
+    from app.main import create_app
+    with create_app().app_context():
+        args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import gzip
+from flask import request
+from app.config import Config
+
+# Only text bodies are worth compressing; streamed responses (SSE, NDJSON,
+# exports) are left alone so every chunk still reaches the client at once.
+COMPRESSIBLE_TYPES = {"application/json", "text/plain", "text/html"}
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+def _encodings():
+    return ["br", "gzip"] if _brotli() else ["gzip"]
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        # Quality 4 keeps per-response cost close to gzip's for dynamic bodies.
+        return _brotli().compress(data, quality=4)
+    return gzip.compress(data, compresslevel=6)
+
+def compress_response(response, min_bytes: int):
+    if (
+        response.status_code < 200 or response.status_code in (204, 304)
+        or response.direct_passthrough or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_TYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < min_bytes:
+        return response
+    encoding = request.accept_encodings.best_match(_encodings())
+    if encoding is None:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The encoded bytes differ from the ones the strong ETag names.
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_app(app):
+    if not Config.RESPONSE_COMPRESSION_ENABLED:
+        return
+
+    @app.after_request
+    def compress_json_response(response):
+        return compress_response(response, Config.RESPONSE_COMPRESSION_MIN_BYTES)
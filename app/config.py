@@ -3,6 +3,33 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def engine_options(uri: str) -> dict:
+    options = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    if uri.startswith("postgresql"):
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            # Applied per connection, so a runaway query cannot hold a pooled
+            # connection indefinitely.
+            connect_args={"options": f"-c statement_timeout={os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000')}"},
+        )
+    return options
+
+def model_context_windows(spec: str) -> dict:
+    # "model:context_tokens,..." -> {model: context_tokens}
+    windows = {}
+    for item in spec.split(","):
+        name, _, tokens = item.strip().partition(":")
+        if name:
+            windows[name] = int(tokens or DEFAULT_CONTEXT_TOKENS)
+    return windows
+
+DEFAULT_CONTEXT_TOKENS = 8192
+
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
     SQLALCHEMY_DATABASE_URI = (
@@ -13,5 +40,164 @@ class Config:
         f"{os.getenv('POSTGRES_DB', 'test_db')}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # Optional read replica; listing and by-id lookups are routed to it
+    # while writes stay on the primary.
+    SQLALCHEMY_READ_REPLICA_URI = os.getenv("SQLALCHEMY_READ_REPLICA_URI")
+    SQLALCHEMY_BINDS = (
+        {"replica": {"url": SQLALCHEMY_READ_REPLICA_URI, **engine_options(SQLALCHEMY_READ_REPLICA_URI)}}
+        if SQLALCHEMY_READ_REPLICA_URI else {}
+    )
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+    # Models clients may request, with their context windows in tokens;
+    # prompts that do not fit are rejected or truncated before any upstream
+    # call (AI_PROMPT_OVERFLOW "reject" or "truncate").
+    AI_ALLOWED_MODELS = model_context_windows(os.getenv("AI_ALLOWED_MODELS", "gpt-4o-mini:128000,gpt-4o:128000"))
+    AI_DEFAULT_CONTEXT_TOKENS = int(os.getenv("AI_DEFAULT_CONTEXT_TOKENS", str(DEFAULT_CONTEXT_TOKENS)))
+    AI_MAX_TOKENS_LIMIT = int(os.getenv("AI_MAX_TOKENS_LIMIT", "4096"))
+    AI_PROMPT_OVERFLOW = os.getenv("AI_PROMPT_OVERFLOW", "reject")
+
+    # HTTP client shared by all OpenAI calls in a process
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+    OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+    OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "60"))
+    OPENAI_POOL_TIMEOUT = float(os.getenv("OPENAI_POOL_TIMEOUT", "10"))
+    OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+    OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "false").lower() == "true"
+
+    # Provider selection: "openai", "local" (GGUF model on CPU), "stub" (local
+    # echo provider for load tests) or "router" to balance across AI_ROUTER_BACKENDS
+    AI_PROVIDER = os.getenv("AI_PROVIDER", "openai")
+    AI_PROVIDER_ASYNC = os.getenv("AI_PROVIDER_ASYNC", "false").lower() == "true"
+    STUB_PROVIDER_LATENCY = float(os.getenv("STUB_PROVIDER_LATENCY", "0.5"))
+
+    # AI_PROVIDER=local: llama.cpp model file and its inference pool.
+    # LOCAL_MODEL_THREADS is CPU threads per generation (0 = llama.cpp default).
+    LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH", "")
+    LOCAL_MODEL_MAX_TOKENS = int(os.getenv("LOCAL_MODEL_MAX_TOKENS", "256"))
+    LOCAL_MODEL_CONTEXT = int(os.getenv("LOCAL_MODEL_CONTEXT", "2048"))
+    LOCAL_MODEL_THREADS = int(os.getenv("LOCAL_MODEL_THREADS", "0"))
+    LOCAL_MODEL_WORKERS = int(os.getenv("LOCAL_MODEL_WORKERS", "1"))
+    LOCAL_MODEL_MAX_PENDING = int(os.getenv("LOCAL_MODEL_MAX_PENDING", "16"))
+    LOCAL_MODEL_TIMEOUT = float(os.getenv("LOCAL_MODEL_TIMEOUT", "60"))
+
+    # Bounds for the shared async scheduler
+    AI_MAX_IN_FLIGHT = int(os.getenv("AI_MAX_IN_FLIGHT", "64"))
+    AI_MAX_QUEUED = int(os.getenv("AI_MAX_QUEUED", "1024"))
+    AI_QUEUE_TIMEOUT = float(os.getenv("AI_QUEUE_TIMEOUT", "30"))
+
+    # Prompt/response cache; RESPONSE_CACHE_BACKEND "sql" adds a shared table
+    # behind the in-process LRU so all workers share entries.
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # Near-duplicate prompt cache behind the exact-match one. Embedder is
+    # "hashing[:dim]" or "sentence-transformers:<model>"; index is "flat" or
+    # "hnsw" (needs hnswlib, for large caches). Needs numpy. Entries expire
+    # after RESPONSE_CACHE_TTL. SEMANTIC_CACHE_PATH persists the index
+    # across restarts.
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.98"))
+    SEMANTIC_CACHE_EMBEDDER = os.getenv("SEMANTIC_CACHE_EMBEDDER", "hashing:256")
+    SEMANTIC_CACHE_INDEX = os.getenv("SEMANTIC_CACHE_INDEX", "flat")
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
+    SEMANTIC_CACHE_EF_SEARCH = int(os.getenv("SEMANTIC_CACHE_EF_SEARCH", "64"))
+    SEMANTIC_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH", "")
+
+    # Coalesce identical prompts that are in flight at the same time
+    SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+    # POST /generate-text/batch limits
+    BATCH_MAX_PROMPTS = int(os.getenv("BATCH_MAX_PROMPTS", "100"))
+    BATCH_MAX_PARALLEL = int(os.getenv("BATCH_MAX_PARALLEL", "8"))
+
+    # Conversation threads: once the unsummarized turns exceed
+    # CONVERSATION_HISTORY_TOKENS, all but the last CONVERSATION_KEEP_TURNS
+    # are folded into a stored rolling summary.
+    CONVERSATION_HISTORY_TOKENS = int(os.getenv("CONVERSATION_HISTORY_TOKENS", "3000"))
+    CONVERSATION_KEEP_TURNS = int(os.getenv("CONVERSATION_KEEP_TURNS", "4"))
+    CONVERSATION_SUMMARY_MAX_TOKENS = int(os.getenv("CONVERSATION_SUMMARY_MAX_TOKENS", "300"))
+
+    # Opt-in compression of large prompt/response bodies: "none", "zstd",
+    # "lz4" (both optional installs) or "zlib". Applies to rows written from
+    # now on; migration c1e5b7d9a360 converts existing rows.
+    BODY_COMPRESSION = os.getenv("BODY_COMPRESSION", "none")
+    BODY_COMPRESSION_MIN_BYTES = int(os.getenv("BODY_COMPRESSION_MIN_BYTES", "2048"))
+
+    # Bulk export (GET /generated-text/export, python -m app.bulk): rows per
+    # server-side cursor fetch and per Parquet row group; rows per COPY on import.
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "10000"))
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "10000"))
+
+    # generated_texts is partitioned by month; python -m app.maintenance
+    # creates PARTITION_MONTHS_AHEAD future months and archives months older
+    # than RETENTION_MONTHS (0 keeps everything) to ARCHIVE_DIR.
+    PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+    RETENTION_MONTHS = int(os.getenv("RETENTION_MONTHS", "0"))
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+
+    # Async generation jobs (POST /generate-text?mode=async) and the worker
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "2"))
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+    JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+
+    # bcrypt work factor and the process pool that runs it; existing hashes
+    # are upgraded on the next successful login when BCRYPT_ROUNDS changes.
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+    # Cached user profiles for requests whose token lacks the profile claims;
+    # entries are never invalidated, only expire after USER_CACHE_TTL seconds.
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))
+    USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+    # RouterProvider: comma-separated "provider[:model]" backends
+    AI_ROUTER_BACKENDS = [b.strip() for b in os.getenv("AI_ROUTER_BACKENDS", "openai").split(",") if b.strip()]
+    AI_ROUTER_HEDGE = os.getenv("AI_ROUTER_HEDGE", "true").lower() == "true"
+    AI_ROUTER_HEDGE_MIN_DELAY = float(os.getenv("AI_ROUTER_HEDGE_MIN_DELAY", "0.05"))
+    AI_ROUTER_FAILURE_THRESHOLD = int(os.getenv("AI_ROUTER_FAILURE_THRESHOLD", "5"))
+    AI_ROUTER_MAX_ERROR_RATE = float(os.getenv("AI_ROUTER_MAX_ERROR_RATE", "0.5"))
+    AI_ROUTER_COOLDOWN = float(os.getenv("AI_ROUTER_COOLDOWN", "30"))
+
+    # Logging goes through a queue drained by a listener thread; prompts and
+    # responses are cut to LOG_PAYLOAD_MAX_CHARS (0 logs them in full).
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "200"))
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    # GET /metrics and per-stage latency histograms; when disabled the
+    # instrumentation decorators leave functions unwrapped.
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # JSON bodies are encoded with orjson when it is installed ("default"
+    # keeps Flask's encoder). Responses of at least
+    # RESPONSE_COMPRESSION_MIN_BYTES are gzip- or brotli-encoded (brotli
+    # needs the brotli package) as the client's Accept-Encoding allows.
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+    RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() == "true"
+    RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+
+    # Admission control for generation requests; 0 disables a limit.
+    # RATE_LIMIT_BACKEND "sql" shares buckets across worker processes.
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_USER_RPS = float(os.getenv("RATE_LIMIT_USER_RPS", "5"))
+    RATE_LIMIT_USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", "20"))
+    RATE_LIMIT_USER_TPM = float(os.getenv("RATE_LIMIT_USER_TPM", "60000"))
+    RATE_LIMIT_GLOBAL_RPS = float(os.getenv("RATE_LIMIT_GLOBAL_RPS", "50"))
+    RATE_LIMIT_GLOBAL_TPM = float(os.getenv("RATE_LIMIT_GLOBAL_TPM", "1000000"))
+    RATE_LIMIT_COMPLETION_TOKENS = int(os.getenv("RATE_LIMIT_COMPLETION_TOKENS", "256"))
@@ -0,0 +1,49 @@
+import logging
+from flask.json.provider import DefaultJSONProvider
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson. Output matches the default
+    provider's (sorted keys, RFC 822 dates via `default`) apart from
+    non-ASCII characters, which are written as UTF-8 instead of escapes.
+    """
+    def __init__(self, app):
+        super().__init__(app)
+        import orjson
+        self._orjson = orjson
+        # Marshmallow error messages for list items use integer keys.
+        self._options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            # json.dumps options such as indent= have no orjson equivalent.
+            return super().dumps(obj, **kwargs)
+        return self._dumpb(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self._orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self._options
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= self._orjson.OPT_INDENT_2
+        return self._app.response_class(
+            self._dumpb(obj, options | self._orjson.OPT_APPEND_NEWLINE), mimetype=self.mimetype
+        )
+
+    def _dumpb(self, obj, options: int = None) -> bytes:
+        return self._orjson.dumps(obj, default=self.default, option=self._options if options is None else options)
+
+def init_app(app):
+    if Config.JSON_PROVIDER != "orjson":
+        return
+    try:
+        app.json = OrjsonProvider(app)
+    except ImportError:
+        logger.info("orjson is not installed; using Flask's JSON provider")
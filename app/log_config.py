@@ -0,0 +1,124 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+from app.config import Config
+
+# Longest prompt/response excerpt written to the log; 0 logs them in full.
+payload_max_chars = Config.LOG_PAYLOAD_MAX_CHARS
+_listener = None
+_listener_pid = None
+
+class Payload:
+    """
+    Wraps a prompt or response passed as a log argument. The text is only
+    truncated and formatted if the record is actually emitted.
+    """
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        text = "" if self.text is None else str(self.text)
+        if payload_max_chars and len(text) > payload_max_chars:
+            return f"{text[:payload_max_chars]}... [{len(text)} chars]"
+        return text
+
+def payload(text) -> Payload:
+    return Payload(text)
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = g.get("request_id", "-") if has_request_context() else "-"
+        return True
+
+def stop_logging():
+    # Flushes queued records and stops the listener thread.
+    global _listener
+    # A listener inherited through fork has no thread in this process.
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+
+atexit.register(stop_logging)
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Never blocks a request on logging: once the queue is full new records
+    are dropped and counted.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def configure_logging(app=None, stream=None) -> QueueListener:
+    """
+    Routes the root logger through a bounded queue drained by a listener
+    thread, so formatting output and handler I/O happen off request threads.
+    """
+    if Config.LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+    output = logging.StreamHandler(stream)
+    output.setFormatter(formatter)
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+    handler.addFilter(RequestIdFilter())
+
+    global _listener, _listener_pid
+    root = logging.getLogger()
+    if _listener is not None:
+        # create_app() may run more than once per process (tests, the worker),
+        # and forked web workers need a listener thread of their own.
+        stop_logging()
+        for existing in [h for h in root.handlers if isinstance(h, DroppingQueueHandler)]:
+            root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(Config.LOG_LEVEL)
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+
+    if app is not None:
+        app.logger.setLevel(Config.LOG_LEVEL)
+        _init_request_ids(app)
+    return _listener
+
+def _init_request_ids(app):
+    @app.before_request
+    def assign_request_id():
+        # Honour an id set by the proxy so one request can be followed
+        # across services.
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+
+    @app.after_request
+    def return_request_id(response):
+        if "request_id" in g:
+            response.headers["X-Request-ID"] = g.request_id
+        return response
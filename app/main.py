@@ -1,27 +1,38 @@
-import logging
+import os
 from flask import Flask, jsonify
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
+from app import compression, json_provider, metrics
 from app.config import Config
-from app.models import db
+from app.log_config import configure_logging
+from app.models import db, replica_session
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    logging.basicConfig(level=logging.INFO)
-    app.logger.setLevel(logging.INFO)
-
+    configure_logging(app)
+    json_provider.init_app(app)
 
     db.init_app(app)
+    app.teardown_appcontext(lambda exc: replica_session.remove())
     jwt = JWTManager(app)
+    metrics.init_app(app)
+    compression.init_app(app)
 
     # Importing the separate blueprints
-    from app.routes import auth_blueprint, user_blueprint, generate_text_blueprint
+    from app.routes import (
+        auth_blueprint, user_blueprint, generate_text_blueprint, jobs_blueprint, metrics_blueprint,
+        conversations_blueprint,
+    )
 
     app.register_blueprint(auth_blueprint, url_prefix="/auth")
     app.register_blueprint(user_blueprint, url_prefix="/user")
     app.register_blueprint(generate_text_blueprint)  # route definitions already contain /generate-text
+    app.register_blueprint(jobs_blueprint, url_prefix="/jobs")
+    app.register_blueprint(conversations_blueprint, url_prefix="/conversations")
+    if metrics.enabled:
+        app.register_blueprint(metrics_blueprint)
 
     @app.errorhandler(Exception)
     def handle_exception(e):
@@ -32,4 +43,5 @@ def create_app():
 
 if __name__ == "__main__":
     app = create_app()
-    app.run(host="0.0.0.0", port=5001, debug=True)
+    # Development server only; production runs gunicorn (see gunicorn.conf.py).
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5000")), debug=os.getenv("FLASK_DEBUG", "true").lower() == "true")
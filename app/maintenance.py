@@ -0,0 +1,31 @@
+import argparse
+import logging
+from app.config import Config
+from app.models import db
+from app.repositories.cached_response_repository import CachedResponseRepository
+from app.services.partition_maintenance import PartitionMaintenance
+
+logger = logging.getLogger(__name__)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Partition maintenance for generated_texts and cleanup of expired cache entries; run daily from cron."
+    )
+    parser.add_argument("--months-ahead", type=int, default=Config.PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--retention-months", type=int, default=Config.RETENTION_MONTHS,
+                        help="Archive and drop months older than this (0 keeps everything)")
+    parser.add_argument("--archive-dir", default=Config.ARCHIVE_DIR)
+    args = parser.parse_args(argv)
+
+    from app.main import create_app
+    with create_app().app_context():
+        maintenance = PartitionMaintenance(db.session)
+        maintenance.create_ahead(args.months_ahead)
+        if args.retention_months > 0:
+            maintenance.apply_retention(args.retention_months, args.archive_dir)
+        # Expired entries are never read, but nothing else removes them.
+        purged = CachedResponseRepository(db.session).purge_expired()
+        logger.info("Purged %d expired cached responses", purged)
+
+if __name__ == "__main__":
+    main()
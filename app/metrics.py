@@ -0,0 +1,204 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Dict, Iterable, Tuple
+from flask import current_app, g, request
+from flask_jwt_extended import jwt_required, verify_jwt_in_request
+from app.config import Config
+
+# Prometheus' default latency buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_INF_BUCKET = 'le="+Inf"'
+
+def _format_labels(labelnames, labelvalues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for labelvalues, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labelvalues -> [per-bucket counts, sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def count(self, *labelvalues) -> int:
+        series = self._series.get(labelvalues)
+        return series[2] if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items()]
+        for labelvalues, (counts, total, count) in series:
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {bucket_count}"
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, _INF_BUCKET)} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labelvalues)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labelvalues)} {count}"
+
+class CallbackMetric:
+    """
+    A value read at scrape time from state kept elsewhere (pools, caches);
+    `collect` returns {labelvalues: value}.
+    """
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...],
+                 collect: Callable[[], Dict[tuple, float]], metric_type: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.collect = collect
+        self.metric_type = metric_type
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.metric_type}"
+        for labelvalues, value in self.collect().items():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Metrics are per process; scrape every worker (or run one) to see totals.
+enabled = Config.METRICS_ENABLED
+registry = Registry()
+
+request_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "endpoint", "status"),
+))
+stage_latency = registry.register(Histogram(
+    "generation_stage_duration_seconds", "Latency of each generation pipeline stage.", ("stage",),
+))
+provider_errors = registry.register(Counter(
+    "ai_provider_errors_total", "Failed AI provider calls.", ("model",),
+))
+tokens_used = registry.register(Counter(
+    "ai_tokens_total", "Tokens reported by the upstream usage field.", ("model", "kind"),
+))
+
+def stage_timer(stage: str):
+    if not enabled:
+        return nullcontext()
+    return stage_latency.time(stage)
+
+def timed(stage: str):
+    """
+    Records the decorated function's latency under `stage`. With metrics
+    disabled the function is returned unwrapped.
+    """
+    def decorator(fn):
+        if not enabled:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_latency.time(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_usage(model: str, prompt_tokens: int, completion_tokens: int):
+    if enabled:
+        tokens_used.inc(model, "prompt", amount=prompt_tokens or 0)
+        tokens_used.inc(model, "completion", amount=completion_tokens or 0)
+
+def timed_jwt_required(**options):
+    """
+    jwt_required() that also records token verification as the
+    "jwt_decode" stage.
+    """
+    if not enabled:
+        return jwt_required(**options)
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_latency.time("jwt_decode"):
+                verify_jwt_in_request(**options)
+            return current_app.ensure_sync(fn)(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def init_app(app):
+    if not enabled:
+        return
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            # The route template keeps label cardinality bounded.
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            request_latency.observe(time.perf_counter() - started, request.method, endpoint, response.status_code)
+        return response
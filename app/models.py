@@ -1,9 +1,36 @@
 from flask_sqlalchemy import SQLAlchemy
-from passlib.hash import bcrypt
+from flask_sqlalchemy.session import Session
+from sqlalchemy import func, literal_column
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred, scoped_session, sessionmaker
+from flask.globals import app_ctx
+from app.config import Config
+from app.services import body_codec
+from app.services.password_hasher import password_hasher
 from datetime import datetime
 
 db = SQLAlchemy()
 
+class ReplicaSession(Session):
+    """
+    Session whose queries all go to the "replica" bind, falling back to the
+    primary engine when no replica is configured. Used for reads only.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return bind
+        engines = self._db.engines
+        return engines.get("replica", engines[None])
+
+def _app_ctx_id() -> int:
+    return id(app_ctx._get_current_object())
+
+replica_session = scoped_session(sessionmaker(class_=ReplicaSession, db=db), scopefunc=_app_ctx_id)
+
+# Session for read-only repository queries: without a replica there is no
+# point checking out a second connection per request.
+read_session = replica_session if Config.SQLALCHEMY_READ_REPLICA_URI else db.session
+
 class User(db.Model):
     __tablename__ = "users"
 
@@ -15,16 +42,141 @@ class User(db.Model):
     generated_texts = db.relationship("GeneratedText", backref="user", lazy=True)
 
     def set_password(self, password):
-        self.password_hash = bcrypt.hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return bcrypt.verify(password, self.password_hash)
+        return password_hasher.verify(password, self.password_hash)
+
+def _search_vector(prompt, response):
+    # The search index and the search queries must build exactly the same
+    # expression, otherwise Postgres will not use the index. A compressed
+    # body is NULL here; coalesce keeps the other column searchable.
+    return func.to_tsvector(
+        literal_column("'english'::regconfig"),
+        func.coalesce(prompt, literal_column("''")) + literal_column("' '") + func.coalesce(response, literal_column("''")),
+    )
 
 class GeneratedText(db.Model):
     __tablename__ = "generated_texts"
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    prompt = db.Column(db.Text, nullable=False)
+    # Bodies at or above BODY_COMPRESSION_MIN_BYTES are stored compressed in
+    # the *_blob column with the text column NULL (see body_codec). All four
+    # are deferred: metadata-only loads such as ownership checks skip them,
+    # and the first access loads the group in one query.
+    _prompt = deferred(db.Column("prompt", db.Text), group="body")
+    _response = deferred(db.Column("response", db.Text), group="body")
+    prompt_blob = deferred(db.Column(db.LargeBinary), group="body")
+    response_blob = deferred(db.Column(db.LargeBinary), group="body")
+    # Partition key: migration d3c7a9e5f418 turns the table into monthly
+    # range partitions with primary key (id, timestamp). The model keeps id
+    # alone so create_all() still builds a plain table for tests.
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Model and generation parameters the response was produced with.
+    model = db.Column(db.String(64))
+    params = db.Column(db.JSON)
+    # Set for turns of a conversation thread.
+    conversation_id = db.Column(db.Integer, db.ForeignKey("conversations.id", ondelete="SET NULL"))
+
+    __table_args__ = (
+        # Serves per-user history listing with keyset pagination.
+        db.Index("ix_generated_texts_user_timestamp_id", "user_id", "timestamp", "id"),
+        db.Index("ix_generated_texts_conversation_id_id", "conversation_id", "id"),
+        db.Index("ix_generated_texts_timestamp", "timestamp"),
+        # Compressed bodies are NULL in the text columns and so not searchable
+        # (see README "Compressed Bodies").
+        db.Index(
+            "ix_generated_texts_search",
+            _search_vector(_prompt.columns[0], _response.columns[0]),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    @hybrid_property
+    def prompt(self) -> str:
+        return body_codec.decode_body(self._prompt, self.prompt_blob)
+
+    @prompt.setter
+    def prompt(self, value: str):
+        self._prompt, self.prompt_blob = body_codec.encode_body(value)
+
+    @prompt.expression
+    def prompt(cls):
+        return cls._prompt
+
+    @hybrid_property
+    def response(self) -> str:
+        return body_codec.decode_body(self._response, self.response_blob)
+
+    @response.setter
+    def response(self, value: str):
+        self._response, self.response_blob = body_codec.encode_body(value)
+
+    @response.expression
+    def response(cls):
+        return cls._response
+
+def text_search_vector():
+    return _search_vector(GeneratedText.prompt, GeneratedText.response)
+
+class Conversation(db.Model):
+    __tablename__ = "conversations"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    title = db.Column(db.String(200))
+    # Rolling summary of every turn up to and including summary_through_id;
+    # only later turns are sent verbatim.
+    summary = db.Column(db.Text)
+    summary_through_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CachedResponse(db.Model):
+    __tablename__ = "cached_responses"
+
+    key = db.Column(db.String(64), primary_key=True)
     response = db.Column(db.Text, nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    model = db.Column(db.String(64))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class GenerationJob(db.Model):
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        db.Index("ix_generation_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    prompt = db.Column(db.Text, nullable=False)
+    use_cache = db.Column(db.Boolean, nullable=False, default=True)
+    params = db.Column(db.JSON)
+    # queued -> running -> succeeded | failed; failed attempts go back to queued
+    # until max_attempts is reached.
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    # Earliest time the job may be claimed: the retry backoff while queued,
+    # the lease expiry while running.
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    # Not a foreign key: a partitioned table can only be referenced by its
+    # full primary key (id, timestamp).
+    generated_text_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    generated_text = db.relationship(
+        "GeneratedText",
+        primaryjoin="foreign(GenerationJob.generated_text_id) == GeneratedText.id",
+        viewonly=True,
+    )
+
+class RateLimitBucket(db.Model):
+    __tablename__ = "rate_limit_buckets"
+
+    key = db.Column(db.String(128), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)
@@ -0,0 +1,15 @@
+from typing import Dict, List
+from app.providers.base_ai_provider import flatten_messages
+
+class AsyncBaseAIProvider:
+    model = "default"
+
+    async def generate_text(self, prompt: str, **params) -> str:
+        """
+        Coroutine to generate text from a prompt.
+        Subclasses should override this.
+        """
+        raise NotImplementedError("Subclasses must implement generate_text()")
+
+    async def generate_chat(self, messages: List[Dict[str, str]], **params) -> str:
+        return await self.generate_text(flatten_messages(messages), **params)
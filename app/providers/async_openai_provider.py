@@ -0,0 +1,47 @@
+import logging
+from typing import Dict, List
+from openai import AsyncOpenAI
+from app import metrics
+from app.config import Config
+from app.log_config import payload
+from app.providers.async_base_ai_provider import AsyncBaseAIProvider
+from app.providers.openai_client import create_async_client
+
+logger = logging.getLogger(__name__)
+
+class AsyncOpenAIProvider(AsyncBaseAIProvider):
+    def __init__(self, model: str = None):
+        # The async client must be created lazily: it binds its connection
+        # pool to the event loop that first uses it.
+        self._client = None
+        self.model = model or Config.OPENAI_MODEL
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = create_async_client()
+        return self._client
+
+    async def generate_text(self, prompt: str, **params) -> str:
+        return await self.generate_chat([{"role": "user", "content": prompt}], **params)
+
+    async def generate_chat(self, messages: List[Dict[str, str]], **params) -> str:
+        logger.info("Received prompt: %s", payload(messages[-1]["content"]))
+        model = params.pop("model", None) or self.model
+        try:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                **params,
+            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Raw API response: %s", payload(response.model_dump_json()))
+            if response.usage is not None:
+                metrics.record_usage(model, response.usage.prompt_tokens, response.usage.completion_tokens)
+
+            result = response.choices[0].message.content.strip()
+            logger.info("Generated text: %s", payload(result))
+            return result
+        except Exception as e:
+            logger.exception("Error during text generation")
+            raise e
@@ -1,7 +1,56 @@
+from typing import Dict, Iterator, List, Union
+
+def flatten_messages(messages: List[Dict[str, str]]) -> str:
+    # Plain-completion fallback for providers without a chat format.
+    return "\n\n".join(f"{m['role']}: {m['content']}" for m in messages)
+
 class BaseAIProvider:
-    def generate_text(self, prompt: str) -> str:
+    # Identifies the upstream model; part of the response cache key.
+    model = "default"
+    # Context window in tokens when the provider knows it (a local model's
+    # n_ctx); otherwise AI_ALLOWED_MODELS / AI_DEFAULT_CONTEXT_TOKENS apply.
+    context_window = None
+
+    def answered_model(self) -> str:
         """
-        Method to generate text from a prompt.
+        Model that produced this thread's most recent result. Plain providers
+        report `model`; a router reports the backend that answered.
+        """
+        return self.model
+
+    def generate_text(self, prompt: str, **params) -> str:
+        """
+        Method to generate text from a prompt. `params` are optional
+        generation parameters (model, max_tokens, temperature, stop).
         Subclasses should override this.
         """
         raise NotImplementedError("Subclasses must implement generate_text()")
+
+    def stream_text(self, prompt: str, **params) -> Iterator[str]:
+        """
+        Method to stream generated text as a sequence of deltas.
+        Providers without native streaming yield the full text once.
+        """
+        yield self.generate_text(prompt, **params)
+
+    def generate_chat(self, messages: List[Dict[str, str]], **params) -> str:
+        """
+        Method to generate the next assistant turn for a list of
+        {"role", "content"} messages. Providers without a chat format
+        send the messages as one flattened prompt.
+        """
+        return self.generate_text(flatten_messages(messages), **params)
+
+    def generate_batch(self, prompts: List[str], **params) -> List[Union[str, Exception]]:
+        """
+        Method to generate text for several prompts in one call, returning a
+        result or the exception raised for each prompt, in order.
+        Providers without batch inference run the prompts one by one.
+        """
+        results = []
+        for prompt in prompts:
+            try:
+                results.append(self.generate_text(prompt, **params))
+            except Exception as e:
+                results.append(e)
+        return results
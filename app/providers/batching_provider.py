@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Iterator
+from app.providers.base_ai_provider import BaseAIProvider
+
+logger = logging.getLogger(__name__)
+
+class BatchQueueFull(Exception):
+    pass
+
+class BatchingProvider(BaseAIProvider):
+    """
+    Collects concurrent generate_text calls and hands them to the wrapped
+    provider's generate_batch as one batch. A batch is dispatched once it
+    holds `max_batch_size` prompts or `max_wait` seconds after its first
+    prompt arrived; each caller gets its own result or exception back.
+    Prompts with different generation parameters go to the provider as
+    separate generate_batch calls. Only worth wrapping a provider whose
+    generate_batch decodes the prompts together in one multi-sequence pass;
+    none of the bundled providers does, so the app does not wire it in.
+    """
+    def __init__(self, provider: BaseAIProvider, max_batch_size: int = 8, max_wait: float = 0.01,
+                 max_queued: int = 256, timeout: float = 60.0):
+        self.provider = provider
+        self.model = provider.model
+        self.context_window = provider.context_window
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._pid = None
+        self.batches = 0
+        self.batched_prompts = 0
+        self.last_batch_size = 0
+        self.total_wait = 0.0
+
+    def generate_text(self, prompt: str, **params) -> str:
+        self._ensure_dispatcher()
+        future = Future()
+        try:
+            self._queue.put_nowait((prompt, params, future, time.monotonic()))
+        except queue.Full:
+            raise BatchQueueFull("Too many generations waiting for a batch")
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A still-queued prompt is dropped from its batch.
+            future.cancel()
+            raise BatchQueueFull("Timed out waiting for a batch")
+
+    def generate_batch(self, prompts, **params):
+        return self.provider.generate_batch(prompts, **params)
+
+    def generate_chat(self, messages, **params) -> str:
+        # Multi-turn prompts differ per conversation and are not batched.
+        return self.provider.generate_chat(messages, **params)
+
+    def stream_text(self, prompt: str, **params) -> Iterator[str]:
+        # Streams are not batched.
+        return self.provider.stream_text(prompt, **params)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "batched_prompts": self.batched_prompts,
+            "last_batch_size": self.last_batch_size,
+            "avg_batch_size": self.batched_prompts / self.batches if self.batches else 0.0,
+            "avg_wait": self.total_wait / self.batched_prompts if self.batched_prompts else 0.0,
+            "queue_depth": self._queue.qsize(),
+        }
+
+    def _ensure_dispatcher(self):
+        # The dispatcher thread does not survive a fork, so each worker
+        # process starts its own on first use.
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._pid = os.getpid()
+                threading.Thread(target=self._dispatch_forever, name="batching-provider", daemon=True).start()
+
+    def _dispatch_forever(self):
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            deadline = batch[0][3] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                # Under backlog the deadline has long passed; prompts that
+                # are already queued still join the batch.
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(pending.get(timeout=timeout) if timeout > 0 else pending.get_nowait())
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        # Callers that timed out before dispatch cancelled their futures.
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.monotonic()
+        self.batches += 1
+        self.batched_prompts += len(batch)
+        self.last_batch_size = len(batch)
+        self.total_wait += sum(started - enqueued for _, _, _, enqueued in batch)
+
+        groups = {}
+        for item in batch:
+            groups.setdefault(json.dumps(item[1], sort_keys=True, default=str), []).append(item)
+        for group in groups.values():
+            params = group[0][1]
+            try:
+                results = self.provider.generate_batch([prompt for prompt, _, _, _ in group], **params)
+            except Exception as e:
+                logger.warning("Batch of %d prompts failed: %s", len(group), e)
+                results = [e] * len(group)
+            if len(results) < len(group):
+                # Every caller must be answered, or it waits until its timeout.
+                missing = RuntimeError(f"Batch returned {len(results)} results for {len(group)} prompts")
+                results = list(results) + [missing] * (len(group) - len(results))
+
+            for (_, _, future, _), result in zip(group, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -0,0 +1,136 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Union
+from app import metrics
+from app.providers.base_ai_provider import BaseAIProvider
+
+logger = logging.getLogger(__name__)
+
+class LocalModelOverloaded(Exception):
+    pass
+
+def load_llama(model_path: str, n_ctx: int, n_threads: int):
+    try:
+        from llama_cpp import Llama
+    except ImportError:
+        raise RuntimeError("AI_PROVIDER=local requires the llama-cpp-python package")
+    # use_mmap maps the GGUF weights read-only, so every worker process on
+    # the host shares one copy through the page cache.
+    return Llama(
+        model_path=model_path,
+        n_ctx=n_ctx,
+        n_threads=n_threads or None,
+        use_mmap=True,
+        verbose=False,
+    )
+
+class LocalModelProvider(BaseAIProvider):
+    """
+    Runs a small GGUF model on CPU through llama.cpp. Inference happens on a
+    bounded thread pool; each inference thread owns one model context because
+    llama.cpp contexts are not thread-safe. Once `max_pending` generations are
+    queued, new ones are rejected with LocalModelOverloaded.
+    """
+    def __init__(self, model_path: str, max_tokens: int = 256, n_ctx: int = 2048, n_threads: int = 0,
+                 workers: int = 1, max_pending: int = 16, timeout: float = 60.0, loader=load_llama):
+        if not model_path:
+            raise ValueError("LOCAL_MODEL_PATH must be set for the local provider")
+        self.model = "local:" + os.path.basename(model_path)
+        self.model_path = model_path
+        self.max_tokens = max_tokens
+        self.n_ctx = n_ctx
+        self.context_window = n_ctx
+        self.n_threads = n_threads
+        self.workers = workers
+        self.timeout = timeout
+        self.loader = loader
+        self._pending = threading.BoundedSemaphore(max_pending) if max_pending else None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pool = None
+        self._pid = None
+
+    def generate_text(self, prompt: str, **params) -> str:
+        return self.generate_chat([{"role": "user", "content": prompt}], **params)
+
+    def generate_chat(self, messages: List[Dict[str, str]], **params) -> str:
+        future = self._submit(messages, params)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise LocalModelOverloaded("Local generation timed out")
+
+    def generate_batch(self, prompts: List[str], **params) -> List[Union[str, Exception]]:
+        # llama-cpp-python's Llama runs one sequence per context, so a batch
+        # is spread across the inference threads instead of one forward pass.
+        # Every prompt takes its own pending slot, and the whole batch shares
+        # one timeout.
+        futures = []
+        for prompt in prompts:
+            try:
+                futures.append(self._submit([{"role": "user", "content": prompt}], params))
+            except LocalModelOverloaded as e:
+                futures.append(e)
+        deadline = time.monotonic() + self.timeout
+        results = []
+        for future in futures:
+            if isinstance(future, Exception):
+                results.append(future)
+                continue
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                future.cancel()
+                results.append(LocalModelOverloaded("Local generation timed out"))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _submit(self, messages: List[Dict[str, str]], params: dict) -> Future:
+        # The slot is held until the inference itself finishes (or is
+        # cancelled before it starts), not just until the caller stops waiting.
+        if self._pending is not None and not self._pending.acquire(blocking=False):
+            raise LocalModelOverloaded("Too many local generations in progress")
+        try:
+            future = self._executor().submit(self._infer, messages, params)
+        except BaseException:
+            if self._pending is not None:
+                self._pending.release()
+            raise
+        if self._pending is not None:
+            future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def _infer(self, messages: List[Dict[str, str]], params: dict) -> str:
+        llm = self._model()
+        # There is one local model, so a requested model name is ignored.
+        response = llm.create_chat_completion(
+            messages=messages,
+            max_tokens=min(params.get("max_tokens") or self.max_tokens, self.max_tokens),
+            temperature=params.get("temperature", 0.8),
+            stop=params.get("stop"),
+        )
+        usage = response.get("usage") or {}
+        metrics.record_usage(self.model, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        return response["choices"][0]["message"]["content"].strip()
+
+    def _model(self):
+        llm = getattr(self._local, "llm", None)
+        if llm is None:
+            logger.info("Loading local model %s", self.model_path)
+            llm = self._local.llm = self.loader(self.model_path, self.n_ctx, self.n_threads)
+        return llm
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # Pool threads (and the contexts they own) do not survive a fork, so
+        # each worker process builds its own on first use.
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="local-model")
+                self._local = threading.local()
+                self._pid = os.getpid()
+            return self._pool
@@ -0,0 +1,56 @@
+import os
+import threading
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from app.config import Config
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        Config.OPENAI_READ_TIMEOUT,
+        connect=Config.OPENAI_CONNECT_TIMEOUT,
+        pool=Config.OPENAI_POOL_TIMEOUT,
+    )
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=Config.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=Config.OPENAI_KEEPALIVE_EXPIRY,
+    )
+
+def create_client() -> OpenAI:
+    # Retries use the SDK's exponential backoff with jitter and honour the
+    # upstream's Retry-After.
+    return OpenAI(
+        api_key=Config.OPENAI_API_KEY,
+        base_url=Config.OPENAI_BASE_URL or None,
+        max_retries=Config.OPENAI_MAX_RETRIES,
+        timeout=_timeout(),
+        http_client=httpx.Client(limits=_limits(), timeout=_timeout(), http2=Config.OPENAI_HTTP2),
+    )
+
+def create_async_client() -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key=Config.OPENAI_API_KEY,
+        base_url=Config.OPENAI_BASE_URL or None,
+        max_retries=Config.OPENAI_MAX_RETRIES,
+        timeout=_timeout(),
+        http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout(), http2=Config.OPENAI_HTTP2),
+    )
+
+def shared_client() -> OpenAI:
+    """
+    One OpenAI client, and so one keep-alive connection pool, per process.
+    httpx.Client is thread-safe; sockets inherited through fork are not, so
+    a forked worker builds its own client on first use.
+    """
+    global _client, _client_pid
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = create_client()
+            _client_pid = os.getpid()
+        return _client
@@ -1,26 +1,61 @@
 import logging
-from openai import OpenAI
+from typing import Dict, Iterator, List
+from app import metrics
 from app.config import Config
+from app.log_config import payload
 from app.providers.base_ai_provider import BaseAIProvider
+from app.providers.openai_client import shared_client
 
 logger = logging.getLogger(__name__)
 
 class OpenAIProvider(BaseAIProvider):
-    def __init__(self):
-        self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+    def __init__(self, model: str = None):
+        self.model = model or Config.OPENAI_MODEL
+
+    @property
+    def client(self):
+        return shared_client()
     
-    def generate_text(self, prompt: str) -> str:
-        logger.info("Received prompt: %s", prompt)
+    def generate_text(self, prompt: str, **params) -> str:
+        return self.generate_chat([{"role": "user", "content": prompt}], **params)
+
+    def generate_chat(self, messages: List[Dict[str, str]], **params) -> str:
+        logger.info("Received prompt: %s", payload(messages[-1]["content"]))
+        model = params.pop("model", None) or self.model
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
+                model=model,
+                messages=messages,
+                **params,
             )
-            logger.debug("Raw API response: %s", response)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Raw API response: %s", payload(response.model_dump_json()))
+            if response.usage is not None:
+                metrics.record_usage(model, response.usage.prompt_tokens, response.usage.completion_tokens)
             
             result = response.choices[0].message.content.strip()
-            logger.info("Generated text: %s", result)
+            logger.info("Generated text: %s", payload(result))
             return result
         except Exception as e:
             logger.exception("Error during text generation")
             raise e
+
+    def stream_text(self, prompt: str, **params) -> Iterator[str]:
+        logger.info("Received prompt for streaming: %s", payload(prompt))
+        model = params.pop("model", None) or self.model
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                **params,
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except Exception as e:
+            logger.exception("Error during streamed text generation")
+            raise e
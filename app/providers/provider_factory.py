@@ -0,0 +1,54 @@
+from app.config import Config
+from app.providers.base_ai_provider import BaseAIProvider
+from app.providers.router_provider import RouterProvider
+from app.providers.scheduled_provider import ScheduledProvider
+from app.providers.stub_provider import StubProvider, AsyncStubProvider
+from app.services.generation_scheduler import GenerationScheduler
+
+scheduler = GenerationScheduler(
+    max_in_flight=Config.AI_MAX_IN_FLIGHT,
+    max_queued=Config.AI_MAX_QUEUED,
+    queue_timeout=Config.AI_QUEUE_TIMEOUT,
+)
+
+def create_provider() -> BaseAIProvider:
+    if Config.AI_PROVIDER == "router":
+        return RouterProvider(
+            {spec: _create_backend(spec) for spec in Config.AI_ROUTER_BACKENDS},
+            hedge=Config.AI_ROUTER_HEDGE,
+            hedge_min_delay=Config.AI_ROUTER_HEDGE_MIN_DELAY,
+            failure_threshold=Config.AI_ROUTER_FAILURE_THRESHOLD,
+            max_error_rate=Config.AI_ROUTER_MAX_ERROR_RATE,
+            cooldown=Config.AI_ROUTER_COOLDOWN,
+        )
+    return _create_backend(Config.AI_PROVIDER)
+
+def _create_backend(spec: str) -> BaseAIProvider:
+    # spec is "provider" or "provider:model", e.g. "openai:gpt-4o-mini"
+    name, _, model = spec.partition(":")
+    model = model or None
+    if name == "local":
+        # CPU inference is bounded by its own thread pool, not the async scheduler.
+        from app.providers.local_model_provider import LocalModelProvider
+        return LocalModelProvider(
+            model or Config.LOCAL_MODEL_PATH,
+            max_tokens=Config.LOCAL_MODEL_MAX_TOKENS,
+            n_ctx=Config.LOCAL_MODEL_CONTEXT,
+            n_threads=Config.LOCAL_MODEL_THREADS,
+            workers=Config.LOCAL_MODEL_WORKERS,
+            max_pending=Config.LOCAL_MODEL_MAX_PENDING,
+            timeout=Config.LOCAL_MODEL_TIMEOUT,
+        )
+    if Config.AI_PROVIDER_ASYNC:
+        if name == "openai":
+            from app.providers.async_openai_provider import AsyncOpenAIProvider
+            return ScheduledProvider(AsyncOpenAIProvider(model), scheduler)
+        if name == "stub":
+            return ScheduledProvider(AsyncStubProvider(Config.STUB_PROVIDER_LATENCY), scheduler)
+    else:
+        if name == "openai":
+            from app.providers.openai_provider import OpenAIProvider
+            return OpenAIProvider(model)
+        if name == "stub":
+            return StubProvider(Config.STUB_PROVIDER_LATENCY)
+    raise ValueError(f"Unknown AI provider: {name}")
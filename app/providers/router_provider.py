@@ -0,0 +1,260 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from app.providers.base_ai_provider import BaseAIProvider
+
+logger = logging.getLogger(__name__)
+
+class NoHealthyBackend(Exception):
+    pass
+
+class Backend:
+    """
+    A routed provider plus its rolling latency/error window and circuit
+    breaker state (closed -> open after failures -> half-open after the
+    cooldown, closed again on the next success). While half-open, one trial
+    request at a time is let through.
+    """
+    def __init__(self, name: str, provider: BaseAIProvider, window: int):
+        self.name = name
+        self.provider = provider
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.latencies.append(latency)
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            self.probing = False
+
+    def claim_probe(self) -> bool:
+        with self._lock:
+            if self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def release_probe(self):
+        with self._lock:
+            self.probing = False
+
+    def percentile(self, p: float) -> float:
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+    def error_rate(self) -> float:
+        with self._lock:
+            outcomes = list(self.outcomes)
+        if not outcomes:
+            return 0.0
+        return outcomes.count(False) / len(outcomes)
+
+class RouterProvider(BaseAIProvider):
+    """
+    Routes each request to the fastest healthy backend by rolling median
+    latency. If the chosen backend has not answered within its p95 latency,
+    a hedged duplicate goes to the next backend and the first success wins.
+    Failed calls fail over to the remaining backends, and backends that keep
+    failing are taken out of rotation by a circuit breaker. Streams are
+    routed the same way up to their first chunk; after that they are
+    committed to the backend that sent it.
+    """
+    def __init__(self, providers: Dict[str, BaseAIProvider], hedge: bool = True,
+                 hedge_min_delay: float = 0.05, min_samples: int = 20, window: int = 100,
+                 failure_threshold: int = 5, max_error_rate: float = 0.5, cooldown: float = 30.0):
+        self.backends = [Backend(name, provider, window) for name, provider in providers.items()]
+        # Nominal name for cache keys; answered_model() reports the backend
+        # model that actually produced a result.
+        self.model = "router"
+        self._answered = threading.local()
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.hedges = 0
+        self._pool = ThreadPoolExecutor(max_workers=max(4, 4 * len(self.backends)), thread_name_prefix="router")
+
+    def generate_text(self, prompt: str, **params) -> str:
+        return self._route(lambda provider: provider.generate_text(prompt, **params))
+
+    def generate_chat(self, messages: List[Dict[str, str]], **params) -> str:
+        return self._route(lambda provider: provider.generate_chat(messages, **params))
+
+    def stream_text(self, prompt: str, **params) -> Iterator[str]:
+        backend, (start, first, chunks) = self._race(
+            lambda backend: self._open_stream(backend, prompt, params), discard=self._close_stream,
+        )
+        return self._relay(backend, start, first, chunks)
+
+    def answered_model(self) -> str:
+        return getattr(self._answered, "model", None) or self.model
+
+    def _route(self, request: Callable[[BaseAIProvider], str]) -> str:
+        return self._race(lambda backend: self._call(backend, request))[1]
+
+    def _race(self, call: Callable[[Backend], Any], discard: Callable = None) -> Tuple[Backend, Any]:
+        """
+        Runs `call` on the best backend, hedging and failing over as needed,
+        and returns the first backend to succeed with its result. `discard`
+        receives (future, backend) for every other call once it finishes.
+        """
+        remaining = self._candidates()
+        pending = {}
+        def launch() -> bool:
+            while remaining:
+                backend = remaining.pop(0)
+                if self._state(backend) == "half_open" and not backend.claim_probe():
+                    continue
+                pending[self._pool.submit(call, backend)] = backend
+                return True
+            return False
+
+        if not launch():
+            raise NoHealthyBackend("All AI backends are unavailable")
+        primary = next(iter(pending.values()))
+        can_hedge = self.hedge and bool(remaining)
+        error = None
+        while pending:
+            timeout = self._hedge_delay(primary) if can_hedge else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # The primary is slower than usual: race a duplicate against it.
+                can_hedge = False
+                self.hedges += 1
+                launch()
+                continue
+
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning("AI backend %s failed: %s", backend.name, e)
+                    error = e
+                    continue
+                if discard is not None:
+                    # Runs at once for calls that have already finished.
+                    for loser, loser_backend in pending.items():
+                        loser.add_done_callback(lambda f, b=loser_backend: discard(f, b))
+                self._answered.model = backend.provider.model
+                return backend, result
+            can_hedge = False
+            if not pending:
+                launch()
+        raise error
+
+    def stats(self) -> List[dict]:
+        return [{
+            "name": backend.name,
+            "p50": backend.percentile(0.5),
+            "p95": backend.percentile(0.95),
+            "error_rate": backend.error_rate(),
+            "state": self._state(backend),
+        } for backend in self.backends]
+
+    def _call(self, backend: Backend, request: Callable[[BaseAIProvider], str]) -> str:
+        start = time.monotonic()
+        try:
+            result = request(backend.provider)
+        except Exception:
+            self._record_failure(backend)
+            raise
+        backend.record_success(time.monotonic() - start)
+        return result
+
+    def _open_stream(self, backend: Backend, prompt: str, params: dict) -> tuple:
+        # Waits for the first chunk, so a backend that fails before sending
+        # anything can still be failed over or out-hedged.
+        start = time.monotonic()
+        try:
+            chunks = iter(backend.provider.stream_text(prompt, **params))
+            first = next(chunks, None)
+        except Exception:
+            self._record_failure(backend)
+            raise
+        return start, first, chunks
+
+    def _relay(self, backend: Backend, start: float, first: str, chunks: Iterator[str]) -> Iterator[str]:
+        # The whole stream counts as one call for latency and errors.
+        completed = False
+        try:
+            if first is not None:
+                yield first
+            yield from chunks
+            completed = True
+        except Exception:
+            self._record_failure(backend)
+            raise
+        finally:
+            if completed:
+                backend.record_success(time.monotonic() - start)
+            else:
+                # Abandoned by the client: no verdict, but free a trial slot.
+                backend.release_probe()
+
+    def _close_stream(self, future, backend: Backend):
+        # A hedged stream that lost the race is closed unread.
+        if future.cancelled() or future.exception() is not None:
+            return
+        backend.release_probe()
+        close = getattr(future.result()[2], "close", None)
+        if close is not None:
+            close()
+
+    def _record_failure(self, backend: Backend):
+        backend.record_failure()
+        self._maybe_open(backend)
+
+    def _candidates(self) -> List[Backend]:
+        closed, half_open = [], []
+        for backend in self.backends:
+            state = self._state(backend)
+            if state == "closed":
+                closed.append(backend)
+            elif state == "half_open":
+                half_open.append(backend)
+        # Backends without samples sort first so they get measured.
+        closed.sort(key=lambda b: b.percentile(0.5))
+        return closed + half_open
+
+    def _state(self, backend: Backend) -> str:
+        if backend.opened_at is None:
+            return "closed"
+        if time.monotonic() - backend.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def _maybe_open(self, backend: Backend):
+        tripped = backend.consecutive_failures >= self.failure_threshold or (
+            len(backend.outcomes) >= self.min_samples and backend.error_rate() >= self.max_error_rate
+        )
+        # A failed half-open trial re-opens the breaker for another cooldown.
+        if tripped or self._state(backend) == "half_open":
+            if backend.opened_at is None:
+                logger.warning("Opening circuit for AI backend %s", backend.name)
+            backend.opened_at = time.monotonic()
+
+    def _hedge_delay(self, backend: Backend) -> float:
+        if len(backend.latencies) < self.min_samples:
+            return None
+        return max(self.hedge_min_delay, backend.percentile(0.95))
@@ -0,0 +1,22 @@
+from typing import Dict, List
+from app.providers.base_ai_provider import BaseAIProvider
+from app.providers.async_base_ai_provider import AsyncBaseAIProvider
+from app.services.generation_scheduler import GenerationScheduler
+
+class ScheduledProvider(BaseAIProvider):
+    """
+    Synchronous facade over an async provider. Calls are funnelled through a
+    shared GenerationScheduler so the number of upstream requests in flight
+    is bounded per process rather than per request thread.
+    """
+    def __init__(self, provider: AsyncBaseAIProvider, scheduler: GenerationScheduler):
+        self.provider = provider
+        self.scheduler = scheduler
+        self.model = provider.model
+        self.context_window = getattr(provider, "context_window", None)
+
+    def generate_text(self, prompt: str, **params) -> str:
+        return self.scheduler.run(lambda: self.provider.generate_text(prompt, **params))
+
+    def generate_chat(self, messages: List[Dict[str, str]], **params) -> str:
+        return self.scheduler.run(lambda: self.provider.generate_chat(messages, **params))
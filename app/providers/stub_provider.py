@@ -0,0 +1,34 @@
+import asyncio
+import random
+import time
+from app.providers.base_ai_provider import BaseAIProvider
+from app.providers.async_base_ai_provider import AsyncBaseAIProvider
+
+def _simulated_latency(latency: float, jitter: float) -> float:
+    return max(0.0, latency + random.uniform(-jitter, jitter))
+
+class StubProvider(BaseAIProvider):
+    """
+    Local provider that echoes the prompt after a simulated upstream delay.
+    Used by benchmarks and load tests; never calls the network.
+    """
+    model = "stub"
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+
+    def generate_text(self, prompt: str, **params) -> str:
+        time.sleep(_simulated_latency(self.latency, self.jitter))
+        return f"Echo: {prompt}"
+
+class AsyncStubProvider(AsyncBaseAIProvider):
+    model = "stub"
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+
+    async def generate_text(self, prompt: str, **params) -> str:
+        await asyncio.sleep(_simulated_latency(self.latency, self.jitter))
+        return f"Echo: {prompt}"
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import CachedResponse
+
+class CachedResponseRepository:
+    """
+    Shared response cache backend stored next to generated_texts, so every
+    worker process sees the same entries.
+    """
+    def __init__(self, session):
+        self.session = session
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[str]]]:
+        # (response, model that generated it)
+        entry = self.session.query(CachedResponse).get(key)
+        if entry is None or entry.expires_at <= datetime.utcnow():
+            return None
+        return entry.response, entry.model
+
+    def set(self, key: str, response: str, ttl: float, model: str = None):
+        # One upsert, so two processes caching the same key cannot hit a
+        # unique violation; any failure is rolled back so the request's
+        # session stays usable for the writes that follow.
+        now = datetime.utcnow()
+        values = {"key": key, "response": response, "model": model, "created_at": now, "expires_at": now + timedelta(seconds=ttl)}
+        insert = postgresql.insert if self.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+        statement = insert(CachedResponse).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[CachedResponse.key],
+            set_={name: statement.excluded[name] for name in ("response", "model", "created_at", "expires_at")},
+        )
+        try:
+            self.session.execute(statement)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def purge_expired(self) -> int:
+        deleted = (
+            self.session.query(CachedResponse)
+            .filter(CachedResponse.expires_at <= datetime.utcnow())
+            .delete(synchronize_session=False)
+        )
+        self.session.commit()
+        return deleted
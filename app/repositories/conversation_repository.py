@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy.orm import undefer_group
+from app.models import Conversation, GeneratedText
+
+class ConversationRepository:
+    def __init__(self, session):
+        self.session = session
+
+    def create(self, user_id: int, title: str = None) -> Conversation:
+        conversation = Conversation(user_id=user_id, title=title)
+        self.session.add(conversation)
+        self.session.commit()
+        return conversation
+
+    def find_by_id(self, conversation_id: int) -> Conversation:
+        return self.session.query(Conversation).get(conversation_id)
+
+    def list_for_user(self, user_id: int, limit: int) -> List[Conversation]:
+        return (
+            self.session.query(Conversation)
+            .filter(Conversation.user_id == user_id)
+            .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def add_turn(self, conversation: Conversation, prompt: str, response: str, model: str = None,
+                 params: dict = None) -> GeneratedText:
+        # Bumped explicitly: adding a turn does not touch the conversation
+        # row, so onupdate never fires and list_for_user would misorder it.
+        turn = GeneratedText(
+            user_id=conversation.user_id,
+            prompt=prompt,
+            response=response,
+            model=model,
+            params=params or None,
+            conversation_id=conversation.id,
+        )
+        conversation.updated_at = datetime.utcnow()
+        self.session.add(turn)
+        self.session.commit()
+        return turn
+
+    def turns_since(self, conversation: Conversation, after_id: int = None) -> List[GeneratedText]:
+        # Turns already folded into the summary are never loaded again.
+        query = self.session.query(GeneratedText).filter(GeneratedText.conversation_id == conversation.id)
+        if after_id is not None:
+            query = query.filter(GeneratedText.id > after_id)
+        return query.options(undefer_group("body")).order_by(GeneratedText.id).all()
+
+    def update_summary(self, conversation: Conversation, summary: str, through_id: int) -> Conversation:
+        conversation.summary = summary
+        conversation.summary_through_id = through_id
+        self.session.commit()
+        return conversation
+
+    def delete(self, conversation: Conversation):
+        self.session.delete(conversation)
+        self.session.commit()
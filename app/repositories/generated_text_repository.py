@@ -1,18 +1,157 @@
-from app.models import GeneratedText
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, List, Tuple
+from sqlalchemy import func, insert, literal_column, select, tuple_
+from sqlalchemy.orm import undefer_group
+from app import metrics
+from app.models import GeneratedText, text_search_vector
+from app.services.body_codec import decode_body, encode_body
+
+# Columns exported per row, and the subset an import writes back; imported
+# rows get fresh ids and are not attached to conversations. Bodies are
+# always exported decompressed and re-encoded on import.
+EXPORT_COLUMNS = ("id", "user_id", "prompt", "response", "model", "params", "conversation_id", "timestamp")
+IMPORT_COLUMNS = ("user_id", "prompt", "response", "model", "params", "timestamp", "prompt_blob", "response_blob")
 
 class GeneratedTextRepository:
-    def __init__(self, session):
+    def __init__(self, session, read_session=None):
         self.session = session
+        self.read_session = read_session or session
     
-    def create_text(self, user_id: int, prompt: str, response: str) -> GeneratedText:
-        gt = GeneratedText(user_id=user_id, prompt=prompt, response=response)
+    @metrics.timed("db_commit")
+    def create_text(self, user_id: int, prompt: str, response: str, model: str = None,
+                    params: dict = None, conversation_id: int = None) -> GeneratedText:
+        gt = GeneratedText(
+            user_id=user_id,
+            prompt=prompt,
+            response=response,
+            model=model,
+            params=params or None,
+            conversation_id=conversation_id,
+        )
         self.session.add(gt)
         self.session.commit()
         return gt
 
-    def find_by_id(self, text_id: int) -> GeneratedText:
-        return self.session.query(GeneratedText).get(text_id)
+    @metrics.timed("db_commit")
+    def create_texts(self, user_id: int, items: List[Tuple[str, str, str]],
+                     params: dict = None) -> List[GeneratedText]:
+        # `items` are (prompt, response, model). One flush and one commit for
+        # the whole batch; SQLAlchemy groups the rows into a multi-row INSERT.
+        texts = [
+            GeneratedText(user_id=user_id, prompt=prompt, response=response, model=model, params=params or None)
+            for prompt, response, model in items
+        ]
+        self.session.add_all(texts)
+        self.session.commit()
+        return texts
+
+    def find_by_id(self, text_id: int, primary: bool = False) -> GeneratedText:
+        # Rows loaded from the replica belong to the read session, so callers
+        # that go on to modify a row must ask for the primary.
+        if primary or self.read_session is self.session:
+            return self.session.query(GeneratedText).get(text_id)
+        gen_text = self.read_session.query(GeneratedText).get(text_id)
+        if gen_text is None:
+            # The row may not have replicated yet; read-your-writes via primary.
+            gen_text = self.session.query(GeneratedText).get(text_id)
+        return gen_text
     
+    def list_for_user(self, user_id: int, limit: int, before: Tuple[datetime, int] = None,
+                      start: datetime = None, end: datetime = None, search: str = None,
+                      bodies: bool = True) -> List[GeneratedText]:
+        """
+        Newest-first page of a user's texts. `before` is the (timestamp, id)
+        of the last row of the previous page, which keeps every page an index
+        range scan instead of an OFFSET. `bodies=False` leaves prompt and
+        response unloaded.
+        """
+        query = self.read_session.query(GeneratedText).filter(GeneratedText.user_id == user_id)
+        if start:
+            query = query.filter(GeneratedText.timestamp >= start)
+        if end:
+            query = query.filter(GeneratedText.timestamp < end)
+        if search:
+            query = query.filter(text_search_vector().op("@@")(
+                func.websearch_to_tsquery(literal_column("'english'::regconfig"), search)
+            ))
+        if before:
+            query = query.filter(tuple_(GeneratedText.timestamp, GeneratedText.id) < tuple_(*before))
+        if bodies:
+            query = query.options(undefer_group("body"))
+        return (
+            query.order_by(GeneratedText.timestamp.desc(), GeneratedText.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def iter_rows(self, user_id: int = None, start: datetime = None, end: datetime = None,
+                  batch_size: int = 1000) -> Iterator[dict]:
+        """
+        Streams matching rows as plain mappings ordered by id. `yield_per`
+        fetches them through a server-side cursor in batches and no ORM
+        objects are built, so memory stays flat however many rows match.
+        """
+        table = GeneratedText.__table__
+        query = select(*[table.c[name] for name in EXPORT_COLUMNS], table.c.prompt_blob, table.c.response_blob)
+        if user_id is not None:
+            query = query.where(table.c.user_id == user_id)
+        if start:
+            query = query.where(table.c.timestamp >= start)
+        if end:
+            query = query.where(table.c.timestamp < end)
+        result = self.read_session.execute(query.order_by(table.c.id).execution_options(yield_per=batch_size))
+        try:
+            for row in result.mappings():
+                row = dict(row)
+                row["prompt"] = decode_body(row["prompt"], row.pop("prompt_blob"))
+                row["response"] = decode_body(row["response"], row.pop("response_blob"))
+                yield row
+        finally:
+            result.close()
+
+    def bulk_import(self, rows: Iterable[dict], batch_size: int = 10000) -> int:
+        """
+        Appends rows in one transaction, `batch_size` at a time: COPY on
+        Postgres, multi-row INSERTs elsewhere. Returns the number imported.
+        """
+        connection = self.session.connection()
+        table = GeneratedText.__table__
+        imported = 0
+        batch = []
+        for row in rows:
+            values = {name: row.get(name) for name in IMPORT_COLUMNS}
+            values["timestamp"] = values["timestamp"] or datetime.utcnow()
+            values["prompt"], values["prompt_blob"] = encode_body(values["prompt"])
+            values["response"], values["response_blob"] = encode_body(values["response"])
+            batch.append(values)
+            if len(batch) >= batch_size:
+                imported += self._write_batch(connection, table, batch)
+                batch = []
+        if batch:
+            imported += self._write_batch(connection, table, batch)
+        self.session.commit()
+        return imported
+
+    def _write_batch(self, connection, table, batch: List[dict]) -> int:
+        if connection.dialect.name != "postgresql":
+            connection.execute(insert(table), batch)
+            return len(batch)
+
+        buffer = io.StringIO()
+        for row in batch:
+            buffer.write("\t".join(_copy_value(name, row[name]) for name in IMPORT_COLUMNS))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(IMPORT_COLUMNS)}) FROM STDIN", buffer)
+        finally:
+            cursor.close()
+        return len(batch)
+
+    @metrics.timed("db_commit")
     def update_text(self, gen_text: GeneratedText, new_prompt: str = None, new_response: str = None):
         if new_prompt:
             gen_text.prompt = new_prompt
@@ -21,6 +160,23 @@ class GeneratedTextRepository:
         self.session.commit()
         return gen_text
     
+    @metrics.timed("db_commit")
     def delete_text(self, gen_text: GeneratedText):
         self.session.delete(gen_text)
         self.session.commit()
+
+def _copy_value(name: str, value) -> str:
+    # COPY text format: \N is NULL; backslash, tab and newlines are escaped.
+    if value is None:
+        return "\\N"
+    if isinstance(value, bytes):
+        # bytea hex input; the backslash is escaped below like any other.
+        value = "\\x" + value.hex()
+    elif name == "params":
+        value = json.dumps(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t")
+        .replace("\n", "\\n").replace("\r", "\\r")
+    )
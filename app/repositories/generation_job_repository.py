@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from app.models import GenerationJob
+
+class GenerationJobRepository:
+    def __init__(self, session):
+        self.session = session
+
+    def enqueue(self, user_id: int, prompt: str, use_cache: bool = True, max_attempts: int = 3,
+                params: dict = None) -> GenerationJob:
+        job = GenerationJob(
+            user_id=user_id,
+            prompt=prompt,
+            use_cache=use_cache,
+            params=params or None,
+            max_attempts=max_attempts,
+            status="queued",
+            run_after=datetime.utcnow(),
+        )
+        self.session.add(job)
+        self.session.commit()
+        return job
+
+    def find_by_id(self, job_id: int) -> GenerationJob:
+        return self.session.query(GenerationJob).get(job_id)
+
+    def claim_next(self, lease_seconds: float) -> GenerationJob:
+        # SKIP LOCKED lets concurrent workers each grab a different row
+        # without blocking on one another. Running jobs whose lease expired
+        # (their worker died) become claimable again, unless that worker
+        # already used the last attempt; those are failed instead.
+        while True:
+            now = datetime.utcnow()
+            job = (
+                self.session.query(GenerationJob)
+                .filter(GenerationJob.status.in_(["queued", "running"]))
+                .filter(GenerationJob.run_after <= now)
+                .order_by(GenerationJob.run_after, GenerationJob.id)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if job is None:
+                self.session.rollback()
+                return None
+            if job.status == "running" and job.attempts >= job.max_attempts:
+                job.status = "failed"
+                job.last_error = job.last_error or "Lease expired on the final attempt"
+                self.session.commit()
+                continue
+            break
+
+        job.status = "running"
+        job.attempts += 1
+        job.run_after = now + timedelta(seconds=lease_seconds)
+        self.session.commit()
+        return job
+
+    def mark_succeeded(self, job: GenerationJob, generated_text_id: int) -> GenerationJob:
+        job.status = "succeeded"
+        job.generated_text_id = generated_text_id
+        job.last_error = None
+        self.session.commit()
+        return job
+
+    def mark_failed(self, job: GenerationJob, error: str, retry_delay: float = None) -> GenerationJob:
+        job.last_error = error
+        if retry_delay is not None and job.attempts < job.max_attempts:
+            job.status = "queued"
+            job.run_after = datetime.utcnow() + timedelta(seconds=retry_delay)
+        else:
+            job.status = "failed"
+        self.session.commit()
+        return job
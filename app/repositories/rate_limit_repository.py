@@ -0,0 +1,43 @@
+import time
+from typing import List
+from sqlalchemy import text
+from app.models import RateLimitBucket
+from app.services.rate_limiter import Limit, refill
+
+class RateLimitRepository:
+    """
+    Token buckets shared by every worker process. Each bucket row is
+    updated under a transaction-scoped Postgres advisory lock on its key.
+    """
+    def __init__(self, session):
+        self.session = session
+
+    def consume_all(self, limits: List[Limit]) -> float:
+        # Locks are taken in a fixed order so concurrent requests touching
+        # the same buckets cannot deadlock.
+        ordered = sorted(limits, key=lambda limit: limit[0])
+        try:
+            for key, _, _, _ in ordered:
+                self.session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": key})
+
+            now = time.time()
+            buckets = []
+            wait = 0.0
+            for key, amount, rate, capacity in ordered:
+                bucket = self.session.get(RateLimitBucket, key)
+                if bucket is None:
+                    bucket = RateLimitBucket(key=key, tokens=capacity, updated_at=now)
+                    self.session.add(bucket)
+                tokens = refill(bucket.tokens, now - bucket.updated_at, rate, capacity)
+                buckets.append((bucket, tokens, amount))
+                if tokens < amount:
+                    wait = max(wait, (amount - tokens) / rate)
+
+            for bucket, tokens, amount in buckets:
+                bucket.tokens = tokens if wait else tokens - amount
+                bucket.updated_at = now
+            self.session.commit()
+            return wait
+        except Exception:
+            self.session.rollback()
+            raise
@@ -1,11 +1,12 @@
 from app.models import User
 
 class UserRepository:
-    def __init__(self, session):
+    def __init__(self, session, read_session=None):
         self.session = session
+        self.read_session = read_session or session
 
     def find_by_id(self, user_id: int) -> User:
-        return self.session.query(User).get(user_id)
+        return self.read_session.query(User).get(user_id)
     
     def find_by_username(self, username: str) -> User:
         lower = username.lower()
@@ -17,4 +18,9 @@ class UserRepository:
         user = User(username=lower_username, password_hash=password_hash)
         self.session.add(user)
         self.session.commit()
-        return user
\ No newline at end of file
+        return user
+
+    def update_password_hash(self, user: User, password_hash: str) -> User:
+        user.password_hash = password_hash
+        self.session.commit()
+        return user
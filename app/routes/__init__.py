@@ -3,7 +3,13 @@ from flask import Blueprint
 auth_blueprint = Blueprint("auth_api", __name__)
 user_blueprint = Blueprint("user_api", __name__)
 generate_text_blueprint = Blueprint("generate_text_api", __name__)
+jobs_blueprint = Blueprint("jobs_api", __name__)
+metrics_blueprint = Blueprint("metrics_api", __name__)
+conversations_blueprint = Blueprint("conversations_api", __name__)
 
 from app.routes.auth_routes import *           # registers endpoints on auth_blueprint
 from app.routes.user_routes import *           # registers endpoints on user_blueprint
 from app.routes.generated_text_routes import * # registers endpoints on generate_text_blueprint
+from app.routes.job_routes import *            # registers endpoints on jobs_blueprint
+from app.routes.metrics_routes import *        # registers endpoints on metrics_blueprint
+from app.routes.conversation_routes import *   # registers endpoints on conversations_blueprint
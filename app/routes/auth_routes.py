@@ -5,15 +5,20 @@ from app.validation import RegisterSchema, LoginSchema
 from app.models import db
 from app.repositories.user_repository import UserRepository
 from app.services.user_service import UserService
+from app.services.password_hasher import password_hasher, HasherOverloaded
 from app.routes import auth_blueprint
 
 user_repo = UserRepository(db.session)
-user_service = UserService(user_repo)
+user_service = UserService(user_repo, password_hasher)
 
 @auth_blueprint.errorhandler(ValidationError)
 def handle_validation_error(err):
     return jsonify(err.messages), 422
 
+@auth_blueprint.errorhandler(HasherOverloaded)
+def handle_hasher_overloaded(err):
+    return jsonify({"message": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+
 @auth_blueprint.route("/register", methods=["POST"])
 def register():
     data = request.get_json()
@@ -33,5 +38,9 @@ def login():
     user = user_service.verify_credentials(data["username"], data["password"])
     if not user:
         return jsonify({"message": "Invalid credentials"}), 401
-    access_token = create_access_token(identity=str(user.id))
+    # Profile claims let authenticated routes answer without a user lookup.
+    access_token = create_access_token(
+        identity=str(user.id),
+        additional_claims={"username": user.username},
+    )
     return jsonify({"access_token": access_token}), 200
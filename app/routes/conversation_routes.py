@@ -0,0 +1,99 @@
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import ValidationError
+from app import metrics
+from app.config import Config
+from app.models import db
+from app.repositories.conversation_repository import ConversationRepository
+from app.services.conversation_service import ConversationService
+from app.services.rate_limiter import RateLimitExceeded
+from app.validation import (
+    CreateConversationSchema, ConversationMessageSchema, ListConversationsSchema, generation_params,
+)
+from app.routes.generated_text_routes import (
+    ai_service, _admit, _serialize, handle_validation_error, handle_rate_limit_exceeded,
+    OVERLOAD_ERRORS, handle_overloaded,
+)
+from app.routes import conversations_blueprint
+
+conversation_repo = ConversationRepository(db.session)
+conversation_service = ConversationService(
+    ai_service,
+    conversation_repo,
+    history_tokens=Config.CONVERSATION_HISTORY_TOKENS,
+    keep_turns=Config.CONVERSATION_KEEP_TURNS,
+    summary_max_tokens=Config.CONVERSATION_SUMMARY_MAX_TOKENS,
+)
+
+conversations_blueprint.register_error_handler(ValidationError, handle_validation_error)
+conversations_blueprint.register_error_handler(RateLimitExceeded, handle_rate_limit_exceeded)
+for _error in OVERLOAD_ERRORS:
+    conversations_blueprint.register_error_handler(_error, handle_overloaded)
+
+def _serialize_conversation(conversation) -> dict:
+    return {
+        "id": conversation.id,
+        "title": conversation.title,
+        "summary": conversation.summary,
+        "summary_through_id": conversation.summary_through_id,
+        "created_at": conversation.created_at,
+        "updated_at": conversation.updated_at
+    }
+
+def _owned_conversation(conversation_id: int):
+    conversation = conversation_repo.find_by_id(conversation_id)
+    if not conversation:
+        return None, (jsonify({"message": "Not found"}), 404)
+    if conversation.user_id != int(get_jwt_identity()):
+        return None, (jsonify({"message": "Unauthorized"}), 403)
+    return conversation, None
+
+@conversations_blueprint.route("", methods=["POST"])
+@jwt_required()
+def create_conversation():
+    data = CreateConversationSchema().load(request.get_json() or {})
+    conversation = conversation_repo.create(int(get_jwt_identity()), data.get("title"))
+    return jsonify(_serialize_conversation(conversation)), 201
+
+@conversations_blueprint.route("", methods=["GET"])
+@jwt_required()
+def list_conversations():
+    # Most recently active first.
+    args = ListConversationsSchema().load(request.args)
+    conversations = conversation_repo.list_for_user(int(get_jwt_identity()), args["limit"])
+    return jsonify({"items": [_serialize_conversation(c) for c in conversations]}), 200
+
+@conversations_blueprint.route("/<int:conversation_id>", methods=["GET"])
+@jwt_required()
+def get_conversation(conversation_id):
+    conversation, error = _owned_conversation(conversation_id)
+    if error:
+        return error
+    turns = conversation_repo.turns_since(conversation)
+    return jsonify({**_serialize_conversation(conversation), "turns": [_serialize(t) for t in turns]}), 200
+
+@conversations_blueprint.route("/<int:conversation_id>/messages", methods=["POST"])
+@metrics.timed_jwt_required()
+def send_message(conversation_id):
+    data = request.get_json()
+    with metrics.stage_timer("validation"):
+        params = generation_params(ConversationMessageSchema().load(data))
+    conversation, error = _owned_conversation(conversation_id)
+    if error:
+        return error
+    _admit(conversation.user_id, [data["prompt"]], params)
+
+    try:
+        turn = conversation_service.send_message(conversation, data["prompt"], params)
+    except ValueError as ve:
+        return jsonify({"message": str(ve)}), 400
+    return jsonify({**_serialize(turn), "conversation_id": conversation.id}), 201
+
+@conversations_blueprint.route("/<int:conversation_id>", methods=["DELETE"])
+@jwt_required()
+def delete_conversation(conversation_id):
+    conversation, error = _owned_conversation(conversation_id)
+    if error:
+        return error
+    conversation_repo.delete(conversation)
+    return jsonify({"message": f"Deleted conversation with ID {conversation_id}"}), 200
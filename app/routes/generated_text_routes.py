@@ -1,63 +1,312 @@
-from flask import request, jsonify
+import base64
+import json
+import logging
+import math
+from datetime import datetime
+from flask import request, jsonify, current_app, url_for, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
-from app.validation import GenerateTextSchema
-from app.models import db
+from app import metrics
+from app.validation import (
+    GenerateTextSchema, BatchGenerateTextSchema, ListGeneratedTextSchema, ExportGeneratedTextSchema, FieldsetSchema,
+    GENERATED_TEXT_FIELDS, fieldset, generation_params,
+)
+from app.config import Config
+from app.models import db, read_session
 from app.repositories.generated_text_repository import GeneratedTextRepository
-from app.providers.openai_provider import OpenAIProvider
-from app.services.ai_service import AIService
+from app.repositories.generation_job_repository import GenerationJobRepository
+from app.repositories.rate_limit_repository import RateLimitRepository
+from app.services.ai_service import create_ai_service
+from app.services.generation_scheduler import SchedulerOverloaded, SchedulerTimeout
+from app.providers.local_model_provider import LocalModelOverloaded
+from app.services.text_export import CONTENT_TYPES, export_chunks
+from app.services.rate_limiter import RateLimiter, RateLimitExceeded, InMemoryRateLimitBackend, estimate_tokens
 from app.routes import generate_text_blueprint
 
-gen_text_repo = GeneratedTextRepository(db.session)
-ai_service = AIService(OpenAIProvider())
+logger = logging.getLogger(__name__)
+
+gen_text_repo = GeneratedTextRepository(db.session, read_session=read_session)
+job_repo = GenerationJobRepository(db.session)
+ai_service = create_ai_service()
+
+rate_limiter = None
+if Config.RATE_LIMIT_ENABLED:
+    rate_limiter = RateLimiter(
+        RateLimitRepository(db.session) if Config.RATE_LIMIT_BACKEND == "sql" else InMemoryRateLimitBackend(),
+        upstream_key=f"{Config.AI_PROVIDER}:{Config.OPENAI_API_KEY}",
+        user_rps=Config.RATE_LIMIT_USER_RPS,
+        user_burst=Config.RATE_LIMIT_USER_BURST,
+        user_tpm=Config.RATE_LIMIT_USER_TPM,
+        global_rps=Config.RATE_LIMIT_GLOBAL_RPS,
+        global_tpm=Config.RATE_LIMIT_GLOBAL_TPM,
+    )
 
 @generate_text_blueprint.errorhandler(ValidationError)
 def handle_validation_error(err):
     return jsonify(err.messages), 422
 
+@generate_text_blueprint.errorhandler(RateLimitExceeded)
+def handle_rate_limit_exceeded(err):
+    return jsonify({"message": "Rate limit exceeded"}), 429, {"Retry-After": str(math.ceil(err.retry_after))}
+
+# Raised when generation capacity (scheduler slots, local model queue) is
+# exhausted; the client should back off rather than see a 500.
+OVERLOAD_ERRORS = (SchedulerOverloaded, SchedulerTimeout, LocalModelOverloaded)
+
+def handle_overloaded(err):
+    return jsonify({"message": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+
+for _error in OVERLOAD_ERRORS:
+    generate_text_blueprint.register_error_handler(_error, handle_overloaded)
+
+def _admit(user_id: int, prompts: list, params: dict):
+    # Rejects over-limit requests up front instead of queueing them behind
+    # the upstream's own 429s.
+    if rate_limiter:
+        completion_tokens = params.get("max_tokens") or Config.RATE_LIMIT_COMPLETION_TOKENS
+        rate_limiter.check(
+            user_id,
+            requests=len(prompts),
+            tokens=sum(estimate_tokens(p or "", completion_tokens) for p in prompts),
+        )
+
+def _serialize(gen_text, fields: tuple = GENERATED_TEXT_FIELDS) -> dict:
+    # Bodies are deferred columns; leaving them out of `fields` means they
+    # are never loaded or decompressed.
+    return {name: getattr(gen_text, name) for name in fields}
+
+def _wants_bodies(fields: tuple) -> bool:
+    return "prompt" in fields or "response" in fields
+
 @generate_text_blueprint.route("/generate-text", methods=["POST"])
-@jwt_required()
+@metrics.timed_jwt_required()
 def generate_text():
     data = request.get_json()
     prompt = data.get("prompt")
-    GenerateTextSchema().load(data)
+    with metrics.stage_timer("validation"):
+        params = generation_params(GenerateTextSchema().load(data))
     current_user_id = int(get_jwt_identity())
+    _admit(current_user_id, [prompt], params)
+
+    mode = request.args.get("mode")
+    if mode == "stream":
+        return _stream_generated_text(current_user_id, prompt, params)
+    if mode == "async":
+        return _enqueue_generation_job(current_user_id, prompt, data.get("cache") != "bypass", params)
     
     try:
-        result = ai_service.generate_text(prompt)
+        generation = ai_service.generate(prompt, use_cache=data.get("cache") != "bypass", params=params)
     
-        new_text = gen_text_repo.create_text(current_user_id, prompt, result)
-        return jsonify({
-            "id": new_text.id,
-            "prompt": new_text.prompt,
-            "response": new_text.response,
-            "timestamp": new_text.timestamp
-        }), 201
+        new_text = gen_text_repo.create_text(
+            current_user_id, generation.prompt, generation.text, model=generation.model, params=params
+        )
+        return jsonify(_serialize(new_text)), 201
+    except ValueError as ve:
+        return jsonify({"message": str(ve)}), 400
+
+@generate_text_blueprint.route("/generate-text/batch", methods=["POST"])
+@metrics.timed_jwt_required()
+def generate_text_batch():
+    data = request.get_json()
+    with metrics.stage_timer("validation"):
+        params = generation_params(BatchGenerateTextSchema().load(data))
+    current_user_id = int(get_jwt_identity())
+    prompts = data["prompts"]
+    _admit(current_user_id, prompts, params)
+
+    outcomes = ai_service.generate_batch(
+        prompts,
+        max_parallel=Config.BATCH_MAX_PARALLEL,
+        use_cache=data.get("cache") != "bypass",
+        params=params,
+    )
+    if request.args.get("mode") == "stream":
+        return _stream_batch_results(current_user_id, outcomes, params)
+
+    results = [None] * len(prompts)
+    generated = []
+    for index, generation, error in outcomes:
+        if error is not None:
+            results[index] = {"index": index, "error": str(error)}
+        else:
+            generated.append((index, generation))
+
+    stored = gen_text_repo.create_texts(
+        current_user_id, [(g.prompt, g.text, g.model) for _, g in generated], params=params
+    )
+    for (index, _), new_text in zip(generated, stored):
+        results[index] = {"index": index, **_serialize(new_text)}
+    return jsonify({"results": results}), 200
+
+def _stream_batch_results(user_id: int, outcomes, params: dict):
+    @stream_with_context
+    def lines():
+        generated = []
+        for index, generation, error in outcomes:
+            if error is not None:
+                yield _ndjson_line({"index": index, "error": str(error)})
+            else:
+                generated.append((index, generation))
+                yield _ndjson_line({"index": index, "response": generation.text})
+
+        # Rows are written in bulk once every item has finished; the last
+        # line maps each successful index to its stored record.
+        stored = gen_text_repo.create_texts(
+            user_id, [(g.prompt, g.text, g.model) for _, g in generated], params=params
+        )
+        yield _ndjson_line({"stored": [
+            {"index": index, "id": new_text.id, "timestamp": new_text.timestamp}
+            for (index, _), new_text in zip(generated, stored)
+        ]})
+
+    return Response(lines(), mimetype="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+def _ndjson_line(payload: dict) -> str:
+    return current_app.json.dumps(payload) + "\n"
+
+def _enqueue_generation_job(user_id: int, prompt: str, use_cache: bool, params: dict):
+    try:
+        ai_service.validate_prompt(prompt)
     except ValueError as ve:
         return jsonify({"message": str(ve)}), 400
 
+    job = job_repo.enqueue(
+        user_id, prompt, use_cache=use_cache, max_attempts=Config.JOB_MAX_ATTEMPTS, params=params
+    )
+    status_url = url_for("jobs_api.get_job", job_id=job.id)
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": status_url
+    }), 202, {"Location": status_url}
+
+def _stream_generated_text(user_id: int, prompt: str, params: dict):
+    try:
+        # A truncated prompt is stored as it was sent.
+        prompt, chunks = ai_service.stream(prompt, params=params)
+    except ValueError as ve:
+        return jsonify({"message": str(ve)}), 400
+    model = ai_service.answered_model(params)
+
+    @stream_with_context
+    def events():
+        parts = []
+        try:
+            for delta in chunks:
+                parts.append(delta)
+                yield _sse_event({"delta": delta})
+        except Exception as e:
+            logger.exception("Error while streaming generated text")
+            yield _sse_event({"message": f"Generation failed, {e}"}, event="error")
+            return
+
+        # Persist only once the provider has finished so the stored row
+        # always holds the complete text.
+        new_text = gen_text_repo.create_text(
+            user_id, prompt, "".join(parts).strip(), model=model, params=params
+        )
+        yield _sse_event(_serialize(new_text), event="done")
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _sse_event(payload: dict, event: str = None) -> str:
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {current_app.json.dumps(payload)}\n\n"
+
+@generate_text_blueprint.route("/generated-text", methods=["GET"])
+@jwt_required()
+def list_generated_texts():
+    args = ListGeneratedTextSchema().load(request.args)
+    current_user_id = int(get_jwt_identity())
+
+    before = None
+    if "cursor" in args:
+        try:
+            before = _decode_cursor(args["cursor"])
+        except ValueError:
+            return jsonify({"message": "Invalid cursor"}), 400
+
+    # One extra row tells us whether another page exists.
+    limit = args["limit"]
+    fields = fieldset(args)
+    rows = gen_text_repo.list_for_user(
+        current_user_id,
+        limit + 1,
+        before=before,
+        start=args.get("start"),
+        end=args.get("end"),
+        search=args.get("q"),
+        bodies=_wants_bodies(fields),
+    )
+    page = rows[:limit]
+    next_cursor = _encode_cursor(page[-1]) if len(rows) > limit else None
+
+    return jsonify({
+        "items": [_serialize(gen_text, fields) for gen_text in page],
+        "next_cursor": next_cursor
+    }), 200
+
+@generate_text_blueprint.route("/generated-text/export", methods=["GET"])
+@jwt_required()
+def export_generated_texts():
+    args = ExportGeneratedTextSchema().load(request.args)
+    current_user_id = int(get_jwt_identity())
+    fmt = args["format"]
+
+    # Rows are fetched and encoded a batch at a time while the body streams.
+    rows = gen_text_repo.iter_rows(
+        user_id=current_user_id,
+        start=args.get("start"),
+        end=args.get("end"),
+        batch_size=Config.EXPORT_BATCH_SIZE,
+    )
+    try:
+        chunks = export_chunks(rows, fmt, Config.EXPORT_BATCH_SIZE)
+    except RuntimeError as e:
+        return jsonify({"message": str(e)}), 400
+    return Response(
+        stream_with_context(chunks),
+        mimetype=CONTENT_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename=generated-texts.{fmt}"},
+    )
+
+def _encode_cursor(gen_text) -> str:
+    raw = json.dumps([gen_text.timestamp.isoformat(), gen_text.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str):
+    try:
+        timestamp, text_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(timestamp), int(text_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
 @generate_text_blueprint.route("/generated-text/<int:text_id>", methods=["GET"])
 @jwt_required()
 def get_generated_text(text_id):
+    args = FieldsetSchema().load(request.args)
     current_user_id = int(get_jwt_identity())
     gen_text = gen_text_repo.find_by_id(text_id)
     if not gen_text:
         return jsonify({"message": "Not found"}), 404
     if gen_text.user_id != current_user_id:
         return jsonify({"message": "Unauthorized"}), 403
-    
-    return jsonify({
-        "id": gen_text.id,
-        "prompt": gen_text.prompt,
-        "response": gen_text.response,
-        "timestamp": gen_text.timestamp
-    }), 200
+
+    # The ETag hashes the body, so it changes with the row and with ?fields=;
+    # a matching If-None-Match gets an empty 304.
+    response = jsonify(_serialize(gen_text, fieldset(args)))
+    response.add_etag()
+    return response.make_conditional(request)
 
 @generate_text_blueprint.route("/generated-text/<int:text_id>", methods=["PUT"])
 @jwt_required()
 def update_generated_text(text_id):
     current_user_id = int(get_jwt_identity())
-    gen_text = gen_text_repo.find_by_id(text_id)
+    gen_text = gen_text_repo.find_by_id(text_id, primary=True)
     if not gen_text:
         return jsonify({"message": "Not found"}), 404
     if gen_text.user_id != current_user_id:
@@ -68,18 +317,13 @@ def update_generated_text(text_id):
     new_response = data.get("response")
     
     updated = gen_text_repo.update_text(gen_text, new_prompt, new_response)
-    return jsonify({
-        "id": updated.id,
-        "prompt": updated.prompt,
-        "response": updated.response,
-        "timestamp": updated.timestamp
-    }), 200
+    return jsonify(_serialize(updated)), 200
 
 @generate_text_blueprint.route("/generated-text/<int:text_id>", methods=["DELETE"])
 @jwt_required()
 def delete_generated_text(text_id):
     current_user_id = int(get_jwt_identity())
-    gen_text = gen_text_repo.find_by_id(text_id)
+    gen_text = gen_text_repo.find_by_id(text_id, primary=True)
     if not gen_text:
         return jsonify({"message": "Not found"}), 404
     if gen_text.user_id != current_user_id:
@@ -0,0 +1,35 @@
+from flask import jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models import db
+from app.repositories.generation_job_repository import GenerationJobRepository
+from app.routes import jobs_blueprint
+
+job_repo = GenerationJobRepository(db.session)
+
+@jobs_blueprint.route("/<int:job_id>", methods=["GET"])
+@jwt_required()
+def get_job(job_id):
+    current_user_id = int(get_jwt_identity())
+    job = job_repo.find_by_id(job_id)
+    if not job:
+        return jsonify({"message": "Not found"}), 404
+    if job.user_id != current_user_id:
+        return jsonify({"message": "Unauthorized"}), 403
+
+    body = {
+        "id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.last_error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
+    if job.status == "succeeded" and job.generated_text:
+        body["result"] = {
+            "id": job.generated_text.id,
+            "prompt": job.generated_text.prompt,
+            "response": job.generated_text.response,
+            "model": job.generated_text.model,
+            "timestamp": job.generated_text.timestamp
+        }
+    return jsonify(body), 200
@@ -0,0 +1,64 @@
+from flask import Response
+from app import metrics
+from app.models import db
+from app.routes import metrics_blueprint
+from app.routes.generated_text_routes import ai_service, rate_limiter
+
+def _pool_connections() -> dict:
+    pool = db.engine.pool
+    # Only QueuePool (Postgres) reports size and overflow.
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        ("size",): pool.size(),
+        ("checked_out",): pool.checkedout(),
+        ("overflow",): max(0, pool.overflow()),
+    }
+
+def _cache_lookups() -> dict:
+    if not ai_service.cache:
+        return {}
+    stats = ai_service.cache.stats()
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+def _cache_hit_ratio() -> dict:
+    return {(): ai_service.cache.stats()["hit_ratio"]} if ai_service.cache else {}
+
+def _semantic_cache_lookups() -> dict:
+    if not ai_service.semantic_cache:
+        return {}
+    stats = ai_service.semantic_cache.stats()
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+def _single_flight_calls() -> dict:
+    if not ai_service.single_flight:
+        return {}
+    stats = ai_service.single_flight.stats()
+    return {("executed",): stats["executed"], ("collapsed",): stats["collapsed"]}
+
+def _rate_limited() -> dict:
+    return {(): rate_limiter.rejected} if rate_limiter else {}
+
+metrics.registry.register(metrics.CallbackMetric(
+    "db_pool_connections", "Connections in the primary database pool.", ("state",), _pool_connections,
+))
+metrics.registry.register(metrics.CallbackMetric(
+    "response_cache_lookups_total", "Response cache lookups.", ("result",), _cache_lookups, "counter",
+))
+metrics.registry.register(metrics.CallbackMetric(
+    "response_cache_hit_ratio", "Share of response cache lookups that hit.", (), _cache_hit_ratio,
+))
+metrics.registry.register(metrics.CallbackMetric(
+    "semantic_cache_lookups_total", "Semantic cache lookups.", ("result",), _semantic_cache_lookups, "counter",
+))
+metrics.registry.register(metrics.CallbackMetric(
+    "single_flight_calls_total", "Provider calls executed or collapsed into one in flight.", ("outcome",),
+    _single_flight_calls, "counter",
+))
+metrics.registry.register(metrics.CallbackMetric(
+    "rate_limited_requests_total", "Generation requests rejected by the rate limiter.", (), _rate_limited, "counter",
+))
+
+@metrics_blueprint.route("/metrics", methods=["GET"])
+def get_metrics():
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
@@ -1,19 +1,26 @@
 from flask import jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from app.routes import user_blueprint
-from app.models import db
+from app.models import db, read_session
 from app.repositories.user_repository import UserRepository
+from app.services.user_service import UserService
 
-user_repo = UserRepository(db.session)
+user_repo = UserRepository(db.session, read_session=read_session)
+user_service = UserService(user_repo)
 
 @user_blueprint.route("/profile", methods=["GET"])
 @jwt_required()
 def get_profile():
     current_user_id = int(get_jwt_identity())
-    user = user_repo.find_by_id(current_user_id)
-    if not user:
+    claims = get_jwt()
+    if "username" in claims:
+        return jsonify({
+            "id": current_user_id,
+            "username": claims["username"]
+        }), 200
+
+    # Tokens issued before profile claims existed fall back to the cache/DB.
+    profile = user_service.get_profile(current_user_id)
+    if not profile:
         return jsonify({"message": "User not found"}), 404
-    return jsonify({
-        "id": user.id,
-        "username": user.username
-    }), 200
+    return jsonify(profile), 200
@@ -1,17 +1,228 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+from flask import current_app, has_app_context
+from app import metrics
+from app.config import Config
+from app.log_config import payload
+from app.models import db
 from app.providers.base_ai_provider import BaseAIProvider
+from app.providers.provider_factory import create_provider
+from app.providers.router_provider import RouterProvider
+from app.repositories.cached_response_repository import CachedResponseRepository
+from app.services.lru_cache import LRUCache
+from app.services.response_cache import ResponseCache, build_request_key
+from app.services.semantic_cache import SemanticCache, create_semantic_cache, scope_key
+from app.services.single_flight import SingleFlight
+from app.services.token_budget import MESSAGE_OVERHEAD_TOKENS, TokenBudgeter
 
 logger = logging.getLogger(__name__)
 
+class Generation(NamedTuple):
+    text: str
+    # The model that produced `text`; for a router, the backend that answered.
+    model: str
+    # The prompt as sent, i.e. after any AI_PROMPT_OVERFLOW=truncate.
+    prompt: str
+
 class AIService:
-    def __init__(self, provider: BaseAIProvider):
+    def __init__(self, provider: BaseAIProvider, cache: ResponseCache = None,
+                 single_flight: SingleFlight = None, budgeter: TokenBudgeter = None,
+                 semantic_cache: SemanticCache = None):
         self.provider = provider
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.single_flight = single_flight
+        self.budgeter = budgeter
     
-    def generate_text(self, prompt: str) -> str:
+    def generate_text(self, prompt: str, use_cache: bool = True, params: dict = None) -> str:
+        return self.generate(prompt, use_cache, params).text
+
+    @metrics.timed("ai_service")
+    def generate(self, prompt: str, use_cache: bool = True, params: dict = None) -> Generation:
+        """
+        `params` holds optional generation parameters (model, max_tokens,
+        temperature, stop) passed through to the provider.
+        """
+        params = params or {}
+        prompt = self._prepare_prompt(prompt, params)
+
+        key = None
+        if self.cache or self.single_flight:
+            key = build_request_key(prompt, self.model_for(params), _without_model(params))
+
+        if self.cache and use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info("Serving generated text from cache")
+                return Generation(cached.text, cached.model or self.model_for(params), prompt)
+
+        scope = None
+        if self.semantic_cache:
+            scope = scope_key(self.model_for(params), _without_model(params))
+            if use_cache:
+                similar = self.semantic_cache.get(prompt, scope)
+                if similar is not None:
+                    logger.info("Serving generated text from semantic cache")
+                    return Generation(similar.text, similar.model or self.model_for(params), prompt)
+        
+        logger.info("Sending prompt to provider: %s", payload(prompt))
+        call = lambda: self._generation(prompt, params, lambda: self.provider.generate_text(prompt, **params))
+        if self.single_flight:
+            # Identical prompts already in flight share that upstream call.
+            generation = self.single_flight.do(key, call)
+        else:
+            generation = call()
+        logger.info("Received generated text: %s", payload(generation.text))
+
+        # Bypassed requests still refresh the entry for later callers.
+        if self.cache:
+            self.cache.set(key, generation.text, generation.model)
+        if self.semantic_cache:
+            self.semantic_cache.set(prompt, scope, generation.text, generation.model)
+        return generation
+
+    def generate_chat(self, messages: List[Dict[str, str]], params: dict = None) -> str:
+        return self.chat(messages, params).text
+
+    @metrics.timed("ai_service")
+    def chat(self, messages: List[Dict[str, str]], params: dict = None) -> Generation:
+        """
+        Generates the next assistant turn for a message list ending in the
+        new user prompt. Earlier messages count against the context window
+        but only the final prompt is ever truncated. Not cached: the history
+        makes every request unique.
+        """
+        params = params or {}
+        history, last = messages[:-1], messages[-1]
+        model = self.model_for(params)
+        reserved = 0
+        if self.budgeter:
+            reserved = sum(self.budgeter.count(m["content"], model) + MESSAGE_OVERHEAD_TOKENS for m in history)
+        content = self._prepare_prompt(last["content"], params, reserved)
+        messages = history + [{**last, "content": content}]
+
+        logger.info("Sending %d messages to provider: %s", len(messages), payload(content))
+        generation = self._generation(content, params, lambda: self.provider.generate_chat(messages, **params))
+        logger.info("Received generated text: %s", payload(generation.text))
+        return generation
+
+    def generate_batch(self, prompts: List[str], max_parallel: int, use_cache: bool = True,
+                       params: dict = None) -> Iterator[tuple]:
+        """
+        Generates every prompt with at most `max_parallel` provider calls at
+        once, yielding (index, Generation, error) tuples in completion order.
+        """
+        workers = max(1, min(max_parallel, len(prompts)))
+        generate = _with_app_context(self.generate)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-generate") as pool:
+            futures = {
+                pool.submit(generate, prompt, use_cache, params): index
+                for index, prompt in enumerate(prompts)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    yield index, future.result(), None
+                except Exception as e:
+                    logger.warning("Batch item %d failed: %s", index, e)
+                    yield index, None, e
+
+    def stream_text(self, prompt: str, params: dict = None) -> Iterator[str]:
+        return self.stream(prompt, params)[1]
+
+    def stream(self, prompt: str, params: dict = None) -> Tuple[str, Iterator[str]]:
+        """
+        Returns the prompt as sent (after any truncation) and the stream of
+        deltas. Validation happens eagerly so callers can reject the request
+        before any bytes of the stream are sent.
+        """
+        params = params or {}
+        prompt = self._prepare_prompt(prompt, params)
+
+        logger.info("Streaming prompt to provider: %s", payload(prompt))
+        return prompt, self.provider.stream_text(prompt, **params)
+
+    def model_for(self, params: dict = None) -> str:
+        return (params or {}).get("model") or self.provider.model
+
+    def answered_model(self, params: dict = None) -> str:
+        """
+        Like model_for(), but after a provider call on this thread it names
+        the model that actually answered (a router's chosen backend).
+        """
+        return (params or {}).get("model") or self.provider.answered_model()
+
+    def _generation(self, prompt: str, params: dict, call: Callable[[], str]) -> Generation:
+        # Runs on the thread that made the provider call, so the answered
+        # model belongs to this call.
+        return Generation(self._call_provider(call), self.answered_model(params), prompt)
+
+    def _prepare_prompt(self, prompt: str, params: dict, reserved: int = 0) -> str:
+        self.validate_prompt(prompt)
+        if self.budgeter:
+            prompt = self.budgeter.fit(prompt, self.model_for(params), params.get("max_tokens"), reserved)
+        return prompt
+
+    @metrics.timed("provider")
+    def _call_provider(self, call: Callable[[], str]) -> str:
+        try:
+            return call()
+        except Exception:
+            if metrics.enabled:
+                metrics.provider_errors.inc(self.provider.model)
+            raise
+
+    def validate_prompt(self, prompt: str):
         if not prompt or prompt.strip() == "":
             raise ValueError("Prompt cannot be empty")
-        
-        logger.info("Sending prompt to provider: %s", prompt)
-        result = self.provider.generate_text(prompt)
-        logger.info("Received generated text: %s", result)
-        return result
+
+def create_ai_service() -> AIService:
+    response_cache = None
+    if Config.RESPONSE_CACHE_ENABLED:
+        response_cache = ResponseCache(
+            LRUCache(max_bytes=Config.RESPONSE_CACHE_MAX_BYTES, ttl=Config.RESPONSE_CACHE_TTL),
+            shared=CachedResponseRepository(db.session) if Config.RESPONSE_CACHE_BACKEND == "sql" else None,
+            ttl=Config.RESPONSE_CACHE_TTL,
+        )
+    provider = create_provider()
+    return AIService(
+        provider,
+        cache=response_cache,
+        single_flight=SingleFlight() if Config.SINGLE_FLIGHT_ENABLED else None,
+        budgeter=TokenBudgeter(
+            context_windows(provider),
+            default_context=Config.AI_DEFAULT_CONTEXT_TOKENS,
+            overflow=Config.AI_PROMPT_OVERFLOW,
+        ),
+        semantic_cache=create_semantic_cache() if Config.SEMANTIC_CACHE_ENABLED else None,
+    )
+
+def context_windows(provider: BaseAIProvider) -> Dict[str, int]:
+    """
+    AI_ALLOWED_MODELS plus the windows providers report themselves. A router
+    gets the smallest window of its backends, since any of them may answer.
+    """
+    windows = dict(Config.AI_ALLOWED_MODELS)
+    backends = [b.provider for b in provider.backends] if isinstance(provider, RouterProvider) else [provider]
+    for backend in backends:
+        if backend.context_window:
+            windows[backend.model] = backend.context_window
+    if isinstance(provider, RouterProvider):
+        windows[provider.model] = min(windows.get(b.model, Config.AI_DEFAULT_CONTEXT_TOKENS) for b in backends)
+    return windows
+
+def _with_app_context(fn: Callable) -> Callable:
+    # Pool threads do not inherit the caller's app context, which the SQL
+    # cache backend needs for db.session; each call gets its own.
+    if not has_app_context():
+        return fn
+    app = current_app._get_current_object()
+    def run(*args):
+        with app.app_context():
+            return fn(*args)
+    return run
+
+def _without_model(params: dict) -> dict:
+    # The model is already part of the cache key on its own.
+    return {name: value for name, value in params.items() if name != "model"}
@@ -0,0 +1,102 @@
+import threading
+import zlib
+from typing import Optional, Tuple
+from sqlalchemy import text
+from app.config import Config
+
+# Policy for newly written bodies; tests and migrations may override it.
+codec = Config.BODY_COMPRESSION
+min_bytes = Config.BODY_COMPRESSION_MIN_BYTES
+
+# The first byte of every blob names its codec, so rows written under an
+# older setting stay readable after BODY_COMPRESSION changes.
+_HEADERS = {"zstd": b"\x01", "lz4": b"\x02", "zlib": b"\x03"}
+_CODECS = {header: name for name, header in _HEADERS.items()}
+_local = threading.local()
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("pip install zstandard to use BODY_COMPRESSION=zstd")
+    # Compression contexts are not thread-safe; keep one per thread.
+    if not hasattr(_local, "zstd"):
+        _local.zstd = (zstandard.ZstdCompressor(level=3), zstandard.ZstdDecompressor())
+    return _local.zstd
+
+def _lz4():
+    try:
+        import lz4.frame
+    except ImportError:
+        raise RuntimeError("pip install lz4 to use BODY_COMPRESSION=lz4")
+    return lz4.frame
+
+def _compress(name: str, data: bytes) -> bytes:
+    if name == "zstd":
+        return _zstd()[0].compress(data)
+    if name == "lz4":
+        return _lz4().compress(data)
+    return zlib.compress(data, 6)
+
+def _decompress(name: str, data: bytes) -> bytes:
+    if name == "zstd":
+        return _zstd()[1].decompress(data)
+    if name == "lz4":
+        return _lz4().decompress(data)
+    return zlib.decompress(data)
+
+def encode_body(body: str, codec_name: str = None, threshold: int = None) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Returns the (text, blob) column pair for a body: the text unchanged when
+    compression is off or the body is small, otherwise a compressed blob.
+    """
+    codec_name = codec if codec_name is None else codec_name
+    threshold = min_bytes if threshold is None else threshold
+    if body is None or codec_name == "none":
+        return body, None
+    data = body.encode("utf-8")
+    if len(data) < threshold:
+        return body, None
+    compressed = _compress(codec_name, data)
+    if len(compressed) + 1 >= len(data):
+        return body, None
+    return None, _HEADERS[codec_name] + compressed
+
+def decode_body(body: Optional[str], blob: Optional[bytes]) -> Optional[str]:
+    if blob is None:
+        return body
+    blob = bytes(blob)
+    return _decompress(_CODECS[blob[:1]], blob[1:]).decode("utf-8")
+
+def rewrite_bodies(connection, codec_name: str, threshold: int, batch_size: int = 1000) -> int:
+    """
+    Re-encodes every stored body under the given policy, `batch_size` rows
+    at a time in id order. Used by migrations; returns rows changed.
+    """
+    changed = 0
+    after = 0
+    while True:
+        rows = connection.execute(text(
+            'SELECT id, "timestamp", prompt, response, prompt_blob, response_blob FROM generated_texts '
+            "WHERE id > :after ORDER BY id LIMIT :limit"
+        ), {"after": after, "limit": batch_size}).fetchall()
+        if not rows:
+            return changed
+        updates = []
+        for row in rows:
+            prompt, prompt_blob = encode_body(decode_body(row.prompt, row.prompt_blob), codec_name, threshold)
+            response, response_blob = encode_body(decode_body(row.response, row.response_blob), codec_name, threshold)
+            if (prompt_blob, response_blob) != (row.prompt_blob, row.response_blob):
+                updates.append({
+                    "id": row.id, "timestamp": row.timestamp,
+                    "prompt": prompt, "prompt_blob": prompt_blob,
+                    "response": response, "response_blob": response_blob,
+                })
+        if updates:
+            connection.execute(text(
+                "UPDATE generated_texts SET prompt = :prompt, prompt_blob = :prompt_blob, "
+                "response = :response, response_blob = :response_blob "
+                'WHERE id = :id AND "timestamp" = :timestamp'
+            ), updates)
+            changed += len(updates)
+        after = rows[-1].id
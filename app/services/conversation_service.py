@@ -0,0 +1,79 @@
+import logging
+from typing import Dict, List
+from app.models import Conversation, GeneratedText
+from app.repositories.conversation_repository import ConversationRepository
+from app.services.ai_service import AIService
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_INSTRUCTIONS = (
+    "Summarize the conversation below for use as context in later turns. "
+    "Keep facts, names, decisions and open questions; drop pleasantries. "
+    "Reply with the summary only."
+)
+
+class ConversationService:
+    """
+    Builds the message list for a conversation turn server-side. Only turns
+    after the stored summary are loaded; when they outgrow `history_tokens`
+    the older ones are folded into the summary once and never resent, so
+    each turn costs roughly the new tokens rather than the whole thread.
+    """
+    def __init__(self, ai_service: AIService, conversation_repo: ConversationRepository,
+                 history_tokens: int = 3000, keep_turns: int = 4, summary_max_tokens: int = 300):
+        self.ai_service = ai_service
+        self.conversation_repo = conversation_repo
+        self.history_tokens = history_tokens
+        self.keep_turns = keep_turns
+        self.summary_max_tokens = summary_max_tokens
+
+    def send_message(self, conversation: Conversation, prompt: str, params: dict = None) -> GeneratedText:
+        params = params or {}
+        self.ai_service.validate_prompt(prompt)
+        model = self.ai_service.model_for(params)
+
+        turns = self.conversation_repo.turns_since(conversation, conversation.summary_through_id)
+        if len(turns) > self.keep_turns and self._count_turns(turns, model) > self.history_tokens:
+            turns = self._compact(conversation, turns, params)
+
+        generation = self.ai_service.chat(self.build_messages(conversation, turns, prompt), params)
+        return self.conversation_repo.add_turn(
+            conversation, generation.prompt, generation.text, model=generation.model, params=params
+        )
+
+    def build_messages(self, conversation: Conversation, turns: List[GeneratedText],
+                       prompt: str) -> List[Dict[str, str]]:
+        messages = []
+        if conversation.summary:
+            messages.append({"role": "system", "content": "Summary of the conversation so far:\n" + conversation.summary})
+        for turn in turns:
+            messages.append({"role": "user", "content": turn.prompt})
+            messages.append({"role": "assistant", "content": turn.response})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _compact(self, conversation: Conversation, turns: List[GeneratedText], params: dict) -> List[GeneratedText]:
+        evicted, kept = turns[:len(turns) - self.keep_turns], turns[len(turns) - self.keep_turns:]
+        sections = [SUMMARY_INSTRUCTIONS]
+        if conversation.summary:
+            sections.append("Earlier summary:\n" + conversation.summary)
+        sections.append("New turns:\n" + _transcript(evicted))
+
+        logger.info("Compacting %d turns of conversation %d", len(evicted), conversation.id)
+        # The model is only forwarded when the client chose one; otherwise
+        # the provider uses its own default (a router has no model to send).
+        summary_params = {"max_tokens": self.summary_max_tokens}
+        if params.get("model"):
+            summary_params["model"] = params["model"]
+        summary = self.ai_service.generate_text("\n\n".join(sections), use_cache=False, params=summary_params)
+        self.conversation_repo.update_summary(conversation, summary, evicted[-1].id)
+        return kept
+
+    def _count_turns(self, turns: List[GeneratedText], model: str) -> int:
+        budgeter = self.ai_service.budgeter
+        if budgeter is None:
+            return sum(len(t.prompt) + len(t.response) for t in turns) // 4
+        return sum(budgeter.count(t.prompt, model) + budgeter.count(t.response, model) for t in turns)
+
+def _transcript(turns: List[GeneratedText]) -> str:
+    return "\n".join(f"user: {t.prompt}\nassistant: {t.response}" for t in turns)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+class SchedulerOverloaded(Exception):
+    pass
+
+class SchedulerTimeout(TimeoutError):
+    pass
+
+class GenerationScheduler:
+    """
+    Runs upstream generation coroutines on one shared event loop.
+
+    At most `max_in_flight` coroutines run at once; the rest wait in a queue
+    bounded by `max_queued` and give up once their deadline passes.
+    """
+    def __init__(self, max_in_flight: int = 64, max_queued: int = 1024, queue_timeout: float = 30.0):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._semaphore = None
+        self._pid = None
+        self.queued = 0
+        self.in_flight = 0
+
+    def submit(self, coro_factory: Callable[[], Awaitable], timeout: float = None) -> Future:
+        loop = self._ensure_loop()
+        with self._lock:
+            if self.queued >= self.max_queued:
+                raise SchedulerOverloaded("Too many generations queued")
+            self.queued += 1
+
+        timeout = self.queue_timeout if timeout is None else timeout
+        return asyncio.run_coroutine_threadsafe(self._run(coro_factory, timeout), loop)
+
+    def run(self, coro_factory: Callable[[], Awaitable], timeout: float = None):
+        return self.submit(coro_factory, timeout).result()
+
+    async def _run(self, coro_factory, timeout):
+        if self._semaphore is None:
+            # Created on the loop thread so it binds to the scheduler's loop.
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise SchedulerTimeout("Timed out waiting for a free generation slot")
+        finally:
+            with self._lock:
+                self.queued -= 1
+
+        self.in_flight += 1
+        try:
+            return await coro_factory()
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def _ensure_loop(self):
+        # The loop thread does not survive a fork, so each worker process
+        # starts its own on first use.
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._semaphore = None
+                self._pid = os.getpid()
+                self.queued = 0
+                self.in_flight = 0
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="generation-scheduler",
+                    daemon=True,
+                ).start()
+                logger.info("Started generation scheduler with %d slots", self.max_in_flight)
+            return self._loop
@@ -0,0 +1,100 @@
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime
+from typing import List
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+TABLE = "generated_texts"
+_PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month:%Y_%m}"
+
+class PartitionMaintenance:
+    """
+    Keeps the monthly range partitions of generated_texts ahead of the
+    calendar and retires old months as whole partitions: each is archived
+    to a gzipped COPY file, then detached and dropped, so retention never
+    runs a row-by-row DELETE.
+    """
+    def __init__(self, session):
+        self.session = session
+
+    def partitions(self) -> List[date]:
+        rows = self.session.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ), {"table": TABLE})
+        months = []
+        for (name,) in rows:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    def create_ahead(self, months_ahead: int, today: date = None) -> List[str]:
+        """Creates any missing partitions from this month to `months_ahead` later."""
+        today = today or datetime.utcnow().date()
+        current = date(today.year, today.month, 1)
+        existing = set(self.partitions())
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            name = partition_name(month)
+            # Fails if the default partition already holds rows for this
+            # month; run this ahead of time so it never does.
+            self.session.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+        self.session.commit()
+        for name in created:
+            logger.info("Created partition %s", name)
+        return created
+
+    def apply_retention(self, keep_months: int, archive_dir: str, today: date = None) -> List[str]:
+        """
+        Archives and drops partitions that end before the first day of the
+        month `keep_months` months ago. Returns the archive file paths.
+        """
+        today = today or datetime.utcnow().date()
+        cutoff = add_months(date(today.year, today.month, 1), -keep_months)
+        os.makedirs(archive_dir, exist_ok=True)
+        archived = []
+        for month in self.partitions():
+            if add_months(month, 1) > cutoff:
+                continue
+            name = partition_name(month)
+            path = os.path.join(archive_dir, f"{name}.tsv.gz")
+            self._archive(name, path)
+            self.session.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+            self.session.execute(text(f"DROP TABLE {name}"))
+            self.session.commit()
+            logger.info("Archived partition %s to %s", name, path)
+            archived.append(path)
+        return archived
+
+    def _archive(self, name: str, path: str):
+        # COPY text format; restore with COPY generated_texts FROM STDIN.
+        partial = path + ".partial"
+        connection = self.session.connection()
+        cursor = connection.connection.cursor()
+        try:
+            with gzip.open(partial, "wb") as f:
+                cursor.copy_expert(f"COPY {name} TO STDOUT", f)
+        finally:
+            cursor.close()
+        os.replace(partial, path)
@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from passlib.hash import bcrypt
+from app.config import Config
+
+class HasherOverloaded(Exception):
+    pass
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(password)
+
+def _verify(password: str, password_hash: str) -> bool:
+    return bcrypt.verify(password, password_hash)
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded process pool so hashing cannot pin the CPU of
+    request threads. Once `max_pending` operations are queued, new ones are
+    rejected immediately with HasherOverloaded. `workers=0` hashes inline.
+    """
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 32, timeout: float = 10.0):
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self._pending = threading.BoundedSemaphore(max_pending) if max_pending else None
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run(_verify, password, password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return bcrypt.using(rounds=self.rounds).needs_update(password_hash)
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+
+        if self._pending is not None and not self._pending.acquire(blocking=False):
+            raise HasherOverloaded("Too many password operations in progress")
+        try:
+            future = self._executor().submit(fn, *args)
+        except BaseException:
+            if self._pending is not None:
+                self._pending.release()
+            raise
+        # The slot is freed when the operation finishes (or is cancelled
+        # while still queued), not when a timed-out caller stops waiting.
+        if self._pending is not None:
+            future.add_done_callback(lambda _: self._pending.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HasherOverloaded("Password operation timed out")
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # Pools are per process: a forked web worker must not reuse the
+        # parent's. Children are spawned rather than forked because the
+        # caller is multi-threaded.
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+password_hasher = PasswordHasher(
+    rounds=Config.BCRYPT_ROUNDS,
+    workers=Config.PASSWORD_HASH_WORKERS,
+    max_pending=Config.PASSWORD_HASH_MAX_PENDING,
+    timeout=Config.PASSWORD_HASH_TIMEOUT,
+)
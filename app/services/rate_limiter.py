@@ -0,0 +1,87 @@
+import hashlib
+import threading
+import time
+from typing import List, Tuple
+
+# (bucket key, amount to take, refill rate per second, capacity)
+Limit = Tuple[str, float, float, float]
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+def refill(tokens: float, elapsed: float, rate: float, capacity: float) -> float:
+    return min(capacity, tokens + max(0.0, elapsed) * rate)
+
+class InMemoryRateLimitBackend:
+    """
+    Token buckets held in process memory; correct for a single process only.
+    """
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume_all(self, limits: List[Limit]) -> float:
+        """
+        Takes from every bucket or from none. Returns 0 when allowed,
+        otherwise the seconds until all buckets could cover the request.
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            wait = 0.0
+            for key, amount, rate, capacity in limits:
+                tokens, updated = self._buckets.get(key, (capacity, now))
+                tokens = refill(tokens, now - updated, rate, capacity)
+                levels.append(tokens)
+                if tokens < amount:
+                    wait = max(wait, (amount - tokens) / rate)
+
+            for (key, amount, _, _), tokens in zip(limits, levels):
+                self._buckets[key] = (tokens if wait else tokens - amount, now)
+            return wait
+
+class RateLimiter:
+    """
+    Admission control for generation requests: requests per second and
+    estimated tokens per minute, per user and globally per upstream key.
+    A limit of 0 disables that bucket.
+    """
+    def __init__(self, backend, upstream_key: str, user_rps: float = 0, user_burst: float = 0,
+                 user_tpm: float = 0, global_rps: float = 0, global_tpm: float = 0):
+        self.backend = backend
+        # Never keep the raw API key in bucket names (they may be stored).
+        self.upstream = hashlib.sha256(upstream_key.encode("utf-8")).hexdigest()[:12]
+        self.user_rps = user_rps
+        self.user_burst = user_burst or user_rps
+        self.user_tpm = user_tpm
+        self.global_rps = global_rps
+        self.global_tpm = global_tpm
+        self.rejected = 0
+
+    def check(self, user_id: int, requests: int = 1, tokens: int = 0):
+        limits = []
+        if self.user_rps:
+            limits.append(self._limit(f"user:{user_id}:requests", requests, self.user_rps, self.user_burst))
+        if self.user_tpm:
+            limits.append(self._limit(f"user:{user_id}:tokens", tokens, self.user_tpm / 60, self.user_tpm))
+        if self.global_rps:
+            limits.append(self._limit(f"global:{self.upstream}:requests", requests, self.global_rps, self.global_rps))
+        if self.global_tpm:
+            limits.append(self._limit(f"global:{self.upstream}:tokens", tokens, self.global_tpm / 60, self.global_tpm))
+        if not limits:
+            return
+
+        wait = self.backend.consume_all(limits)
+        if wait > 0:
+            self.rejected += 1
+            raise RateLimitExceeded(wait)
+
+    def _limit(self, key: str, amount: float, rate: float, capacity: float) -> Limit:
+        # A request larger than the whole bucket would otherwise never pass.
+        return key, min(amount, capacity), rate, capacity
+
+def estimate_tokens(prompt: str, completion_tokens: int) -> int:
+    # Roughly four characters per token for English text.
+    return len(prompt) // 4 + 1 + completion_tokens
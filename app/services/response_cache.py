@@ -0,0 +1,80 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import NamedTuple, Optional
+from app.services.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+def build_request_key(prompt: str, model: str, params: dict = None) -> str:
+    # Whitespace differences never change what the model is asked, so they
+    # should not produce distinct keys.
+    normalized = " ".join(prompt.split())
+    payload = json.dumps(
+        {"prompt": normalized, "model": model, "params": params or {}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class CachedText(NamedTuple):
+    text: str
+    # The model that generated the text; a router only knows which backend
+    # answered at generation time.
+    model: Optional[str] = None
+
+class ResponseCache:
+    """
+    Two-level prompt/response cache: an in-process LRU in front of an
+    optional shared backend exposing get(key) -> (text, model) and
+    set(key, text, ttl, model).
+    """
+    def __init__(self, local: LRUCache, shared=None, ttl: float = 3600):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedText]:
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self._shared_get(key)
+            if value is not None:
+                self.local.set(key, value, self.ttl)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, text: str, model: str = None):
+        self.local.set(key, CachedText(text, model), self.ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, text, self.ttl, model)
+            except Exception:
+                logger.exception("Failed to write shared cache entry")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.local),
+            "bytes": self.local.current_bytes,
+        }
+
+    def _shared_get(self, key: str) -> Optional[CachedText]:
+        # A broken shared backend degrades to a miss rather than failing
+        # the generation.
+        try:
+            value = self.shared.get(key)
+            return None if value is None else CachedText(*value)
+        except Exception:
+            logger.exception("Failed to read shared cache entry")
+            return None
@@ -0,0 +1,382 @@
+import atexit
+import fcntl
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from array import array
+from typing import List, Optional, Tuple
+from app.config import Config
+from app.services.lru_cache import LRUCache
+from app.services.response_cache import CachedText
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# Numbers and capitalized words (names, places) in the order they appear.
+_SALIENT = re.compile(r"\d+(?:[.,]\d+)*|\b[A-Z]\w*")
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("The semantic cache requires numpy (pip install numpy)")
+    return numpy
+
+def normalize(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+def salient_tokens(text: str) -> str:
+    return " ".join(_SALIENT.findall(text))
+
+def scope_key(model: str, params: dict = None) -> str:
+    # Only prompts generated with the same model and parameters may share
+    # a response.
+    return json.dumps({"model": model, "params": params or {}}, sort_keys=True)
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder: signed feature hashing of lowercased words and
+    character trigrams into `dim` buckets, L2-normalized. A bag of features:
+    word order is lost and a dropped "not" barely moves the score, so it is
+    only safe for casing, whitespace and punctuation variants, which is all
+    SemanticCache lets it match. crc32 keeps vectors stable across
+    processes, so saved indexes stay valid.
+    """
+    word_order = False
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def __call__(self, text: str):
+        np = _numpy()
+        words = _WORD.findall(text.lower())
+        features = list(words)
+        for word in words:
+            padded = f" {word} "
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class SentenceTransformerEmbedder:
+    """Local CPU embedding model from sentence-transformers."""
+    word_order = True
+
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise RuntimeError("pip install sentence-transformers to use a model embedder")
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers:{model_name}"
+
+    def __call__(self, text: str):
+        return self.model.encode(text, normalize_embeddings=True).astype("float32")
+
+def create_embedder(spec: str):
+    # "hashing[:dim]" or "sentence-transformers:<model name>"
+    kind, _, arg = spec.partition(":")
+    if kind == "hashing":
+        return HashingEmbedder(int(arg or 256))
+    if kind == "sentence-transformers":
+        return SentenceTransformerEmbedder(arg or "all-MiniLM-L6-v2")
+    raise ValueError(f"Unknown semantic cache embedder: {spec}")
+
+class FlatIndex:
+    """
+    Exact inner-product search over one float32 matrix. Linear in the number
+    of entries: fine up to about 10k, use HnswIndex beyond that.
+    """
+    filename = "vectors.npy"
+
+    def __init__(self, dim: int, capacity: int):
+        np = _numpy()
+        self.dim = dim
+        self.capacity = capacity
+        self.count = 0
+        self.vectors = np.zeros((min(capacity, 1024), dim), dtype=np.float32)
+
+    def add(self, slot: int, vector):
+        if slot >= len(self.vectors):
+            np = _numpy()
+            grown = np.zeros((min(self.capacity, 2 * len(self.vectors)), self.dim), dtype=np.float32)
+            grown[:self.count] = self.vectors[:self.count]
+            self.vectors = grown
+        self.vectors[slot] = vector
+        self.count = max(self.count, slot + 1)
+
+    def add_batch(self, slots: List[int], vectors):
+        for slot, vector in zip(slots, vectors):
+            self.add(slot, vector)
+
+    def search(self, vector, k: int) -> List[Tuple[int, float]]:
+        if self.count == 0:
+            return []
+        np = _numpy()
+        scores = self.vectors[:self.count] @ vector
+        k = min(k, self.count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(slot), float(scores[slot])) for slot in top]
+
+    def save(self, directory: str):
+        _numpy().save(os.path.join(directory, self.filename), self.vectors[:self.count])
+
+    def load(self, directory: str):
+        vectors = _numpy().load(os.path.join(directory, self.filename))
+        self.count = len(vectors)
+        self.vectors = _numpy().zeros((max(self.count, min(self.capacity, 1024)), self.dim), dtype="float32")
+        self.vectors[:self.count] = vectors
+
+class HnswIndex:
+    """
+    Approximate nearest-neighbour search with hnswlib; sub-millisecond
+    lookups at millions of entries. `ef_search` trades recall for latency.
+    """
+    filename = "hnsw.bin"
+
+    def __init__(self, dim: int, capacity: int, m: int = 16, ef_construction: int = 100, ef_search: int = 64):
+        try:
+            import hnswlib
+        except ImportError:
+            raise RuntimeError("pip install hnswlib to use the hnsw semantic cache index")
+        self.dim = dim
+        self.capacity = capacity
+        self.ef_search = ef_search
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        self.index.init_index(max_elements=capacity, M=m, ef_construction=ef_construction)
+        self.index.set_ef(ef_search)
+
+    @property
+    def count(self) -> int:
+        return self.index.get_current_count()
+
+    def add(self, slot: int, vector):
+        # Re-adding an existing label replaces its vector.
+        self.index.add_items(vector.reshape(1, -1), [slot])
+
+    def add_batch(self, slots: List[int], vectors):
+        # hnswlib builds the graph on all cores for a batch.
+        self.index.add_items(vectors, slots, num_threads=-1)
+
+    def search(self, vector, k: int) -> List[Tuple[int, float]]:
+        k = min(k, self.count)
+        if k == 0:
+            return []
+        labels, distances = self.index.knn_query(vector.reshape(1, -1), k=k)
+        # Inner-product distance is 1 - similarity.
+        return [(int(slot), 1.0 - float(d)) for slot, d in zip(labels[0], distances[0])]
+
+    def save(self, directory: str):
+        self.index.save_index(os.path.join(directory, self.filename))
+
+    def load(self, directory: str):
+        self.index.load_index(os.path.join(directory, self.filename), max_elements=self.capacity)
+        self.index.set_ef(self.ef_search)
+
+class SemanticCache:
+    """
+    Near-duplicate prompt cache. Each stored prompt is embedded into a vector
+    index; a lookup returns the response of the most similar stored prompt
+    with the same scope (model and parameters) if the cosine similarity is
+    at least `threshold`. Once `index.capacity` entries exist, new entries
+    overwrite the oldest, and entries older than `ttl` seconds never hit.
+
+    Similar vectors are not enough for a hit: with an embedder that ignores
+    word order the normalized prompts must be equal, otherwise the numbers
+    and names in both prompts must match in order. Swapped names or a
+    changed figure then miss instead of serving another prompt's answer.
+    """
+    def __init__(self, embedder, index, threshold: float = 0.98, candidates: int = 4, ttl: float = None):
+        self.embedder = embedder
+        self.index = index
+        self.threshold = threshold
+        self.candidates = candidates
+        self.ttl = ttl
+        self._guard = salient_tokens if getattr(embedder, "word_order", False) else normalize
+        self.hits = 0
+        self.misses = 0
+        self._responses = []
+        self._models = []
+        self._guards = []
+        # Wall-clock expiry per slot (0 = never), so it survives a reload.
+        self._expires = array("d")
+        self._scope_ids = array("i")
+        self._scopes = {}
+        self._next_slot = 0
+        # Bumped by every write; save_if_changed() skips unchanged caches.
+        self._version = 0
+        self._saved_version = 0
+        # get() and the set() that follows a miss embed the same prompt.
+        self._vectors = LRUCache(max_entries=256)
+        self._lock = threading.Lock()
+
+    def get(self, prompt: str, scope: str) -> Optional[CachedText]:
+        vector = self._embed(prompt)
+        guard = self._guard(prompt)
+        now = time.time()
+        with self._lock:
+            scope_id = self._scopes.get(scope)
+            response = None
+            if scope_id is not None:
+                for slot, score in self.index.search(vector, self.candidates):
+                    if score < self.threshold:
+                        break
+                    if (
+                        self._scope_ids[slot] == scope_id and self._guards[slot] == guard
+                        and not 0 < self._expires[slot] <= now
+                    ):
+                        response = CachedText(self._responses[slot], self._models[slot])
+                        break
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return response
+
+    def set(self, prompt: str, scope: str, response: str, model: str = None):
+        vector = self._embed(prompt)
+        with self._lock:
+            slot = self._next_slot
+            self.index.add(slot, vector)
+            self._store(slot, scope, prompt, response, model)
+            self._next_slot = (slot + 1) % self.index.capacity
+            self._version += 1
+
+    def set_many(self, prompts: List[str], scope: str, responses: List[str], models: List[str] = None):
+        """Bulk insert, e.g. to warm the cache from stored history."""
+        np = _numpy()
+        vectors = np.stack([self.embedder(prompt) for prompt in prompts])
+        with self._lock:
+            slots = [(self._next_slot + i) % self.index.capacity for i in range(len(prompts))]
+            self.index.add_batch(slots, vectors)
+            for slot, prompt, response, model in zip(slots, prompts, responses, models or [None] * len(prompts)):
+                self._store(slot, scope, prompt, response, model)
+            self._next_slot = (self._next_slot + len(prompts)) % self.index.capacity
+            self._version += 1
+
+    def _store(self, slot: int, scope: str, prompt: str, response: str, model: str):
+        # Caller holds self._lock.
+        scope_id = self._scopes.setdefault(scope, len(self._scopes))
+        expires = time.time() + self.ttl if self.ttl else 0.0
+        if slot < len(self._responses):
+            self._responses[slot] = response
+            self._models[slot] = model
+            self._guards[slot] = self._guard(prompt)
+            self._expires[slot] = expires
+            self._scope_ids[slot] = scope_id
+        else:
+            self._responses.append(response)
+            self._models.append(model)
+            self._guards.append(self._guard(prompt))
+            self._expires.append(expires)
+            self._scope_ids.append(scope_id)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._responses),
+        }
+
+    def save(self, directory: str):
+        """
+        Writes the index and entries to a new snapshot directory, then points
+        the `current` symlink at it with one atomic rename, so readers never
+        see vectors and entries from different processes. Saves are
+        serialized across processes by a lock file; older snapshots are
+        removed.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            snapshot = f"snapshot-{time.time_ns()}-{os.getpid()}"
+            path = os.path.join(directory, snapshot)
+            os.makedirs(path)
+            with self._lock:
+                self.index.save(path)
+                with open(os.path.join(path, "entries.json"), "w") as f:
+                    json.dump({
+                        "embedder": self.embedder.name,
+                        "scopes": self._scopes,
+                        "scope_ids": self._scope_ids.tolist(),
+                        "responses": self._responses,
+                        "models": self._models,
+                        "guards": self._guards,
+                        "expires": self._expires.tolist(),
+                        "next_slot": self._next_slot,
+                    }, f)
+                self._saved_version = self._version
+            link = os.path.join(directory, f".current-{os.getpid()}")
+            os.symlink(snapshot, link)
+            os.replace(link, os.path.join(directory, "current"))
+            for name in os.listdir(directory):
+                if name.startswith("snapshot-") and name != snapshot:
+                    shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+    def save_if_changed(self, directory: str):
+        # A gunicorn master that preloaded the app never serves requests, so
+        # its copy never changes and it never overwrites a worker's snapshot.
+        if self._version != self._saved_version:
+            self.save(directory)
+
+    def load(self, directory: str) -> bool:
+        current = os.path.join(directory, "current")
+        if not os.path.exists(os.path.join(current, "entries.json")):
+            return False
+        # Resolve once so a concurrent save cannot swap the snapshot between
+        # reading the entries and the index.
+        current = os.path.realpath(current)
+        with open(os.path.join(current, "entries.json")) as f:
+            data = json.load(f)
+        if data["embedder"] != self.embedder.name:
+            logger.warning("Ignoring semantic cache built with %s", data["embedder"])
+            return False
+        if "guards" not in data:
+            logger.warning("Ignoring semantic cache snapshot without prompt guards")
+            return False
+        with self._lock:
+            self.index.load(current)
+            self._scopes = data["scopes"]
+            self._scope_ids = array("i", data["scope_ids"])
+            self._responses = data["responses"]
+            self._models = data.get("models") or [None] * len(self._responses)
+            self._guards = data["guards"]
+            self._expires = array("d", data["expires"])
+            self._next_slot = data["next_slot"]
+            self._saved_version = self._version
+        logger.info("Loaded %d semantic cache entries from %s", len(self._responses), directory)
+        return True
+
+    def _embed(self, prompt: str):
+        vector = self._vectors.get(prompt)
+        if vector is None:
+            vector = self.embedder(prompt)
+            self._vectors.set(prompt, vector)
+        return vector
+
+def create_semantic_cache() -> SemanticCache:
+    embedder = create_embedder(Config.SEMANTIC_CACHE_EMBEDDER)
+    if Config.SEMANTIC_CACHE_INDEX == "hnsw":
+        index = HnswIndex(embedder.dim, Config.SEMANTIC_CACHE_MAX_ENTRIES, ef_search=Config.SEMANTIC_CACHE_EF_SEARCH)
+    else:
+        index = FlatIndex(embedder.dim, Config.SEMANTIC_CACHE_MAX_ENTRIES)
+    cache = SemanticCache(embedder, index, threshold=Config.SEMANTIC_CACHE_THRESHOLD, ttl=Config.RESPONSE_CACHE_TTL)
+
+    if Config.SEMANTIC_CACHE_PATH:
+        cache.load(Config.SEMANTIC_CACHE_PATH)
+        atexit.register(cache.save_if_changed, Config.SEMANTIC_CACHE_PATH)
+    return cache
@@ -0,0 +1,132 @@
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator
+from app.repositories.generated_text_repository import EXPORT_COLUMNS
+
+EXPORT_FORMATS = ("ndjson", "parquet", "arrow")
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("pip install pyarrow to export or import Parquet/Arrow")
+    return pyarrow
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def ndjson_lines(rows: Iterable[dict]) -> Iterator[bytes]:
+    for row in rows:
+        yield (json.dumps(dict(row), default=_json_default, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _schema():
+    pa = _pyarrow()
+    return pa.schema([
+        ("id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("prompt", pa.large_string()),
+        ("response", pa.large_string()),
+        ("model", pa.string()),
+        # Free-form generation parameters stay JSON text in columnar files.
+        ("params", pa.string()),
+        ("conversation_id", pa.int64()),
+        ("timestamp", pa.timestamp("us")),
+    ])
+
+def _record_batches(rows: Iterable[dict], batch_size: int):
+    pa = _pyarrow()
+    schema = _schema()
+    columns = {name: [] for name in EXPORT_COLUMNS}
+    for row in rows:
+        for name in EXPORT_COLUMNS:
+            value = row[name]
+            columns[name].append(json.dumps(value) if name == "params" and value is not None else value)
+        if len(columns["id"]) >= batch_size:
+            yield pa.record_batch([columns[n] for n in EXPORT_COLUMNS], schema=schema)
+            columns = {name: [] for name in EXPORT_COLUMNS}
+    if columns["id"]:
+        yield pa.record_batch([columns[n] for n in EXPORT_COLUMNS], schema=schema)
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to a generator."""
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer.extend(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+def columnar_chunks(rows: Iterable[dict], fmt: str, batch_size: int = 10000) -> Iterator[bytes]:
+    """
+    Encodes rows as Parquet (one row group per batch) or an Arrow IPC
+    stream, yielding bytes as each batch is written so memory stays bounded
+    by one batch.
+    """
+    pa = _pyarrow()
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pa.parquet.ParquetWriter(sink, _schema(), compression="zstd")
+        write = writer.write_batch
+    else:
+        writer = pa.ipc.new_stream(sink, _schema())
+        write = writer.write_batch
+    for batch in _record_batches(rows, batch_size):
+        write(batch)
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
+
+def export_chunks(rows: Iterable[dict], fmt: str, batch_size: int = 10000) -> Iterator[bytes]:
+    if fmt == "ndjson":
+        return ndjson_lines(rows)
+    # Fails here, before a streamed response has started, without pyarrow.
+    _pyarrow()
+    return columnar_chunks(rows, fmt, batch_size)
+
+def read_rows(path: str, fmt: str, batch_size: int = 10000) -> Iterator[dict]:
+    """Streams rows back out of an export file."""
+    if fmt == "ndjson":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    if row.get("timestamp"):
+                        row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                    yield row
+        return
+
+    pa = _pyarrow()
+    if fmt == "parquet":
+        batches = pa.parquet.ParquetFile(path).iter_batches(batch_size=batch_size)
+    else:
+        batches = pa.ipc.open_stream(pa.memory_map(path))
+    for batch in batches:
+        for row in batch.to_pylist():
+            if row.get("params") is not None:
+                row["params"] = json.loads(row["params"])
+            yield row
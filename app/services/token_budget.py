@@ -0,0 +1,67 @@
+import functools
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Tokens the chat format adds around a single user message.
+MESSAGE_OVERHEAD_TOKENS = 8
+
+class PromptTooLong(ValueError):
+    pass
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+class TokenBudgeter:
+    """
+    Checks that a prompt plus the requested completion fits the model's
+    context window before any upstream call. Counts come from tiktoken when
+    it is installed, otherwise from a four-characters-per-token estimate.
+    `overflow` is "reject" (raise PromptTooLong) or "truncate" (keep the
+    start of the prompt).
+    """
+    def __init__(self, context_windows: Dict[str, int], default_context: int = 8192, overflow: str = "reject"):
+        self.context_windows = context_windows
+        self.default_context = default_context
+        self.overflow = overflow
+        self.truncated = 0
+
+    def count(self, text: str, model: str) -> int:
+        encoding = _encoding(model)
+        if encoding is None:
+            return len(text) // 4 + 1
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def fit(self, prompt: str, model: str, max_tokens: int = None, reserved: int = 0) -> str:
+        """
+        `reserved` counts tokens already committed elsewhere in the request,
+        such as earlier conversation turns sent alongside the prompt.
+        """
+        budget = (
+            self.context_windows.get(model, self.default_context)
+            - (max_tokens or 0) - reserved - MESSAGE_OVERHEAD_TOKENS
+        )
+        if budget <= 0:
+            raise PromptTooLong(f"max_tokens exceeds the context window of {model}")
+
+        tokens = self.count(prompt, model)
+        if tokens <= budget:
+            return prompt
+        if self.overflow != "truncate":
+            raise PromptTooLong(f"Prompt is {tokens} tokens; {model} allows {budget} with this max_tokens")
+
+        self.truncated += 1
+        logger.info("Truncating prompt from %d to %d tokens for %s", tokens, budget, model)
+        encoding = _encoding(model)
+        if encoding is None:
+            return prompt[:(budget - 1) * 4]
+        return encoding.decode(encoding.encode(prompt, disallowed_special=())[:budget])
@@ -1,17 +1,29 @@
-from passlib.hash import bcrypt
+import logging
+from app.config import Config
 from app.repositories.user_repository import UserRepository
 from app.models import User
+from app.services.lru_cache import LRUCache
+from app.services.password_hasher import PasswordHasher, HasherOverloaded
+
+logger = logging.getLogger(__name__)
+
+# Shared by every UserService in the process. Nothing updates the cached
+# fields (id, username), so entries are only refreshed by USER_CACHE_TTL;
+# code that starts changing them must delete the user's entry as well.
+user_cache = LRUCache(ttl=Config.USER_CACHE_TTL, max_entries=Config.USER_CACHE_MAX_ENTRIES)
 
 class UserService:
-    def __init__(self, user_repo: UserRepository):
+    def __init__(self, user_repo: UserRepository, hasher: PasswordHasher = None, cache: LRUCache = None):
         self.user_repo = user_repo
+        self.hasher = hasher or PasswordHasher(rounds=Config.BCRYPT_ROUNDS, workers=0)
+        self.cache = user_cache if cache is None else cache
     
     def register_user(self, username: str, password: str):
         exists = self.user_repo.find_by_username(username)
         if exists:
             raise ValueError("User already exists")
         
-        password_hash = bcrypt.hash(password)
+        password_hash = self.hasher.hash(password)
         new_user = self.user_repo.create_user(username, password_hash)
         return new_user
     
@@ -19,6 +31,28 @@ class UserService:
         user = self.user_repo.find_by_username(username)
         if not user:
             return None
-        if not bcrypt.verify(password, user.password_hash):
+        if not self.hasher.verify(password, user.password_hash):
             return None
+        if self.hasher.needs_rehash(user.password_hash):
+            self._rehash(user, password)
         return user
+
+    def get_profile(self, user_id: int) -> dict:
+        # Plain dicts are cached rather than ORM instances, which are bound
+        # to the session that loaded them.
+        profile = self.cache.get(user_id)
+        if profile is None:
+            user = self.user_repo.find_by_id(user_id)
+            if not user:
+                return None
+            profile = {"id": user.id, "username": user.username}
+            self.cache.set(user_id, profile)
+        return profile
+
+    def _rehash(self, user: User, password: str):
+        # The login already succeeded; failing to upgrade the hash must not
+        # turn it into an error, the next login will try again.
+        try:
+            self.user_repo.update_password_hash(user, self.hasher.hash(password))
+        except HasherOverloaded:
+            logger.warning("Skipped password rehash for user %s: hasher overloaded", user.id)
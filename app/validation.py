@@ -1,4 +1,5 @@
-from marshmallow import Schema, fields, validates_schema, ValidationError
+from marshmallow import Schema, fields, validate, validates_schema, ValidationError
+from app.config import Config
 
 class RegisterSchema(Schema):
     username = fields.Str(required=True)
@@ -8,5 +9,68 @@ class LoginSchema(Schema):
     username = fields.Str(required=True)
     password = fields.Str(required=True)
 
-class GenerateTextSchema(Schema):
-    prompt = fields.Str(required=True)
\ No newline at end of file
+GENERATION_PARAMS = ("model", "max_tokens", "temperature", "stop")
+
+class GenerationParamsSchema(Schema):
+    model = fields.Str(validate=validate.OneOf(list(Config.AI_ALLOWED_MODELS)))
+    max_tokens = fields.Int(validate=validate.Range(min=1, max=Config.AI_MAX_TOKENS_LIMIT))
+    temperature = fields.Float(validate=validate.Range(min=0, max=2))
+    stop = fields.List(fields.Str(validate=validate.Length(min=1)), validate=validate.Length(max=4))
+
+def generation_params(loaded: dict) -> dict:
+    return {name: loaded[name] for name in GENERATION_PARAMS if name in loaded}
+
+class GenerateTextSchema(GenerationParamsSchema):
+    prompt = fields.Str(required=True)
+    cache = fields.Str(validate=validate.OneOf(["default", "bypass"]))
+
+class BatchGenerateTextSchema(GenerationParamsSchema):
+    prompts = fields.List(
+        fields.Str(),
+        required=True,
+        validate=validate.Length(min=1, max=Config.BATCH_MAX_PROMPTS),
+    )
+    cache = fields.Str(validate=validate.OneOf(["default", "bypass"]))
+
+class ExportGeneratedTextSchema(Schema):
+    format = fields.Str(load_default="ndjson", validate=validate.OneOf(["ndjson", "parquet", "arrow"]))
+    start = fields.DateTime(data_key="from")
+    end = fields.DateTime(data_key="to")
+
+class CreateConversationSchema(Schema):
+    title = fields.Str(validate=validate.Length(max=200))
+
+class ConversationMessageSchema(GenerationParamsSchema):
+    prompt = fields.Str(required=True)
+
+class ListConversationsSchema(Schema):
+    limit = fields.Int(load_default=20, validate=validate.Range(min=1, max=100))
+
+GENERATED_TEXT_FIELDS = ("id", "prompt", "response", "model", "params", "timestamp")
+
+def _split_fields(value: str) -> list:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+def _validate_fieldset(value: str):
+    names = _split_fields(value)
+    if not names:
+        raise ValidationError("Name at least one field.")
+    unknown = sorted(set(names) - set(GENERATED_TEXT_FIELDS))
+    if unknown:
+        raise ValidationError(f"Unknown fields: {', '.join(unknown)}.")
+
+class FieldsetSchema(Schema):
+    # ?fields=id,timestamp returns only those keys of each generated text.
+    fieldset = fields.Str(data_key="fields", validate=_validate_fieldset)
+
+def fieldset(loaded: dict) -> tuple:
+    if "fieldset" not in loaded:
+        return GENERATED_TEXT_FIELDS
+    return tuple(dict.fromkeys(_split_fields(loaded["fieldset"])))
+
+class ListGeneratedTextSchema(FieldsetSchema):
+    limit = fields.Int(load_default=20, validate=validate.Range(min=1, max=100))
+    cursor = fields.Str()
+    start = fields.DateTime(data_key="from")
+    end = fields.DateTime(data_key="to")
+    q = fields.Str(validate=validate.Length(min=1, max=200))
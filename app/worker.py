@@ -0,0 +1,86 @@
+import argparse
+import logging
+import random
+import signal
+import threading
+from app.config import Config
+from app.models import db
+from app.repositories.generated_text_repository import GeneratedTextRepository
+from app.repositories.generation_job_repository import GenerationJobRepository
+from app.services.ai_service import AIService
+
+logger = logging.getLogger(__name__)
+
+def retry_delay(attempts: int) -> float:
+    # Exponential backoff with jitter so retried jobs do not hit the
+    # upstream in lockstep.
+    base = Config.JOB_RETRY_BACKOFF * (2 ** (attempts - 1))
+    return base + random.uniform(0, base / 2)
+
+def process_next_job(job_repo: GenerationJobRepository, gen_text_repo: GeneratedTextRepository,
+                     ai_service: AIService) -> bool:
+    job = job_repo.claim_next(Config.JOB_LEASE_SECONDS)
+    if job is None:
+        return False
+
+    logger.info("Processing generation job %d (attempt %d)", job.id, job.attempts)
+    try:
+        generation = ai_service.generate(job.prompt, use_cache=job.use_cache, params=job.params)
+        new_text = gen_text_repo.create_text(
+            job.user_id, generation.prompt, generation.text, model=generation.model, params=job.params
+        )
+        job_repo.mark_succeeded(job, new_text.id)
+    except ValueError as ve:
+        # Invalid input will not succeed on retry.
+        job_repo.session.rollback()
+        job_repo.mark_failed(job, str(ve))
+    except Exception as e:
+        logger.exception("Generation job %d failed", job.id)
+        job_repo.session.rollback()
+        job_repo.mark_failed(job, str(e), retry_delay=retry_delay(job.attempts))
+    return True
+
+def run_worker(app, stop_event: threading.Event, ai_service: AIService):
+    with app.app_context():
+        job_repo = GenerationJobRepository(db.session)
+        gen_text_repo = GeneratedTextRepository(db.session)
+        while not stop_event.is_set():
+            try:
+                worked = process_next_job(job_repo, gen_text_repo, ai_service)
+            except Exception:
+                logger.exception("Worker loop error")
+                db.session.rollback()
+                worked = False
+            if not worked:
+                stop_event.wait(Config.JOB_POLL_INTERVAL)
+        db.session.remove()
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain the generation job queue.")
+    parser.add_argument("--workers", type=int, default=Config.JOB_WORKERS)
+    args = parser.parse_args()
+
+    from app.main import create_app
+    app = create_app()
+    # create_app() imports the routes, which already built the service;
+    # a second one would duplicate its caches and connection pools.
+    from app.routes.generated_text_routes import ai_service
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+
+    threads = [
+        threading.Thread(target=run_worker, args=(app, stop_event, ai_service), name=f"job-worker-{i}")
+        for i in range(args.workers)
+    ]
+    for t in threads:
+        t.start()
+    logger.info("Started %d job workers", args.workers)
+
+    # Jobs in progress finish before the process exits.
+    for t in threads:
+        t.join()
+
+if __name__ == "__main__":
+    main()
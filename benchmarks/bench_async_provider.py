@@ -0,0 +1,48 @@
+"""
+Compare request throughput of the blocking provider path against the
+async provider driven by GenerationScheduler, using stub providers that
+simulate upstream latency.
+
+    python -m benchmarks.bench_async_provider --requests 500 --latency 0.5
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from app.providers.stub_provider import StubProvider, AsyncStubProvider
+from app.services.generation_scheduler import GenerationScheduler
+
+def bench_threads(requests: int, latency: float, workers: int) -> float:
+    provider = StubProvider(latency)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(provider.generate_text, (f"prompt {i}" for i in range(requests))))
+    return time.perf_counter() - start
+
+def bench_scheduler(requests: int, latency: float, max_in_flight: int) -> float:
+    scheduler = GenerationScheduler(max_in_flight=max_in_flight, max_queued=requests)
+    provider = AsyncStubProvider(latency)
+    start = time.perf_counter()
+    futures = [
+        scheduler.submit(lambda i=i: provider.generate_text(f"prompt {i}"))
+        for i in range(requests)
+    ]
+    wait(futures)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=8, help="request threads for the blocking path")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    args = parser.parse_args()
+
+    elapsed = bench_threads(args.requests, args.latency, args.workers)
+    print(f"blocking, {args.workers} threads:      {args.requests / elapsed:8.1f} req/s ({elapsed:.2f}s)")
+
+    elapsed = bench_scheduler(args.requests, args.latency, args.max_in_flight)
+    print(f"scheduler, {args.max_in_flight} in flight: {args.requests / elapsed:8.1f} req/s ({elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    main()
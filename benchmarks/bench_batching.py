@@ -0,0 +1,63 @@
+"""
+Tokens/s of one-at-a-time generation versus BatchingProvider at rising
+concurrency, against a simulated CPU model whose decode step costs a fixed
+weight pass plus a small amount per sequence in the batch.
+
+    python -m benchmarks.bench_batching --concurrency 1,4,16,64
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.providers.base_ai_provider import BaseAIProvider
+from app.providers.batching_provider import BatchingProvider
+
+class SimulatedModel(BaseAIProvider):
+    model = "simulated"
+
+    def __init__(self, tokens: int, step: float, per_sequence: float):
+        self.tokens = tokens
+        self.step = step
+        self.per_sequence = per_sequence
+        # One set of weights: forward passes never overlap.
+        self._lock = threading.Lock()
+
+    def generate_text(self, prompt: str) -> str:
+        return self.generate_batch([prompt])[0]
+
+    def generate_batch(self, prompts):
+        with self._lock:
+            time.sleep(self.tokens * (self.step + self.per_sequence * len(prompts)))
+        return [prompt for prompt in prompts]
+
+def bench(provider: BaseAIProvider, concurrency: int, requests: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(provider.generate_text, (f"prompt {i}" for i in range(requests))))
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests-per-client", type=int, default=4)
+    parser.add_argument("--tokens", type=int, default=32, help="completion tokens per prompt")
+    parser.add_argument("--step-ms", type=float, default=2.0, help="weight pass per decode step")
+    parser.add_argument("--per-sequence-ms", type=float, default=0.1, help="extra cost per batched sequence")
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        requests = concurrency * args.requests_per_client
+        model = SimulatedModel(args.tokens, args.step_ms / 1000, args.per_sequence_ms / 1000)
+        batching = BatchingProvider(model, max_batch_size=args.max_batch_size, max_wait=args.max_wait_ms / 1000)
+
+        single = requests * args.tokens / bench(model, concurrency, requests)
+        batched = requests * args.tokens / bench(batching, concurrency, requests)
+        stats = batching.stats()
+        print(f"concurrency {concurrency:4d}: single {single:9.1f} tok/s   batched {batched:9.1f} tok/s"
+              f"   avg batch {stats['avg_batch_size']:5.1f}   avg wait {stats['avg_wait'] * 1000:6.2f} ms")
+
+if __name__ == "__main__":
+    main()
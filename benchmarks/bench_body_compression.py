@@ -0,0 +1,104 @@
+"""
+Table size and find_by_id latency with BODY_COMPRESSION off and on, loading
+metadata only versus the decompressed bodies. Uses a throwaway SQLite file
+unless --database-url points at a scratch Postgres database (its
+generated_texts table is dropped and recreated).
+
+    python -m benchmarks.bench_body_compression --rows 5000 --response-kb 8
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.models import GeneratedText, db
+from app.repositories.generated_text_repository import GeneratedTextRepository
+from app.services import body_codec
+
+WORDS = (
+    "the model response token prompt answer data result value system user request "
+    "cache query index table row column latency throughput memory disk network "
+    "python flask postgres compression generation summary history conversation"
+).split()
+
+def make_body(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word + ("." if rng.random() < 0.08 else ""))
+        length += len(word) + 1
+    return " ".join(words)
+
+def table_bytes(engine, path: str) -> int:
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT pg_total_relation_size('generated_texts')")).scalar()
+    return os.path.getsize(path)
+
+def read_latencies(engine, ids: list, with_body: bool) -> list:
+    latencies = []
+    for text_id in ids:
+        with Session(engine) as session:
+            repo = GeneratedTextRepository(session)
+            start = time.perf_counter()
+            row = repo.find_by_id(text_id)
+            _ = row.user_id
+            if with_body:
+                _ = row.response
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+def report(name: str, size: int, metadata: list, full: list):
+    def p99(latencies):
+        return sorted(latencies)[int(0.99 * (len(latencies) - 1))] * 1e6
+    print(f"{name:6s} table {size / 2 ** 20:8.1f} MiB   "
+          f"metadata mean {statistics.mean(metadata) * 1e6:7.1f} us p99 {p99(metadata):7.1f} us   "
+          f"with body mean {statistics.mean(full) * 1e6:7.1f} us p99 {p99(full):7.1f} us")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--response-kb", type=int, default=8)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--codecs", default="none,zlib,zstd,lz4")
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    bodies = [make_body(rng, args.response_kb * 1024) for _ in range(200)]
+    for codec in args.codecs.split(","):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.db")
+            engine = create_engine(args.database_url or f"sqlite:///{path}")
+            GeneratedText.__table__.drop(engine, checkfirst=True)
+            db.metadata.create_all(engine, tables=[GeneratedText.__table__])
+            body_codec.codec = codec
+            body_codec.min_bytes = 2048
+            try:
+                with Session(engine) as session:
+                    repo = GeneratedTextRepository(session)
+                    for start in range(0, args.rows, 1000):
+                        count = min(1000, args.rows - start)
+                        repo.create_texts(1, [(f"prompt {start + i}", bodies[(start + i) % len(bodies)], None)
+                                              for i in range(count)])
+            except RuntimeError as e:
+                print(f"{codec:6s} skipped: {e}")
+                continue
+            if engine.dialect.name == "postgresql":
+                with engine.connect() as connection:
+                    connection.execute(text("VACUUM ANALYZE generated_texts").execution_options(isolation_level="AUTOCOMMIT"))
+
+            ids = [rng.randint(1, args.rows) for _ in range(args.reads)]
+            report(codec, table_bytes(engine, path),
+                   read_latencies(engine, ids, with_body=False),
+                   read_latencies(engine, ids, with_body=True))
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Per-call latency of AIService.generate_text with large prompts, logging the
+full payloads through a synchronous file handler versus the queue-based
+setup from app.log_config with payload truncation.
+
+    python -m benchmarks.bench_logging --requests 2000 --prompt-kb 64
+"""
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+
+from app import log_config
+from app.providers.stub_provider import StubProvider
+from app.services.ai_service import AIService
+
+def bench(service: AIService, prompt: str, requests: int) -> list:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        service.generate_text(prompt)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def report(name: str, latencies: list):
+    latencies = sorted(latencies)
+    p99 = latencies[int(0.99 * (len(latencies) - 1))]
+    print(f"{name:22s} mean {statistics.mean(latencies) * 1e6:9.1f} us   p99 {p99 * 1e6:9.1f} us")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--prompt-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    prompt = "lorem ipsum " * (args.prompt_kb * 1024 // 12)
+    service = AIService(StubProvider(0))
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+
+    with tempfile.NamedTemporaryFile("w") as sync_log:
+        handler = logging.StreamHandler(sync_log)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        root.addHandler(handler)
+        log_config.payload_max_chars = 0
+        report("sync, full payloads", bench(service, prompt, args.requests))
+        root.removeHandler(handler)
+
+    with tempfile.NamedTemporaryFile("w") as queued_log:
+        log_config.payload_max_chars = 200
+        log_config.configure_logging(stream=queued_log)
+        report("queued, truncated", bench(service, prompt, args.requests))
+        log_config.stop_logging()
+
+if __name__ == "__main__":
+    main()
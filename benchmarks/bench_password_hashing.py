@@ -0,0 +1,38 @@
+"""
+Report login throughput (bcrypt verifications per second) through the
+PasswordHasher pool for a range of work factors.
+
+    python -m benchmarks.bench_password_hashing --rounds 10 11 12 13 --logins 200
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.password_hasher import PasswordHasher
+
+def bench(rounds: int, logins: int, workers: int, concurrency: int) -> float:
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=concurrency)
+    password_hash = hasher.hash("password123")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: hasher.verify("password123", password_hash), range(logins)))
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return logins / elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--concurrency", type=int, default=32, help="simulated request threads")
+    args = parser.parse_args()
+
+    print(f"{'rounds':>6}  {'logins/s':>10}")
+    for rounds in args.rounds:
+        print(f"{rounds:>6}  {bench(rounds, args.logins, args.workers, args.concurrency):>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Lookup latency of the semantic cache with a large number of entries,
+including embedding the prompt. Near-duplicates of stored prompts should hit;
+unrelated prompts should miss.
+
+    python -m benchmarks.bench_semantic_cache --entries 1000000 --index hnsw
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.semantic_cache import FlatIndex, HashingEmbedder, HnswIndex, SemanticCache, scope_key
+
+WORDS = (
+    "the a of to and in is for on with how what why write explain summarize list compare describe "
+    "python flask database cache token model prompt server request latency memory thread process "
+    "history poem story email report plan recipe travel budget music science climate market"
+).split()
+
+def random_prompt(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))) + f" #{rng.getrandbits(40)}"
+
+def reword(prompt: str) -> str:
+    return "  " + prompt.upper().replace(" ", "  ") + "?"
+
+def measure(cache: SemanticCache, prompts: list, scope: str) -> tuple:
+    latencies, hits = [], 0
+    for prompt in prompts:
+        start = time.perf_counter()
+        hits += cache.get(prompt, scope) is not None
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies), hits
+
+def report(name: str, latencies: list, hits: int):
+    p99 = latencies[int(0.99 * (len(latencies) - 1))]
+    print(f"{name:12s} p50 {latencies[len(latencies) // 2] * 1e3:6.3f} ms   p99 {p99 * 1e3:6.3f} ms"
+          f"   mean {statistics.mean(latencies) * 1e3:6.3f} ms   hits {hits}/{len(latencies)}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--index", choices=["hnsw", "flat"], default="hnsw")
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    embedder = HashingEmbedder(args.dim)
+    index_cls = HnswIndex if args.index == "hnsw" else FlatIndex
+    cache = SemanticCache(embedder, index_cls(args.dim, args.entries))
+    scope = scope_key("gpt-4o-mini")
+
+    start = time.perf_counter()
+    stored = []
+    for offset in range(0, args.entries, 50000):
+        prompts = [random_prompt(rng) for _ in range(min(50000, args.entries - offset))]
+        cache.set_many(prompts, scope, ["response"] * len(prompts))
+        stored.extend(rng.sample(prompts, min(len(prompts), args.queries)))
+    print(f"loaded {args.entries} entries into {args.index} index in {time.perf_counter() - start:.1f}s")
+
+    report("near-dup", *measure(cache, [reword(p) for p in rng.sample(stored, args.queries)], scope))
+    report("unrelated", *measure(cache, [random_prompt(rng) for _ in range(args.queries)], scope))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Closed-loop load test of POST /generate-text against a running server.
+Start the server with the stub provider so only our own overhead is measured:
+
+    AI_PROVIDER=stub STUB_PROVIDER_LATENCY=0.5 RATE_LIMIT_ENABLED=false \\
+        gunicorn -c gunicorn.conf.py app.wsgi:app
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --concurrency 64 --duration 30
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+
+def post(url: str, body: dict, headers: dict = None, timeout: float = 60) -> tuple:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json", **(headers or {})},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+def login(base_url: str) -> dict:
+    credentials = {"username": f"load-{uuid.uuid4().hex[:8]}", "password": "load-test"}
+    post(f"{base_url}/auth/register", credentials)
+    status, body = post(f"{base_url}/auth/login", credentials)
+    if status != 200:
+        raise SystemExit(f"Login failed with {status}: {body!r}")
+    return {"Authorization": f"Bearer {json.loads(body)['access_token']}"}
+
+def client(base_url: str, headers: dict, deadline: float, latencies: list, statuses: Counter, lock):
+    while time.monotonic() < deadline:
+        # Unique prompts and cache bypass so every request reaches the provider.
+        body = {"prompt": f"load test {uuid.uuid4().hex}", "cache": "bypass"}
+        start = time.perf_counter()
+        try:
+            status, _ = post(f"{base_url}/generate-text", body, headers)
+        except OSError:
+            status = "connection error"
+        elapsed = time.perf_counter() - start
+        with lock:
+            statuses[status] += 1
+            if status == 201:
+                latencies.append(elapsed)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30)
+    args = parser.parse_args()
+
+    headers = login(args.url)
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=client, args=(args.url, headers, deadline, latencies, statuses, lock))
+        for _ in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"{sum(statuses.values())} requests in {elapsed:.1f}s, {len(latencies) / elapsed:.1f} successful req/s")
+    print("status codes:", dict(statuses))
+    if latencies:
+        latencies.sort()
+        pick = lambda p: latencies[int(p * (len(latencies) - 1))] * 1000
+        print(f"latency ms: p50 {pick(0.5):.0f}  p95 {pick(0.95):.0f}  p99 {pick(0.99):.0f}"
+              f"  mean {statistics.mean(latencies) * 1000:.0f}")
+
+if __name__ == "__main__":
+    main()
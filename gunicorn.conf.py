@@ -0,0 +1,45 @@
+# Gunicorn settings for app.wsgi:app, all overridable through the environment:
+#     gunicorn -c gunicorn.conf.py app.wsgi:app
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Generations spend most of their time waiting on the provider, so each
+# process serves requests from a pool of threads.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS", str(min(4, multiprocessing.cpu_count()))))
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+
+# Import the app (and build provider clients) once in the master; workers
+# inherit it copy-on-write.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Long generations and SSE streams must not be killed as hung workers.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "180"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "120"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers periodically; the jitter keeps them from restarting together.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# Heartbeat files on tmpfs so a slow disk cannot stall workers.
+worker_tmp_dir = os.getenv("GUNICORN_WORKER_TMP_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else None)
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+
+def post_fork(server, worker):
+    # Connections and threads created in the master before the fork must not
+    # be shared with the workers.
+    from app.log_config import configure_logging
+    from app.models import db
+    from app.wsgi import app
+
+    configure_logging()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+def worker_exit(server, worker):
+    from app.log_config import stop_logging
+    stop_logging()
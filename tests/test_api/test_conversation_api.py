@@ -0,0 +1,62 @@
+from app.providers.base_ai_provider import BaseAIProvider
+
+class FakeChatProvider(BaseAIProvider):
+    model = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def generate_text(self, prompt, **params):
+        return "Summary"
+
+    def generate_chat(self, messages, **params):
+        self.calls.append(messages)
+        return f"Reply {len(self.calls)}"
+
+def test_conversation_messages_carry_history(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    provider = FakeChatProvider()
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", provider)
+
+    create_resp = client.post("/conversations", json={"title": "Chat"}, headers=auth_headers)
+    assert create_resp.status_code == 201
+    conversation_id = create_resp.get_json()["id"]
+
+    first = client.post(f"/conversations/{conversation_id}/messages", json={"prompt": "Hi"}, headers=auth_headers)
+    assert first.status_code == 201
+    assert first.get_json()["response"] == "Reply 1"
+    second = client.post(f"/conversations/{conversation_id}/messages", json={"prompt": "Again"}, headers=auth_headers)
+    assert second.get_json()["conversation_id"] == conversation_id
+
+    assert provider.calls[1] == [
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": "Reply 1"},
+        {"role": "user", "content": "Again"},
+    ]
+    get_resp = client.get(f"/conversations/{conversation_id}", headers=auth_headers)
+    assert [t["prompt"] for t in get_resp.get_json()["turns"]] == ["Hi", "Again"]
+
+def test_list_conversations_puts_the_latest_activity_first(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeChatProvider())
+    first_id = client.post("/conversations", json={"title": "First"}, headers=auth_headers).get_json()["id"]
+    client.post("/conversations", json={"title": "Second"}, headers=auth_headers)
+    client.post(f"/conversations/{first_id}/messages", json={"prompt": "Hi"}, headers=auth_headers)
+
+    resp = client.get("/conversations", headers=auth_headers)
+    assert resp.status_code == 200
+    assert [c["title"] for c in resp.get_json()["items"]][:2] == ["First", "Second"]
+    assert [c["title"] for c in client.get("/conversations?limit=1", headers=auth_headers).get_json()["items"]] == ["First"]
+    assert client.get("/conversations?limit=0", headers=auth_headers).status_code == 422
+
+def test_conversation_belongs_to_owner(client, auth_headers):
+    conversation_id = client.post("/conversations", json={}, headers=auth_headers).get_json()["id"]
+    client.post("/auth/register", json={"username": "Intruder", "password": "pass2"})
+    token = client.post("/auth/login", json={"username": "Intruder", "password": "pass2"}).get_json()["access_token"]
+
+    resp = client.post(
+        f"/conversations/{conversation_id}/messages",
+        json={"prompt": "Hi"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert resp.status_code == 403
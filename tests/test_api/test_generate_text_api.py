@@ -1,4 +1,6 @@
+import json
 import pytest
+from app.providers.base_ai_provider import BaseAIProvider
 
 def test_generate_text_unauthorized(client, session):
     resp = client.post("/generate-text", json={"prompt": "No token here"})
@@ -33,3 +35,232 @@ def test_get_generated_text_unauthorized(client, auth_headers):
     get_resp = client.get(f"/generated-text/{text_id}", headers=new_headers)
     assert get_resp.status_code == 403
     assert get_resp.get_json()["message"] == "Unauthorized"
+
+class FakeStreamingProvider(BaseAIProvider):
+    model = "fake"
+
+    def generate_text(self, prompt, **params):
+        return "".join(self.stream_text(prompt))
+
+    def stream_text(self, prompt, **params):
+        yield "Once "
+        yield "upon "
+        yield "a time"
+
+def test_generate_text_stream(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+
+    resp = client.post("/generate-text?mode=stream", json={"prompt": "Tell a story"}, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+
+    body = resp.get_data(as_text=True)
+    first_event = body.split("\n\n")[0]
+    assert json.loads(first_event[len("data: "):]) == {"delta": "Once "}
+    assert "event: done" in body
+    done_data = body.split("event: done\ndata: ")[1].strip()
+    text_id = json.loads(done_data)["id"]
+
+    get_resp = client.get(f"/generated-text/{text_id}", headers=auth_headers)
+    assert get_resp.get_json()["response"] == "Once upon a time"
+
+def test_generate_text_stream_empty_prompt(client, auth_headers):
+    resp = client.post("/generate-text?mode=stream", json={"prompt": ""}, headers=auth_headers)
+    assert resp.status_code == 400
+
+def test_generate_text_cache_hit_still_stores_row(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    from app.services.lru_cache import LRUCache
+    from app.services.response_cache import ResponseCache
+    provider = FakeStreamingProvider()
+    calls = []
+    monkeypatch.setattr(provider, "generate_text", lambda prompt, **params: calls.append(prompt) or "Once upon a time")
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", provider)
+    monkeypatch.setattr(generated_text_routes.ai_service, "cache", ResponseCache(LRUCache(max_bytes=1024 * 1024)))
+
+    first = client.post("/generate-text", json={"prompt": "Cache me"}, headers=auth_headers)
+    second = client.post("/generate-text", json={"prompt": "Cache me"}, headers=auth_headers)
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert first.get_json()["id"] != second.get_json()["id"]
+    assert second.get_json()["response"] == "Once upon a time"
+    assert calls == ["Cache me"]
+
+def test_generate_text_invalid_cache_option(client, auth_headers):
+    resp = client.post("/generate-text", json={"prompt": "Hi", "cache": "sometimes"}, headers=auth_headers)
+    assert resp.status_code == 422
+
+def test_generate_text_batch(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+
+    resp = client.post("/generate-text/batch", json={"prompts": ["One", "", "Three"]}, headers=auth_headers)
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["response"] == "Once upon a time"
+    assert "Prompt cannot be empty" in results[1]["error"]
+    assert client.get(f"/generated-text/{results[2]['id']}", headers=auth_headers).status_code == 200
+
+def test_generate_text_batch_stream(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+
+    resp = client.post("/generate-text/batch?mode=stream", json={"prompts": ["A", "B"]}, headers=auth_headers)
+    assert resp.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert sorted(line["index"] for line in lines[:2]) == [0, 1]
+    assert len(lines[-1]["stored"]) == 2
+
+def test_generate_text_batch_requires_prompts(client, auth_headers):
+    resp = client.post("/generate-text/batch", json={"prompts": []}, headers=auth_headers)
+    assert resp.status_code == 422
+
+def test_generate_text_async_job(client, auth_headers, monkeypatch):
+    from app.models import db
+    from app.routes import generated_text_routes
+    from app.worker import process_next_job
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+
+    resp = client.post("/generate-text?mode=async", json={"prompt": "Later please"}, headers=auth_headers)
+    assert resp.status_code == 202
+    job_url = resp.get_json()["status_url"]
+    assert client.get(job_url, headers=auth_headers).get_json()["status"] == "queued"
+
+    process_next_job(generated_text_routes.job_repo, generated_text_routes.gen_text_repo, generated_text_routes.ai_service)
+    db.session.expire_all()
+
+    job = client.get(job_url, headers=auth_headers).get_json()
+    assert job["status"] == "succeeded"
+    assert job["result"]["response"] == "Once upon a time"
+
+def test_list_generated_texts_pages_with_cursor(client, monkeypatch):
+    from app.routes import generated_text_routes
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+    # A dedicated user keeps other tests' texts out of the listing.
+    client.post("/auth/register", json={"username": "ListingUser", "password": "pass"})
+    login_resp = client.post("/auth/login", json={"username": "ListingUser", "password": "pass"})
+    auth_headers = {"Authorization": f"Bearer {login_resp.get_json()['access_token']}"}
+    ids = [
+        client.post("/generate-text", json={"prompt": f"History {i}", "cache": "bypass"}, headers=auth_headers).get_json()["id"]
+        for i in range(3)
+    ]
+
+    first = client.get("/generated-text?limit=2", headers=auth_headers).get_json()
+    assert [item["id"] for item in first["items"]] == [ids[2], ids[1]]
+    assert first["next_cursor"]
+
+    second = client.get(f"/generated-text?limit=2&cursor={first['next_cursor']}", headers=auth_headers).get_json()
+    assert [item["id"] for item in second["items"]] == [ids[0]]
+    assert second["next_cursor"] is None
+
+def test_list_generated_texts_invalid_cursor(client, auth_headers):
+    resp = client.get("/generated-text?cursor=not-a-cursor", headers=auth_headers)
+    assert resp.status_code == 400
+
+def test_generate_text_rate_limited(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    from app.services.rate_limiter import RateLimiter, InMemoryRateLimitBackend
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+    monkeypatch.setattr(generated_text_routes, "rate_limiter",
+                        RateLimiter(InMemoryRateLimitBackend(), "key", user_rps=0.01, user_burst=1))
+
+    assert client.post("/generate-text", json={"prompt": "One"}, headers=auth_headers).status_code == 201
+    resp = client.post("/generate-text", json={"prompt": "Two"}, headers=auth_headers)
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) > 0
+
+class OverloadedProvider(BaseAIProvider):
+    model = "fake"
+
+    def __init__(self, error):
+        self.error = error
+
+    def generate_text(self, prompt, **params):
+        raise self.error
+
+@pytest.mark.parametrize("error", ["SchedulerOverloaded", "SchedulerTimeout", "LocalModelOverloaded"])
+def test_generate_text_overloaded_returns_503(client, auth_headers, monkeypatch, error):
+    from app.routes import generated_text_routes
+    error_class = next(e for e in generated_text_routes.OVERLOAD_ERRORS if e.__name__ == error)
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", OverloadedProvider(error_class("busy")))
+
+    resp = client.post("/generate-text", json={"prompt": "Busy"}, headers=auth_headers)
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+def test_generate_text_records_model_and_params(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+
+    resp = client.post("/generate-text", json={
+        "prompt": "Short answer please",
+        "model": "gpt-4o",
+        "max_tokens": 16,
+        "temperature": 0.2,
+        "stop": ["\n"]
+    }, headers=auth_headers)
+    assert resp.status_code == 201
+    data = resp.get_json()
+    assert data["model"] == "gpt-4o"
+    assert data["params"] == {"model": "gpt-4o", "max_tokens": 16, "temperature": 0.2, "stop": ["\n"]}
+
+    stored = client.get(f"/generated-text/{data['id']}", headers=auth_headers).get_json()
+    assert stored["model"] == "gpt-4o"
+
+def test_generate_text_rejects_unlisted_model(client, auth_headers):
+    resp = client.post("/generate-text", json={"prompt": "Hi", "model": "gpt-unknown"}, headers=auth_headers)
+    assert resp.status_code == 422
+    assert "model" in resp.get_json()
+
+def test_export_generated_texts_ndjson(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+    for prompt in ("first", "second"):
+        client.post("/generate-text", json={"prompt": prompt, "cache": "bypass"}, headers=auth_headers)
+
+    resp = client.get("/generated-text/export?format=ndjson", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [row["prompt"] for row in rows][-2:] == ["first", "second"]
+
+def test_export_rejects_unknown_format(client, auth_headers):
+    resp = client.get("/generated-text/export?format=csv", headers=auth_headers)
+    assert resp.status_code == 422
+
+def test_sparse_fieldsets_and_etag(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+    text_id = client.post("/generate-text", json={"prompt": "Fields", "cache": "bypass"}, headers=auth_headers).get_json()["id"]
+
+    listed = client.get("/generated-text?limit=1&fields=id,timestamp", headers=auth_headers).get_json()
+    assert listed["items"] == [{"id": text_id, "timestamp": listed["items"][0]["timestamp"]}]
+
+    resp = client.get(f"/generated-text/{text_id}?fields=id,model", headers=auth_headers)
+    assert set(resp.get_json()) == {"id", "model"}
+    etag = resp.headers["ETag"]
+    cached = client.get(f"/generated-text/{text_id}?fields=id,model", headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b""
+    full = client.get(f"/generated-text/{text_id}", headers={**auth_headers, "If-None-Match": etag})
+    assert full.status_code == 200 and full.headers["ETag"] != etag
+
+def test_unknown_fields_are_rejected(client, auth_headers):
+    resp = client.get("/generated-text?fields=id,secret", headers=auth_headers)
+    assert resp.status_code == 422
+    assert "fields" in resp.get_json()
+
+def test_large_responses_are_gzipped(client, auth_headers, monkeypatch):
+    import gzip
+    from app.routes import generated_text_routes
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+    text_id = client.post("/generate-text", json={"prompt": "x" * 4000, "cache": "bypass"}, headers=auth_headers).get_json()["id"]
+
+    resp = client.get(f"/generated-text/{text_id}", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert json.loads(gzip.decompress(resp.get_data()))["prompt"] == "x" * 4000
+    plain = client.get(f"/generated-text/{text_id}", headers=auth_headers)
+    assert "Content-Encoding" not in plain.headers
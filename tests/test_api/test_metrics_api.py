@@ -0,0 +1,16 @@
+from tests.test_api.test_generate_text_api import FakeStreamingProvider
+
+def test_metrics_report_generation_stages(client, auth_headers, monkeypatch):
+    from app.routes import generated_text_routes
+    monkeypatch.setattr(generated_text_routes.ai_service, "provider", FakeStreamingProvider())
+
+    client.post("/generate-text", json={"prompt": "Count me"}, headers=auth_headers)
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+
+    body = resp.get_data(as_text=True)
+    for stage in ("jwt_decode", "validation", "ai_service", "provider", "db_commit"):
+        assert f'generation_stage_duration_seconds_count{{stage="{stage}"}}' in body
+    assert 'http_request_duration_seconds_count{method="POST",endpoint="/generate-text",status="201"}' in body
+    assert "response_cache_hit_ratio" in body
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import MagicMock
 
 def test_get_profile(client, auth_headers):
     resp = client.get("/user/profile", headers=auth_headers)
@@ -10,3 +11,32 @@ def test_get_profile(client, auth_headers):
 def test_get_profile_unauthorized(client):
     resp = client.get("/user/profile")
     assert resp.status_code == 401
+
+def test_get_profile_from_token_claims(client, auth_headers, monkeypatch):
+    from app.routes import user_routes
+    find_by_id = MagicMock()
+    monkeypatch.setattr(user_routes.user_repo, "find_by_id", find_by_id)
+
+    resp = client.get("/user/profile", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.get_json()["username"] == "testuser"
+    find_by_id.assert_not_called()
+
+def test_get_profile_without_claims_falls_back_to_lookup(app, client):
+    from flask_jwt_extended import create_access_token, decode_token
+    client.post("/auth/register", json={"username": "LegacyToken", "password": "pass"})
+    login_resp = client.post("/auth/login", json={"username": "LegacyToken", "password": "pass"})
+    with app.app_context():
+        user_id = decode_token(login_resp.get_json()["access_token"])["sub"]
+        token = create_access_token(identity=user_id)
+
+    resp = client.get("/user/profile", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"id": int(user_id), "username": "legacytoken"}
+
+def test_request_id_is_returned(client):
+    resp = client.get("/user/profile")
+    assert len(resp.headers["X-Request-ID"]) == 32
+
+    resp = client.get("/user/profile", headers={"X-Request-ID": "trace-42"})
+    assert resp.headers["X-Request-ID"] == "trace-42"
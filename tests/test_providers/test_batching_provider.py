@@ -0,0 +1,115 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.providers.base_ai_provider import BaseAIProvider
+from app.providers.batching_provider import BatchingProvider, BatchQueueFull
+
+class RecordingProvider(BaseAIProvider):
+    model = "recording"
+
+    def __init__(self):
+        self.batches = []
+        self.batch_params = []
+
+    def generate_text(self, prompt, **params):
+        if prompt == "bad":
+            raise ValueError("bad prompt")
+        return prompt.upper() + ("!" * params.get("max_tokens", 0))
+
+    def generate_batch(self, prompts, **params):
+        self.batches.append(list(prompts))
+        self.batch_params.append(params)
+        return super().generate_batch(prompts, **params)
+
+def test_concurrent_calls_share_a_batch():
+    inner = RecordingProvider()
+    provider = BatchingProvider(inner, max_batch_size=4, max_wait=0.2)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(provider.generate_text, ["a", "b", "c", "d"]))
+
+    assert results == ["A", "B", "C", "D"]
+    assert len(inner.batches) == 1
+    assert sorted(inner.batches[0]) == ["a", "b", "c", "d"]
+    assert provider.stats()["avg_batch_size"] == 4
+    assert provider.model == "recording"
+
+def test_partial_batch_dispatched_after_wait():
+    inner = RecordingProvider()
+    provider = BatchingProvider(inner, max_batch_size=8, max_wait=0.01)
+
+    assert provider.generate_text("solo") == "SOLO"
+    assert inner.batches == [["solo"]]
+
+def test_calls_with_different_params_are_batched_separately():
+    inner = RecordingProvider()
+    provider = BatchingProvider(inner, max_batch_size=4, max_wait=0.2)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(provider.generate_text, prompt, **params)
+                   for prompt, params in [("a", {}), ("b", {"max_tokens": 1}), ("c", {}), ("d", {"max_tokens": 1})]]
+        results = [future.result() for future in futures]
+
+    assert results == ["A", "B!", "C", "D!"]
+    assert sorted(map(sorted, inner.batches)) == [["a", "c"], ["b", "d"]]
+    assert {} in inner.batch_params and {"max_tokens": 1} in inner.batch_params
+
+def test_errors_go_to_their_own_caller():
+    provider = BatchingProvider(RecordingProvider(), max_batch_size=2, max_wait=0.2)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        good = pool.submit(provider.generate_text, "good")
+        bad = pool.submit(provider.generate_text, "bad")
+        assert good.result() == "GOOD"
+        with pytest.raises(ValueError):
+            bad.result()
+
+def test_rejects_when_queue_is_full():
+    started, release = threading.Event(), threading.Event()
+    class BlockingProvider(RecordingProvider):
+        def generate_batch(self, prompts):
+            started.set()
+            release.wait()
+            return super().generate_batch(prompts)
+
+    provider = BatchingProvider(BlockingProvider(), max_batch_size=1, max_wait=0, max_queued=1)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        running = pool.submit(provider.generate_text, "running")
+        started.wait()
+        queued = pool.submit(provider.generate_text, "queued")
+        while provider.stats()["queue_depth"] < 1:
+            pass
+        with pytest.raises(BatchQueueFull):
+            provider.generate_text("rejected")
+        release.set()
+        assert running.result() == "RUNNING"
+        assert queued.result() == "QUEUED"
+
+def test_short_batch_result_fails_the_unanswered_callers():
+    class ShortProvider(RecordingProvider):
+        def generate_batch(self, prompts, **params):
+            return [prompt.upper() for prompt in prompts[:1]]
+
+    provider = BatchingProvider(ShortProvider(), max_batch_size=2, max_wait=0.2, timeout=5)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(provider.generate_text, prompt) for prompt in ("a", "b")]
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except RuntimeError:
+                outcomes.append("missing")
+    assert sorted(outcomes) in (["A", "missing"], ["B", "missing"])
+
+def test_caller_gives_up_after_timeout():
+    release = threading.Event()
+    class BlockingProvider(RecordingProvider):
+        def generate_batch(self, prompts, **params):
+            release.wait()
+            return super().generate_batch(prompts, **params)
+
+    provider = BatchingProvider(BlockingProvider(), max_batch_size=1, max_wait=0, timeout=0.05)
+    with pytest.raises(BatchQueueFull, match="Timed out"):
+        provider.generate_text("slow")
+    release.set()
+    assert provider.generate_text("next") == "NEXT"
@@ -0,0 +1,95 @@
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+import pytest
+from app.providers.local_model_provider import LocalModelProvider, LocalModelOverloaded, load_llama
+
+def fake_llm(content=" Hello there \n"):
+    llm = MagicMock()
+    llm.create_chat_completion.return_value = {"choices": [{"message": {"content": content}}]}
+    return llm
+
+def test_generate_text_loads_model_once():
+    llm = fake_llm()
+    loader = MagicMock(return_value=llm)
+    provider = LocalModelProvider("/models/tiny.gguf", max_tokens=32, n_ctx=512, loader=loader)
+
+    assert provider.generate_text("Hi") == "Hello there"
+    assert provider.generate_text("Hi again") == "Hello there"
+
+    loader.assert_called_once_with("/models/tiny.gguf", 512, 0)
+    assert llm.create_chat_completion.call_args.kwargs["max_tokens"] == 32
+    assert provider.model == "local:tiny.gguf"
+
+def test_rejects_when_too_many_pending():
+    started, release = threading.Event(), threading.Event()
+    def slow_completion(**kwargs):
+        started.set()
+        release.wait()
+        return {"choices": [{"message": {"content": "done"}}]}
+    llm = fake_llm()
+    llm.create_chat_completion.side_effect = slow_completion
+    provider = LocalModelProvider("/models/tiny.gguf", max_pending=1, loader=MagicMock(return_value=llm))
+
+    t = threading.Thread(target=provider.generate_text, args=("slow",))
+    t.start()
+    started.wait()
+    with pytest.raises(LocalModelOverloaded):
+        provider.generate_text("rejected")
+    release.set()
+    t.join()
+
+def test_requires_model_path():
+    with pytest.raises(ValueError):
+        LocalModelProvider("")
+
+def test_missing_bindings(monkeypatch):
+    monkeypatch.setitem(sys.modules, "llama_cpp", None)
+    with pytest.raises(RuntimeError):
+        load_llama("/models/tiny.gguf", 512, 0)
+
+def blocking_llm():
+    started, release = threading.Event(), threading.Event()
+    def slow_completion(**kwargs):
+        started.set()
+        release.wait()
+        return {"choices": [{"message": {"content": "done"}}]}
+    llm = fake_llm()
+    llm.create_chat_completion.side_effect = slow_completion
+    return llm, started, release
+
+def test_batch_takes_a_pending_slot_per_prompt():
+    llm, started, release = blocking_llm()
+    provider = LocalModelProvider("/models/tiny.gguf", workers=2, max_pending=2, timeout=5,
+                                  loader=MagicMock(return_value=llm))
+    threading.Timer(0.1, release.set).start()
+
+    results = provider.generate_batch(["a", "b", "c"])
+    assert results[:2] == ["done", "done"]
+    assert isinstance(results[2], LocalModelOverloaded)
+
+def test_batch_shares_one_timeout():
+    llm, started, release = blocking_llm()
+    provider = LocalModelProvider("/models/tiny.gguf", workers=1, max_pending=4, timeout=0.2,
+                                  loader=MagicMock(return_value=llm))
+
+    start = time.monotonic()
+    results = provider.generate_batch(["a", "b", "c"])
+    assert time.monotonic() - start < 0.6
+    assert all(isinstance(r, LocalModelOverloaded) for r in results)
+    release.set()
+
+def test_timed_out_generation_keeps_its_slot_until_it_finishes():
+    llm, started, release = blocking_llm()
+    provider = LocalModelProvider("/models/tiny.gguf", max_pending=1, timeout=0.05,
+                                  loader=MagicMock(return_value=llm))
+
+    with pytest.raises(LocalModelOverloaded):
+        provider.generate_text("slow")
+    started.wait()
+    with pytest.raises(LocalModelOverloaded, match="in progress"):
+        provider.generate_text("still running")
+    release.set()
+    provider._executor().submit(lambda: None).result()
+    assert provider.generate_text("after") == "done"
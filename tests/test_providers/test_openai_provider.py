@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import openai
+import pytest
+from app.config import Config
+from app.providers import openai_client
+from app.providers.openai_provider import OpenAIProvider
+
+class ChatCompletionsStub(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for POST /v1/chat/completions. `failures` requests are
+    answered with 503 first; `delay` stalls every response.
+    """
+    protocol_version = "HTTP/1.1"
+    failures = 0
+    delay = 0.0
+    client_ports = []
+    requests = 0
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        body = json.loads(self.rfile.read(length))
+        cls = type(self)
+        cls.requests += 1
+        cls.client_ports.append(self.client_address[1])
+        time.sleep(cls.delay)
+
+        if cls.failures > 0:
+            cls.failures -= 1
+            self._send(503, {"error": {"message": "overloaded"}}, {"retry-after-ms": "10"})
+            return
+        self._send(200, {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": " Echo: " + body["messages"][-1]["content"]},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 3, "completion_tokens": 4, "total_tokens": 7},
+        })
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    handler = type("Handler", (ChatCompletionsStub,), {"client_ports": [], "failures": 0, "delay": 0.0, "requests": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(Config, "OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(Config, "OPENAI_MAX_RETRIES", 2)
+    monkeypatch.setattr(openai_client, "_client", None)
+    yield handler
+    server.shutdown()
+    server.server_close()
+
+def test_generate_text_reuses_connection(stub_api):
+    provider = OpenAIProvider("gpt-test")
+    results = [provider.generate_text(f"hello {i}") for i in range(3)]
+
+    assert results == ["Echo: hello 0", "Echo: hello 1", "Echo: hello 2"]
+    # Keep-alive: every request arrived on the same TCP connection.
+    assert len(set(stub_api.client_ports)) == 1
+
+def test_providers_share_one_client(stub_api):
+    assert OpenAIProvider("a").client is OpenAIProvider("b").client
+
+def test_retries_transient_errors(stub_api):
+    stub_api.failures = 2
+    assert OpenAIProvider("gpt-test").generate_text("retry me") == "Echo: retry me"
+    assert stub_api.requests == 3
+
+def test_read_timeout(stub_api, monkeypatch):
+    monkeypatch.setattr(Config, "OPENAI_READ_TIMEOUT", 0.1)
+    monkeypatch.setattr(Config, "OPENAI_MAX_RETRIES", 0)
+    stub_api.delay = 0.5
+    with pytest.raises(openai.APITimeoutError):
+        OpenAIProvider("gpt-test").generate_text("too slow")
+
+def test_forked_process_gets_its_own_client(stub_api, monkeypatch):
+    client = openai_client.shared_client()
+    monkeypatch.setattr(openai_client, "_client_pid", -1)
+    assert openai_client.shared_client() is not client
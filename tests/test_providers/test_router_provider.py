@@ -0,0 +1,167 @@
+import random
+import threading
+import time
+import pytest
+from app.providers.base_ai_provider import BaseAIProvider
+from app.providers.router_provider import RouterProvider, NoHealthyBackend
+
+class FakeProvider(BaseAIProvider):
+    """
+    Returns its name after a latency drawn from `latencies`; fails while
+    `failing` is set. Streams its name one character at a time, failing
+    after `fail_after` chunks if given.
+    """
+    def __init__(self, name, latencies, failing=False, fail_after=None, gate=None):
+        self.name = name
+        self.model = f"model-{name}"
+        self.latencies = latencies
+        self.failing = failing
+        self.fail_after = fail_after
+        self.gate = gate
+        self.calls = 0
+
+    def generate_text(self, prompt):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        time.sleep(random.choice(self.latencies))
+        if self.failing:
+            raise RuntimeError(f"{self.name} down")
+        return self.name
+
+    def stream_text(self, prompt):
+        self.calls += 1
+        time.sleep(random.choice(self.latencies))
+        for index, char in enumerate(self.name):
+            if self.failing or index == self.fail_after:
+                raise RuntimeError(f"{self.name} down")
+            yield char
+
+def test_routes_to_fastest_backend():
+    slow = FakeProvider("slow", [0.03])
+    fast = FakeProvider("fast", [0.001])
+    router = RouterProvider({"slow": slow, "fast": fast}, hedge=False)
+
+    # Both get measured first, then the fast one wins every request.
+    router.generate_text("warm")
+    router.generate_text("warm")
+    results = [router.generate_text("hi") for _ in range(5)]
+    assert results == ["fast"] * 5
+
+def test_fails_over_to_next_backend():
+    broken = FakeProvider("broken", [0], failing=True)
+    healthy = FakeProvider("healthy", [0.01])
+    router = RouterProvider({"broken": broken, "healthy": healthy}, hedge=False)
+
+    assert router.generate_text("hi") == "healthy"
+
+def test_records_the_model_that_answered():
+    from app.services.ai_service import AIService
+    broken = FakeProvider("broken", [0], failing=True)
+    healthy = FakeProvider("healthy", [0.01])
+    router = RouterProvider({"openai:" + "x" * 60: broken, "healthy": healthy}, hedge=False)
+
+    generation = AIService(router).generate("hi")
+    assert (generation.text, generation.model) == ("healthy", "model-healthy")
+    assert router.model == "router"
+
+def test_opens_circuit_after_repeated_failures():
+    broken = FakeProvider("broken", [0], failing=True)
+    healthy = FakeProvider("healthy", [0.01])
+    router = RouterProvider({"broken": broken, "healthy": healthy}, hedge=False, failure_threshold=2, cooldown=60)
+
+    for _ in range(2):
+        router.generate_text("hi")
+    calls_before = broken.calls
+    router.generate_text("hi")
+    assert broken.calls == calls_before
+    assert router.stats()[0]["state"] == "open"
+
+def test_raises_when_all_backends_open():
+    broken = FakeProvider("broken", [0], failing=True)
+    router = RouterProvider({"broken": broken}, failure_threshold=1, cooldown=60)
+
+    with pytest.raises(RuntimeError):
+        router.generate_text("hi")
+    with pytest.raises(NoHealthyBackend):
+        router.generate_text("hi")
+
+def test_hedges_slow_tail_requests():
+    tail = FakeProvider("tail", [0.3])
+    steady = FakeProvider("steady", [0.05])
+    router = RouterProvider({"tail": tail, "steady": steady}, min_samples=5, hedge_min_delay=0.02)
+    # History says "tail" answers in 10ms, so it is picked first; this call
+    # stalls and the hedge to "steady" wins.
+    for _ in range(10):
+        router.backends[0].record_success(0.01)
+        router.backends[1].record_success(0.05)
+
+    start = time.monotonic()
+    assert router.generate_text("hi") == "steady"
+    assert time.monotonic() - start < 0.2
+    assert router.hedges == 1
+
+def test_cache_hits_report_the_model_that_answered():
+    from app.services.ai_service import AIService
+    from app.services.lru_cache import LRUCache
+    from app.services.response_cache import ResponseCache
+    broken = FakeProvider("broken", [0], failing=True)
+    healthy = FakeProvider("healthy", [0.01])
+    ai_service = AIService(RouterProvider({"broken": broken, "healthy": healthy}, hedge=False),
+                           cache=ResponseCache(LRUCache(max_entries=10)))
+
+    ai_service.generate("hi")
+    # A fresh router has no answer of its own to report.
+    cached = AIService(RouterProvider({"healthy": healthy}), cache=ai_service.cache).generate("hi")
+    assert (cached.text, cached.model) == ("healthy", "model-healthy")
+    assert healthy.calls == 1
+
+def test_stream_fails_over_before_the_first_chunk():
+    broken = FakeProvider("broken", [0], failing=True)
+    healthy = FakeProvider("healthy", [0.01])
+    router = RouterProvider({"broken": broken, "healthy": healthy}, hedge=False)
+
+    assert "".join(router.stream_text("hi")) == "healthy"
+    assert router.answered_model() == "model-healthy"
+    assert router.backends[0].error_rate() == 1.0
+    assert len(router.backends[1].latencies) == 1
+
+def test_stream_failure_after_first_chunk_counts_against_backend():
+    flaky = FakeProvider("flaky", [0], fail_after=2)
+    router = RouterProvider({"flaky": flaky}, hedge=False, failure_threshold=1, cooldown=60)
+
+    chunks = router.stream_text("hi")
+    with pytest.raises(RuntimeError):
+        list(chunks)
+    assert router.stats()[0]["state"] == "open"
+
+def test_hedges_slow_streams():
+    tail = FakeProvider("tail", [0.3])
+    steady = FakeProvider("steady", [0.05])
+    router = RouterProvider({"tail": tail, "steady": steady}, min_samples=5, hedge_min_delay=0.02)
+    for _ in range(10):
+        router.backends[0].record_success(0.01)
+        router.backends[1].record_success(0.05)
+
+    start = time.monotonic()
+    assert "".join(router.stream_text("hi")) == "steady"
+    assert time.monotonic() - start < 0.2
+    assert router.hedges == 1
+
+def test_half_open_backend_takes_one_trial_at_a_time():
+    gate = threading.Event()
+    recovering = FakeProvider("recovering", [0], gate=gate)
+    router = RouterProvider({"recovering": recovering}, cooldown=60)
+    router.backends[0].opened_at = time.monotonic() - 61
+
+    trial = threading.Thread(target=router.generate_text, args=("hi",))
+    trial.start()
+    while recovering.calls == 0:
+        time.sleep(0.001)
+    with pytest.raises(NoHealthyBackend):
+        router.generate_text("hi")
+
+    gate.set()
+    trial.join()
+    assert router.stats()[0]["state"] == "closed"
+    assert router.generate_text("hi") == "recovering"
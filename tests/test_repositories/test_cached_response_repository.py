@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+import pytest
+from app.models import CachedResponse
+from app.repositories.cached_response_repository import CachedResponseRepository
+
+def test_set_and_get(session):
+    repo = CachedResponseRepository(session)
+    repo.set("abc", "Cached", ttl=60, model="gpt-4o")
+    assert repo.get("abc") == ("Cached", "gpt-4o")
+
+def test_set_overwrites_existing_entry(session):
+    repo = CachedResponseRepository(session)
+    repo.set("abc", "Old", ttl=60)
+    repo.set("abc", "New", ttl=60)
+    assert repo.get("abc") == ("New", None)
+
+def test_expired_entry_is_ignored_and_purged(session):
+    repo = CachedResponseRepository(session)
+    repo.set("gone", "Stale", ttl=-1)
+    assert repo.get("gone") is None
+    assert repo.purge_expired() == 1
+
+def test_set_upserts_over_row_written_elsewhere(session):
+    # Another worker cached the key after this session last looked it up.
+    session.add(CachedResponse(key="abc", response="Theirs", created_at=datetime.utcnow(),
+                               expires_at=datetime.utcnow() + timedelta(seconds=60)))
+    session.commit()
+    session.expunge_all()
+    repo = CachedResponseRepository(session)
+    repo.set("abc", "Ours", ttl=60)
+    assert repo.get("abc") == ("Ours", None)
+
+def test_set_rolls_back_on_error():
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "sqlite"
+    session.execute.side_effect = RuntimeError("db down")
+    with pytest.raises(RuntimeError):
+        CachedResponseRepository(session).set("abc", "Cached", ttl=60)
+    session.rollback.assert_called_once()
+    session.commit.assert_not_called()
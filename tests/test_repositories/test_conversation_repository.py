@@ -0,0 +1,32 @@
+from app.repositories.conversation_repository import ConversationRepository
+from app.repositories.generated_text_repository import GeneratedTextRepository
+from app.repositories.user_repository import UserRepository
+
+def test_turns_since_skips_summarized_turns(session):
+    user = UserRepository(session).create_user("ChatUser", "hash")
+    repo = ConversationRepository(session)
+    texts = GeneratedTextRepository(session)
+    conversation = repo.create(user.id, "Trip planning")
+    other = repo.create(user.id)
+    turns = [texts.create_text(user.id, f"q{i}", f"a{i}", conversation_id=conversation.id) for i in range(3)]
+    texts.create_text(user.id, "elsewhere", "x", conversation_id=other.id)
+
+    assert [t.prompt for t in repo.turns_since(conversation)] == ["q0", "q1", "q2"]
+
+    repo.update_summary(conversation, "Planning a trip", turns[1].id)
+    assert repo.find_by_id(conversation.id).summary == "Planning a trip"
+    assert [t.prompt for t in repo.turns_since(conversation, conversation.summary_through_id)] == ["q2"]
+
+def test_add_turn_moves_conversation_to_the_top(session):
+    user = UserRepository(session).create_user("ChatUser", "hash")
+    repo = ConversationRepository(session)
+    older = repo.create(user.id, "Older")
+    newer = repo.create(user.id, "Newer")
+    assert [c.title for c in repo.list_for_user(user.id, limit=10)] == ["Newer", "Older"]
+
+    stamped = older.updated_at
+    turn = repo.add_turn(older, "Hi", "Hello", model="gpt-4o-mini", params={"temperature": 0.5})
+    assert (turn.conversation_id, turn.user_id, turn.model) == (older.id, user.id, "gpt-4o-mini")
+    assert older.updated_at > stamped
+    assert [c.title for c in repo.list_for_user(user.id, limit=10)] == ["Older", "Newer"]
+    assert [t.prompt for t in repo.turns_since(older)] == ["Hi"]
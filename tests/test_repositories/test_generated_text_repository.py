@@ -1,5 +1,12 @@
 import pytest
+from app.models import GeneratedText
 from app.repositories.generated_text_repository import GeneratedTextRepository
+from app.repositories.user_repository import UserRepository
+from app.services import body_codec
+
+@pytest.fixture
+def history_user(session):
+    return UserRepository(session).create_user("HistoryUser", "hash")
 
 def test_create_text(session):
     repo = GeneratedTextRepository(session)
@@ -29,3 +36,93 @@ def test_delete_text(session):
     # Now searching should yield None
     gone = repo.find_by_id(tid)
     assert gone is None
+
+def test_create_texts(session, history_user):
+    repo = GeneratedTextRepository(session)
+    texts = repo.create_texts(user_id=history_user.id, items=[("P1", "R1", "m"), ("P2", "R2", "m")])
+    assert [t.prompt for t in texts] == ["P1", "P2"]
+    assert all(t.id is not None for t in texts)
+
+def _seed_history(repo, user_id):
+    from datetime import datetime, timedelta
+    base = datetime(2026, 1, 1)
+    texts = []
+    for i in range(5):
+        text = repo.create_text(user_id=user_id, prompt=f"Prompt {i}", response=f"Response {i}")
+        text.timestamp = base + timedelta(days=i)
+        texts.append(text)
+    repo.session.commit()
+    return texts
+
+def test_list_for_user_keyset_pagination(session, history_user):
+    repo = GeneratedTextRepository(session)
+    texts = _seed_history(repo, user_id=history_user.id)
+
+    first_page = repo.list_for_user(history_user.id, limit=2)
+    assert [t.id for t in first_page] == [texts[4].id, texts[3].id]
+
+    last = first_page[-1]
+    second_page = repo.list_for_user(history_user.id, limit=2, before=(last.timestamp, last.id))
+    assert [t.id for t in second_page] == [texts[2].id, texts[1].id]
+
+def test_list_for_user_date_range(session, history_user):
+    from datetime import datetime
+    repo = GeneratedTextRepository(session)
+    texts = _seed_history(repo, user_id=history_user.id)
+
+    found = repo.list_for_user(history_user.id, limit=10, start=datetime(2026, 1, 2), end=datetime(2026, 1, 4))
+    assert [t.id for t in found] == [texts[2].id, texts[1].id]
+
+def test_list_for_user_full_text_search(session, history_user):
+    repo = GeneratedTextRepository(session)
+    repo.create_text(user_id=history_user.id, prompt="Tell me about cats", response="Cats are great")
+    repo.create_text(user_id=history_user.id, prompt="Tell me about dogs", response="Dogs are loyal")
+
+    found = repo.list_for_user(history_user.id, limit=10, search="cat")
+    assert [t.prompt for t in found] == ["Tell me about cats"]
+
+def test_iter_rows_streams_plain_rows(session, history_user):
+    repo = GeneratedTextRepository(session)
+    for i in range(5):
+        repo.create_text(history_user.id, f"p{i}", f"r{i}", model="m", params={"max_tokens": i + 1})
+    repo.create_text(history_user.id + 1, "other", "user")
+
+    rows = list(repo.iter_rows(user_id=history_user.id, batch_size=2))
+    assert [row["prompt"] for row in rows] == ["p0", "p1", "p2", "p3", "p4"]
+    assert rows[1]["params"] == {"max_tokens": 2}
+    assert {"p4", "other"} <= {row["prompt"] for row in repo.iter_rows()}
+
+def test_bulk_import(session, history_user):
+    repo = GeneratedTextRepository(session)
+    rows = ({"id": 999, "user_id": history_user.id, "prompt": f"p{i}", "response": "r", "params": None}
+            for i in range(7))
+    assert repo.bulk_import(rows, batch_size=3) == 7
+    imported = list(repo.iter_rows(user_id=history_user.id))
+    assert [row["prompt"] for row in imported] == [f"p{i}" for i in range(7)]
+    assert all(row["timestamp"] is not None and row["id"] != 999 for row in imported)
+
+def test_compressed_bodies_round_trip(session, history_user, monkeypatch):
+    monkeypatch.setattr(body_codec, "codec", "zlib")
+    monkeypatch.setattr(body_codec, "min_bytes", 100)
+    repo = GeneratedTextRepository(session)
+    long_response = "a long generated answer " * 50
+    text = repo.create_text(history_user.id, "short", long_response)
+    assert text._prompt == "short" and text.prompt_blob is None
+    assert text._response is None and text.response_blob[:1] == b"\x03"
+
+    session.expire_all()
+    assert repo.find_by_id(text.id).response == long_response
+    rows = list(repo.iter_rows(user_id=history_user.id))
+    assert rows[-1]["response"] == long_response and "response_blob" not in rows[-1]
+
+    repo.bulk_import([{"user_id": history_user.id, "prompt": long_response, "response": "r"}])
+    imported = session.query(GeneratedText).filter_by(user_id=history_user.id).order_by(GeneratedText.id.desc()).first()
+    assert imported._prompt is None and imported.prompt == long_response
+
+def test_search_vector_tolerates_compressed_bodies():
+    from sqlalchemy.dialects import postgresql
+    from app.models import text_search_vector
+    sql = str(text_search_vector().compile(dialect=postgresql.dialect()))
+    # A NULL (compressed) body must not null out the other one.
+    assert "coalesce(generated_texts.prompt, '')" in sql
+    assert "coalesce(generated_texts.response, '')" in sql
@@ -0,0 +1,53 @@
+import pytest
+from app.repositories.generation_job_repository import GenerationJobRepository
+from app.repositories.user_repository import UserRepository
+
+@pytest.fixture
+def job_user(session):
+    return UserRepository(session).create_user("JobUser", "hash")
+
+def test_enqueue_and_claim(session, job_user):
+    repo = GenerationJobRepository(session)
+    job = repo.enqueue(job_user.id, "Queued prompt")
+    assert job.status == "queued"
+
+    claimed = repo.claim_next(lease_seconds=60)
+    assert claimed.id == job.id
+    assert claimed.status == "running"
+    assert claimed.attempts == 1
+    # The lease keeps the running job from being claimed twice.
+    assert repo.claim_next(lease_seconds=60) is None
+
+def test_mark_failed_requeues_until_max_attempts(session, job_user):
+    repo = GenerationJobRepository(session)
+    job = repo.enqueue(job_user.id, "Flaky", max_attempts=2)
+
+    repo.claim_next(lease_seconds=60)
+    repo.mark_failed(job, "timeout", retry_delay=0)
+    assert job.status == "queued"
+
+    repo.claim_next(lease_seconds=60)
+    repo.mark_failed(job, "timeout", retry_delay=0)
+    assert job.status == "failed"
+    assert job.last_error == "timeout"
+
+def test_expired_lease_on_final_attempt_fails_job(session, job_user):
+    repo = GenerationJobRepository(session)
+    stuck = repo.enqueue(job_user.id, "Crashes its worker", max_attempts=1)
+    waiting = repo.enqueue(job_user.id, "Next in line")
+
+    repo.claim_next(lease_seconds=-1)  # the worker dies; its lease is already over
+    claimed = repo.claim_next(lease_seconds=60)
+    assert claimed.id == waiting.id
+    assert stuck.status == "failed"
+    assert stuck.attempts == 1
+    assert stuck.last_error
+
+def test_expired_lease_is_reclaimed_while_attempts_remain(session, job_user):
+    repo = GenerationJobRepository(session)
+    job = repo.enqueue(job_user.id, "Crashes once", max_attempts=2)
+
+    repo.claim_next(lease_seconds=-1)
+    claimed = repo.claim_next(lease_seconds=60)
+    assert claimed.id == job.id
+    assert claimed.attempts == 2
@@ -0,0 +1,18 @@
+import pytest
+from app.repositories.rate_limit_repository import RateLimitRepository
+from app.services.rate_limiter import RateLimiter, RateLimitExceeded
+
+def test_shared_buckets_are_enforced(session):
+    limiter = RateLimiter(RateLimitRepository(session), "key", user_rps=0.01, user_burst=2)
+    limiter.check(1)
+    limiter.check(1)
+    with pytest.raises(RateLimitExceeded):
+        limiter.check(1)
+
+def test_buckets_are_shared_between_limiters(session):
+    # Two limiters stand in for two worker processes.
+    first = RateLimiter(RateLimitRepository(session), "key", user_rps=0.01, user_burst=1)
+    second = RateLimiter(RateLimitRepository(session), "key", user_rps=0.01, user_burst=1)
+    first.check(1)
+    with pytest.raises(RateLimitExceeded):
+        second.check(1)
@@ -0,0 +1,55 @@
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.models import db, ReplicaSession, GeneratedText, User
+from app.repositories.generated_text_repository import GeneratedTextRepository
+from app.repositories.user_repository import UserRepository
+
+@pytest.fixture
+def engines(tmp_path):
+    """
+    Primary and replica as two SQLite files, so the routing can be observed
+    without a replicated Postgres setup.
+    """
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    tables = [User.__table__, GeneratedText.__table__]
+    db.metadata.create_all(primary, tables=tables)
+    db.metadata.create_all(replica, tables=tables)
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+def test_replica_session_binds_to_replica_engine(engines):
+    primary, replica = engines
+    session = ReplicaSession(db=SimpleNamespace(engines={None: primary, "replica": replica}))
+    assert session.get_bind(GeneratedText) is replica
+
+    fallback = ReplicaSession(db=SimpleNamespace(engines={None: primary}))
+    assert fallback.get_bind(GeneratedText) is primary
+
+def test_reads_go_to_replica_and_writes_to_primary(engines):
+    primary, replica = engines
+    with replica.begin() as conn:
+        conn.execute(User.__table__.insert(), {"id": 1, "username": "replicated", "password_hash": "x"})
+        conn.execute(GeneratedText.__table__.insert(), {"id": 1, "user_id": 1, "prompt": "P", "response": "From replica"})
+
+    with Session(primary) as primary_session, Session(replica) as replica_session:
+        user_repo = UserRepository(primary_session, read_session=replica_session)
+        assert user_repo.find_by_id(1).username == "replicated"
+        assert user_repo.find_by_username("replicated") is None
+
+        text_repo = GeneratedTextRepository(primary_session, read_session=replica_session)
+        assert text_repo.find_by_id(1).response == "From replica"
+        assert text_repo.find_by_id(1, primary=True) is None
+
+def test_find_by_id_falls_back_to_primary_before_replication(engines):
+    primary, replica = engines
+    with Session(primary) as primary_session, Session(replica) as replica_session:
+        user = UserRepository(primary_session).create_user("Writer", "x")
+        text_repo = GeneratedTextRepository(primary_session, read_session=replica_session)
+        new_text = text_repo.create_text(user.id, "Fresh", "Not replicated yet")
+
+        assert text_repo.find_by_id(new_text.id).response == "Not replicated yet"
+        assert text_repo.list_for_user(user.id, limit=10) == []
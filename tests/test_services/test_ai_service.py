@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import MagicMock
 from app.services.ai_service import AIService
+from app.services.lru_cache import LRUCache
+from app.services.response_cache import ResponseCache
 
 def test_generate_text_success():
     provider_mock = MagicMock()
@@ -18,3 +20,141 @@ def test_generate_text_empty_prompt():
     with pytest.raises(ValueError) as exc:
         ai_service.generate_text("")
     assert "Prompt cannot be empty" in str(exc.value)
+
+def test_stream_text_passes_chunks_through():
+    provider_mock = MagicMock()
+    provider_mock.stream_text.return_value = iter(["Hel", "lo"])
+    ai_service = AIService(provider_mock)
+
+    chunks = list(ai_service.stream_text("Hi"))
+    provider_mock.stream_text.assert_called_once_with("Hi")
+    assert chunks == ["Hel", "lo"]
+
+def test_stream_text_empty_prompt():
+    provider_mock = MagicMock()
+    ai_service = AIService(provider_mock)
+
+    with pytest.raises(ValueError) as exc:
+        ai_service.stream_text("   ")
+    assert "Prompt cannot be empty" in str(exc.value)
+    provider_mock.stream_text.assert_not_called()
+
+def test_generate_text_served_from_cache():
+    provider_mock = MagicMock()
+    provider_mock.model = "test-model"
+    provider_mock.generate_text.return_value = "Mocked response"
+    ai_service = AIService(provider_mock, cache=ResponseCache(LRUCache(max_bytes=1024)))
+
+    assert ai_service.generate_text("Hello") == "Mocked response"
+    assert ai_service.generate_text("  Hello ") == "Mocked response"
+    provider_mock.generate_text.assert_called_once_with("Hello")
+
+def test_generate_text_cache_bypass():
+    provider_mock = MagicMock()
+    provider_mock.model = "test-model"
+    provider_mock.generate_text.side_effect = ["First", "Second"]
+    ai_service = AIService(provider_mock, cache=ResponseCache(LRUCache(max_bytes=1024)))
+
+    ai_service.generate_text("Hello")
+    assert ai_service.generate_text("Hello", use_cache=False) == "Second"
+    assert ai_service.generate_text("Hello") == "Second"
+    assert provider_mock.generate_text.call_count == 2
+
+def test_generate_batch_reports_per_item_errors():
+    provider_mock = MagicMock()
+    provider_mock.generate_text.side_effect = lambda prompt: f"Re: {prompt}"
+    ai_service = AIService(provider_mock)
+
+    outcomes = sorted(ai_service.generate_batch(["A", "", "C"], max_parallel=2), key=lambda o: o[0])
+    assert (outcomes[0][0], outcomes[0][1].text, outcomes[0][2]) == (0, "Re: A", None)
+    assert isinstance(outcomes[1][2], ValueError)
+    assert (outcomes[2][0], outcomes[2][1].text, outcomes[2][2]) == (2, "Re: C", None)
+
+def test_generate_batch_reads_and_writes_the_sql_shared_cache(app, db):
+    from flask_sqlalchemy.session import _app_ctx_id
+    from sqlalchemy.orm import scoped_session, sessionmaker
+    from app.models import CachedResponse
+    from app.repositories.cached_response_repository import CachedResponseRepository
+
+    provider_mock = MagicMock()
+    provider_mock.model = "test-model"
+    provider_mock.answered_model.return_value = "test-model"
+    provider_mock.generate_text.side_effect = lambda prompt: f"Re: {prompt}"
+    with app.app_context():
+        # Scoped per app context, like db.session outside the test fixtures.
+        session = scoped_session(sessionmaker(bind=db.engine), scopefunc=_app_ctx_id)
+        def make_service():
+            return AIService(provider_mock, cache=ResponseCache(
+                LRUCache(max_bytes=1024), shared=CachedResponseRepository(session)
+            ))
+        try:
+            first = sorted(make_service().generate_batch(["A", "B"], max_parallel=2), key=lambda o: o[0])
+            assert [o[1].text for o in first] == ["Re: A", "Re: B"]
+            assert session.query(CachedResponse).count() == 2
+
+            # A fresh in-process LRU: the hits can only come from the table.
+            second = sorted(make_service().generate_batch(["A", "B"], max_parallel=2), key=lambda o: o[0])
+            assert [o[1].text for o in second] == ["Re: A", "Re: B"]
+            assert provider_mock.generate_text.call_count == 2
+        finally:
+            session.query(CachedResponse).delete()
+            session.commit()
+            session.remove()
+
+def test_generate_text_passes_params_and_keys_cache_on_them():
+    provider_mock = MagicMock(model="base")
+    provider_mock.generate_text.side_effect = lambda prompt, **params: f"{params.get('max_tokens')}"
+    ai_service = AIService(provider_mock, cache=ResponseCache(LRUCache(max_entries=10)))
+
+    assert ai_service.generate_text("Hi", params={"max_tokens": 5}) == "5"
+    assert ai_service.generate_text("Hi", params={"max_tokens": 9}) == "9"
+    assert ai_service.generate_text("Hi", params={"max_tokens": 5}) == "5"
+    assert provider_mock.generate_text.call_count == 2
+    assert ai_service.model_for({"model": "gpt-4o"}) == "gpt-4o"
+    assert ai_service.model_for() == "base"
+
+def test_generate_text_rejects_prompt_over_context_before_provider_call():
+    from app.services.token_budget import TokenBudgeter, PromptTooLong
+    provider_mock = MagicMock(model="small")
+    ai_service = AIService(provider_mock, budgeter=TokenBudgeter({"small": 64}))
+
+    with pytest.raises(PromptTooLong):
+        ai_service.generate_text("word " * 200)
+    provider_mock.generate_text.assert_not_called()
+
+def test_generate_chat_reserves_history_in_budget():
+    from app.services.token_budget import PromptTooLong, TokenBudgeter
+    provider_mock = MagicMock()
+    provider_mock.model = "small"
+    provider_mock.generate_chat.return_value = "Reply"
+    ai_service = AIService(provider_mock, budgeter=TokenBudgeter({"small": 150}))
+    history = [{"role": "user", "content": "x" * 300}, {"role": "assistant", "content": "ok"}]
+
+    assert ai_service.generate_chat(history + [{"role": "user", "content": "short"}]) == "Reply"
+    with pytest.raises(PromptTooLong):
+        ai_service.generate_chat(history + [{"role": "user", "content": "y" * 400}])
+
+def test_truncated_prompt_is_returned_with_the_generation():
+    from app.services.token_budget import TokenBudgeter
+    provider_mock = MagicMock(model="small")
+    provider_mock.generate_text.side_effect = lambda prompt, **params: "ok"
+    ai_service = AIService(provider_mock, budgeter=TokenBudgeter({"small": 64}, overflow="truncate"))
+
+    generation = ai_service.generate("word " * 200)
+    assert generation.prompt == provider_mock.generate_text.call_args.args[0]
+    assert len(generation.prompt) < len("word " * 200)
+
+def test_context_windows_cover_local_and_router_backends():
+    from app.config import Config
+    from app.providers.base_ai_provider import BaseAIProvider
+    from app.providers.router_provider import RouterProvider
+    from app.services.ai_service import context_windows
+    local = BaseAIProvider()
+    local.model, local.context_window = "local:tiny.gguf", 2048
+    remote = BaseAIProvider()
+    remote.model = "gpt-4o-mini"
+
+    windows = context_windows(RouterProvider({"local": local, "openai": remote}))
+    assert windows["local:tiny.gguf"] == 2048
+    assert windows["router"] == 2048
+    assert context_windows(remote)["gpt-4o-mini"] == Config.AI_ALLOWED_MODELS["gpt-4o-mini"]
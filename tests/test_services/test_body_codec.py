@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import text
+from app.services.body_codec import decode_body, encode_body, rewrite_bodies
+
+BODY = "The quick brown fox jumps over the lazy dog. " * 100
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd", "lz4"])
+def test_round_trip(codec):
+    if codec != "zlib":
+        pytest.importorskip({"zstd": "zstandard", "lz4": "lz4.frame"}[codec])
+    body, blob = encode_body(BODY, codec, 1024)
+    assert body is None
+    assert len(blob) < len(BODY)
+    assert decode_body(body, blob) == BODY
+
+def test_small_or_incompressible_bodies_stay_text():
+    assert encode_body("short", "zlib", 1024) == ("short", None)
+    assert encode_body(BODY, "none", 0) == (BODY, None)
+    # Kept as text when compression would not make it smaller.
+    assert encode_body("ab", "zlib", 0) == ("ab", None)
+
+def test_unavailable_codec_names_the_package(monkeypatch):
+    import builtins
+    real_import = builtins.__import__
+    def fake_import(name, *args, **kwargs):
+        if name == "lz4.frame":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+    with pytest.raises(RuntimeError, match="pip install lz4"):
+        encode_body(BODY, "lz4", 0)
+
+def test_rewrite_bodies_converts_and_restores(session):
+    connection = session.connection()
+    connection.execute(text(
+        "INSERT INTO generated_texts (user_id, prompt, response, \"timestamp\") "
+        "VALUES (1, 'tiny', :body, '2024-01-01 00:00:00')"
+    ), {"body": BODY})
+    row_id = connection.execute(text("SELECT max(id) FROM generated_texts")).scalar()
+    select_row = text("SELECT prompt, response, prompt_blob, response_blob FROM generated_texts WHERE id = :id")
+
+    assert rewrite_bodies(connection, "zlib", 1024, batch_size=2) >= 1
+    row = connection.execute(select_row, {"id": row_id}).one()
+    assert (row.prompt, row.response, row.prompt_blob) == ("tiny", None, None)
+    assert decode_body(row.response, row.response_blob) == BODY
+
+    assert rewrite_bodies(connection, "none", 0) >= 1
+    row = connection.execute(select_row, {"id": row_id}).one()
+    assert (row.response, row.response_blob) == (BODY, None)
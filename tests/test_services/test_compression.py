@@ -0,0 +1,36 @@
+import gzip
+import pytest
+from flask import Flask, Response, jsonify
+from app import compression
+
+app = Flask(__name__)
+
+def compressed(response, accept="gzip", min_bytes=100):
+    with app.test_request_context(headers={"Accept-Encoding": accept}):
+        return compression.compress_response(response, min_bytes)
+
+def test_gzips_large_json_and_weakens_etag():
+    with app.app_context():
+        response = jsonify({"text": "a" * 1000})
+    response.add_etag()
+    etag = response.get_etag()[0]
+    response = compressed(response)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.get_etag() == (etag, True)
+    assert int(response.headers["Content-Length"]) == len(response.get_data())
+    assert b"a" * 1000 in gzip.decompress(response.get_data())
+
+def test_skips_small_streamed_and_unaccepted_responses():
+    with app.app_context():
+        small = compressed(jsonify({"ok": True}))
+        unaccepted = compressed(jsonify({"text": "a" * 1000}), accept="identity")
+    streamed = compressed(Response(iter([b"a" * 1000]), mimetype="application/json"))
+    for response in (small, unaccepted, streamed):
+        assert "Content-Encoding" not in response.headers
+
+def test_prefers_brotli_when_installed():
+    brotli = pytest.importorskip("brotli")
+    with app.app_context():
+        response = compressed(jsonify({"text": "a" * 1000}), accept="gzip, br")
+    assert response.headers["Content-Encoding"] == "br"
+    assert b"a" * 1000 in brotli.decompress(response.get_data())
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from app.services.ai_service import AIService
+from app.services.conversation_service import ConversationService
+from app.services.token_budget import TokenBudgeter
+
+def make_turn(turn_id, prompt, response):
+    return SimpleNamespace(id=turn_id, prompt=prompt, response=response)
+
+def make_service(turns, history_tokens=3000, keep_turns=2):
+    provider = MagicMock()
+    provider.model = "gpt-4o-mini"
+    provider.answered_model.return_value = "gpt-4o-mini"
+    provider.generate_chat.return_value = "Reply"
+    provider.generate_text.return_value = "Summary"
+    conversation_repo = MagicMock()
+    conversation_repo.turns_since.return_value = turns
+    service = ConversationService(
+        AIService(provider, budgeter=TokenBudgeter({}, default_context=8192)),
+        conversation_repo,
+        history_tokens=history_tokens,
+        keep_turns=keep_turns,
+    )
+    return service, provider, conversation_repo
+
+def test_send_message_sends_history_and_stores_turn():
+    conversation = SimpleNamespace(id=7, user_id=1, summary=None, summary_through_id=None)
+    service, provider, conversation_repo = make_service([make_turn(1, "Hi", "Hello")])
+
+    service.send_message(conversation, "How are you?", {"temperature": 0.5})
+
+    provider.generate_chat.assert_called_once_with([
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": "Hello"},
+        {"role": "user", "content": "How are you?"},
+    ], temperature=0.5)
+    provider.generate_text.assert_not_called()
+    conversation_repo.turns_since.assert_called_once_with(conversation, None)
+    conversation_repo.add_turn.assert_called_once_with(
+        conversation, "How are you?", "Reply", model="gpt-4o-mini", params={"temperature": 0.5}
+    )
+
+def test_long_history_is_compacted_into_summary():
+    conversation = SimpleNamespace(id=7, user_id=1, summary="Earlier facts", summary_through_id=3)
+    turns = [make_turn(i, f"question {i} " + "x" * 400, f"answer {i}") for i in range(4, 9)]
+    service, provider, conversation_repo = make_service(turns, history_tokens=200, keep_turns=2)
+
+    service.send_message(conversation, "Next")
+
+    summary_prompt = provider.generate_text.call_args.args[0]
+    assert "Earlier facts" in summary_prompt
+    assert "question 6" in summary_prompt and "question 7" not in summary_prompt
+    assert provider.generate_text.call_args.kwargs["max_tokens"] == 300
+    conversation_repo.update_summary.assert_called_once_with(conversation, "Summary", 6)
+
+    messages = provider.generate_chat.call_args.args[0]
+    assert messages[0]["role"] == "system" and "Earlier facts" in messages[0]["content"]
+    assert [m["content"] for m in messages[1:]] == [
+        turns[3].prompt, "answer 7", turns[4].prompt, "answer 8", "Next",
+    ]
+
+def test_short_history_keeps_stored_summary():
+    conversation = SimpleNamespace(id=7, user_id=1, summary="Earlier facts", summary_through_id=3)
+    service, provider, conversation_repo = make_service([make_turn(4, "Hi", "Hello")] * 3, keep_turns=2)
+
+    service.send_message(conversation, "Next")
+
+    provider.generate_text.assert_not_called()
+    conversation_repo.update_summary.assert_not_called()
+    conversation_repo.turns_since.assert_called_once_with(conversation, 3)
+
+def test_compaction_behind_router_lets_backend_pick_its_model():
+    from app.providers.base_ai_provider import BaseAIProvider
+    from app.providers.router_provider import RouterProvider
+
+    class Backend(BaseAIProvider):
+        model = "gpt-4o-mini"
+
+        def __init__(self):
+            self.text_params = []
+
+        def generate_text(self, prompt, **params):
+            self.text_params.append(params)
+            return "Summary"
+
+        def generate_chat(self, messages, **params):
+            return "Reply"
+
+    backend = Backend()
+    conversation = SimpleNamespace(id=7, user_id=1, summary=None, summary_through_id=None)
+    turns = [make_turn(i, f"question {i} " + "x" * 400, f"answer {i}") for i in range(1, 6)]
+    conversation_repo = MagicMock()
+    conversation_repo.turns_since.return_value = turns
+    service = ConversationService(
+        AIService(RouterProvider({"openai": backend}, hedge=False), budgeter=TokenBudgeter({}, default_context=8192)),
+        conversation_repo, history_tokens=200, keep_turns=2,
+    )
+
+    service.send_message(conversation, "Next")
+
+    assert backend.text_params == [{"max_tokens": 300}]
+    conversation_repo.update_summary.assert_called_once_with(conversation, "Summary", 3)
@@ -0,0 +1,45 @@
+import asyncio
+import time
+import pytest
+from app.providers.scheduled_provider import ScheduledProvider
+from app.providers.stub_provider import AsyncStubProvider
+from app.services.generation_scheduler import GenerationScheduler, SchedulerOverloaded, SchedulerTimeout
+
+def test_scheduled_provider_returns_result():
+    provider = ScheduledProvider(AsyncStubProvider(), GenerationScheduler(max_in_flight=2))
+    assert provider.generate_text("Hello") == "Echo: Hello"
+
+def test_scheduler_bounds_in_flight():
+    scheduler = GenerationScheduler(max_in_flight=3)
+    peak = {"current": 0, "max": 0}
+
+    async def call():
+        peak["current"] += 1
+        peak["max"] = max(peak["max"], peak["current"])
+        await asyncio.sleep(0.02)
+        peak["current"] -= 1
+        return "ok"
+
+    futures = [scheduler.submit(call) for _ in range(12)]
+    assert [f.result() for f in futures] == ["ok"] * 12
+    assert peak["max"] == 3
+
+def test_scheduler_times_out_queued_requests():
+    scheduler = GenerationScheduler(max_in_flight=1)
+    slow = scheduler.submit(lambda: asyncio.sleep(0.3))
+
+    with pytest.raises(SchedulerTimeout):
+        scheduler.run(lambda: asyncio.sleep(0), timeout=0.05)
+    slow.result()
+
+def test_scheduler_rejects_when_queue_full():
+    scheduler = GenerationScheduler(max_in_flight=1, max_queued=1)
+    running = scheduler.submit(lambda: asyncio.sleep(0.2))
+    while scheduler.in_flight == 0:
+        time.sleep(0.005)
+    waiting = scheduler.submit(lambda: asyncio.sleep(0))
+
+    with pytest.raises(SchedulerOverloaded):
+        scheduler.submit(lambda: asyncio.sleep(0))
+    running.result()
+    waiting.result()
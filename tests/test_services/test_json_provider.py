@@ -0,0 +1,35 @@
+from datetime import datetime
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+orjson = pytest.importorskip("orjson")
+from app.json_provider import OrjsonProvider
+
+def test_output_matches_default_provider():
+    app = Flask(__name__)
+    payload = {"timestamp": datetime(2024, 5, 1, 12, 30), "id": 7, "params": {"stop": ["\n"]}, "prompt": None}
+    with app.app_context():
+        expected = DefaultJSONProvider(app).response(payload).get_data()
+        assert OrjsonProvider(app).response(payload).get_data() == expected
+
+def test_response_and_loads():
+    app = Flask(__name__)
+    provider = OrjsonProvider(app)
+    with app.app_context():
+        response = provider.response({"b": 1, "a": "é"})
+    assert response.mimetype == "application/json"
+    assert response.get_data() == '{"a":"é","b":1}\n'.encode("utf-8")
+    assert provider.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+
+def test_validation_errors_with_integer_keys():
+    from marshmallow import ValidationError
+    from app.validation import BatchGenerateTextSchema
+    app = Flask(__name__)
+    try:
+        BatchGenerateTextSchema().load({"prompts": ["ok", 5]})
+    except ValidationError as err:
+        messages = err.messages
+    with app.app_context():
+        body = OrjsonProvider(app).response(messages).get_data()
+    assert body == b'{"prompts":{"1":["Not a valid string."]}}\n'
@@ -0,0 +1,21 @@
+import json
+import logging
+from app import log_config
+from app.log_config import JsonFormatter, payload
+
+def test_payload_truncates_long_text(monkeypatch):
+    monkeypatch.setattr(log_config, "payload_max_chars", 10)
+    assert str(payload("short")) == "short"
+    assert str(payload("x" * 50)) == "xxxxxxxxxx... [50 chars]"
+
+def test_payload_logged_in_full_when_unlimited(monkeypatch):
+    monkeypatch.setattr(log_config, "payload_max_chars", 0)
+    assert str(payload("x" * 50)) == "x" * 50
+
+def test_json_formatter_includes_request_id():
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, "Prompt: %s", (payload("hi"),), None)
+    record.request_id = "abc123"
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Prompt: hi"
+    assert entry["request_id"] == "abc123"
+    assert entry["level"] == "INFO"
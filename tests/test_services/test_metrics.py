@@ -0,0 +1,45 @@
+import pytest
+from app import metrics
+from app.metrics import Counter, Histogram, Registry
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.register(Histogram("op_seconds", "Op latency.", ("op",), buckets=(0.1, 1.0)))
+    latency.observe(0.05, "read")
+    latency.observe(0.5, "read")
+    latency.observe(5, "read")
+
+    lines = registry.render().splitlines()
+    assert 'op_seconds_bucket{op="read",le="0.1"} 1' in lines
+    assert 'op_seconds_bucket{op="read",le="1.0"} 2' in lines
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 3' in lines
+    assert 'op_seconds_count{op="read"} 3' in lines
+    assert "# TYPE op_seconds histogram" in lines
+
+def test_counter_escapes_label_values():
+    registry = Registry()
+    errors = registry.register(Counter("errors_total", "Errors.", ("model",)))
+    errors.inc('gpt "x"')
+    errors.inc('gpt "x"', amount=2)
+    assert 'errors_total{model="gpt \\"x\\""} 3' in registry.render()
+
+def test_timed_records_stage(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    before = metrics.stage_latency.count("unit_test")
+
+    @metrics.timed("unit_test")
+    def work():
+        return "done"
+
+    assert work() == "done"
+    assert metrics.stage_latency.count("unit_test") == before + 1
+
+def test_timed_is_a_no_op_when_disabled(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", False)
+
+    def work():
+        return "done"
+
+    assert metrics.timed("unit_test")(work) is work
+    with metrics.stage_timer("unit_test"):
+        pass
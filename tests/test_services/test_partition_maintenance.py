@@ -0,0 +1,58 @@
+import gzip
+from datetime import date
+from unittest.mock import MagicMock
+from app.services.partition_maintenance import PartitionMaintenance, add_months, partition_name
+
+def make_session(existing):
+    session = MagicMock()
+    listing = [(name,) for name in existing] + [("generated_texts_default",)]
+    session.execute.side_effect = lambda statement, params=None: listing if "pg_inherits" in str(statement) else None
+    return session
+
+def executed(session):
+    return [str(call.args[0]) for call in session.execute.call_args_list if "pg_inherits" not in str(call.args[0])]
+
+def test_add_months_crosses_years():
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partition_name(date(2024, 3, 1)) == "generated_texts_p2024_03"
+
+def test_create_ahead_only_creates_missing_months():
+    session = make_session(["generated_texts_p2024_11", "generated_texts_p2024_12"])
+    created = PartitionMaintenance(session).create_ahead(2, today=date(2024, 11, 20))
+
+    assert created == ["generated_texts_p2025_01"]
+    assert executed(session) == [
+        "CREATE TABLE generated_texts_p2025_01 PARTITION OF generated_texts "
+        "FOR VALUES FROM ('2025-01-01') TO ('2025-02-01')"
+    ]
+
+def test_retention_archives_then_drops_old_partitions(tmp_path):
+    session = make_session(["generated_texts_p2024_01", "generated_texts_p2024_02", "generated_texts_p2024_03"])
+    cursor = session.connection.return_value.connection.cursor.return_value
+    cursor.copy_expert.side_effect = lambda sql, f: f.write(b"1\t2\tprompt\n")
+
+    archived = PartitionMaintenance(session).apply_retention(1, str(tmp_path), today=date(2024, 4, 10))
+
+    assert archived == [str(tmp_path / "generated_texts_p2024_01.tsv.gz"), str(tmp_path / "generated_texts_p2024_02.tsv.gz")]
+    with gzip.open(archived[0]) as f:
+        assert f.read() == b"1\t2\tprompt\n"
+    assert executed(session) == [
+        "ALTER TABLE generated_texts DETACH PARTITION generated_texts_p2024_01",
+        "DROP TABLE generated_texts_p2024_01",
+        "ALTER TABLE generated_texts DETACH PARTITION generated_texts_p2024_02",
+        "DROP TABLE generated_texts_p2024_02",
+    ]
+
+def test_maintenance_command_purges_expired_cache_entries(app, monkeypatch):
+    from app import main, maintenance
+    partitions, cache_repo = MagicMock(), MagicMock()
+    cache_repo.return_value.purge_expired.return_value = 3
+    monkeypatch.setattr(main, "create_app", lambda: app)
+    monkeypatch.setattr(maintenance, "PartitionMaintenance", partitions)
+    monkeypatch.setattr(maintenance, "CachedResponseRepository", cache_repo)
+
+    maintenance.main(["--months-ahead", "1"])
+
+    partitions.return_value.create_ahead.assert_called_once_with(1)
+    cache_repo.return_value.purge_expired.assert_called_once_with()
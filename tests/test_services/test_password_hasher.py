@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from unittest.mock import MagicMock
+from app.models import User
+from app.services.password_hasher import PasswordHasher, HasherOverloaded
+from app.services.user_service import UserService
+
+def test_hash_and_verify_inline():
+    hasher = PasswordHasher(rounds=4, workers=0)
+    password_hash = hasher.hash("secret")
+    assert hasher.verify("secret", password_hash)
+    assert not hasher.verify("wrong", password_hash)
+
+def test_hash_and_verify_in_process_pool():
+    hasher = PasswordHasher(rounds=4, workers=1)
+    password_hash = hasher.hash("secret")
+    assert hasher.verify("secret", password_hash)
+
+def test_needs_rehash_when_rounds_change():
+    old_hash = PasswordHasher(rounds=4, workers=0).hash("secret")
+    assert not PasswordHasher(rounds=4, workers=0).needs_rehash(old_hash)
+    assert PasswordHasher(rounds=5, workers=0).needs_rehash(old_hash)
+
+def test_rejects_when_queue_is_full():
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1)
+    hasher._pending.acquire()
+    with pytest.raises(HasherOverloaded):
+        hasher.hash("secret")
+
+def test_verify_credentials_rehashes_outdated_hash():
+    repo_mock = MagicMock()
+    user_stub = User(username="creds", password_hash=PasswordHasher(rounds=4, workers=0).hash("mypassword"))
+    repo_mock.find_by_username.return_value = user_stub
+    service = UserService(repo_mock, PasswordHasher(rounds=5, workers=0))
+
+    assert service.verify_credentials("creds", "mypassword") == user_stub
+    user, new_hash = repo_mock.update_password_hash.call_args[0]
+    assert user is user_stub
+    assert "$05$" in new_hash
+
+def test_timed_out_operation_keeps_its_slot_until_it_finishes():
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1, timeout=0.05)
+    hasher._executor = lambda: executor
+    try:
+        with pytest.raises(HasherOverloaded, match="timed out"):
+            hasher._run(release.wait)
+        # The timed-out operation is still running and still holds the slot.
+        with pytest.raises(HasherOverloaded, match="in progress"):
+            hasher._run(release.wait)
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
+    assert hasher._pending.acquire(blocking=False)
@@ -0,0 +1,41 @@
+import pytest
+from app.services.rate_limiter import RateLimiter, RateLimitExceeded, InMemoryRateLimitBackend, estimate_tokens
+
+def test_allows_burst_then_rejects_with_retry_after():
+    limiter = RateLimiter(InMemoryRateLimitBackend(), "key", user_rps=1, user_burst=2)
+    limiter.check(1)
+    limiter.check(1)
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter.check(1)
+    assert 0 < exc.value.retry_after <= 1
+    assert limiter.rejected == 1
+
+def test_users_have_separate_buckets():
+    limiter = RateLimiter(InMemoryRateLimitBackend(), "key", user_rps=1, user_burst=1)
+    limiter.check(1)
+    limiter.check(2)
+
+def test_token_budget_is_enforced():
+    limiter = RateLimiter(InMemoryRateLimitBackend(), "key", user_tpm=600)
+    limiter.check(1, tokens=500)
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter.check(1, tokens=200)
+    # 100 tokens short at 10 tokens/s
+    assert exc.value.retry_after == pytest.approx(10, rel=0.05)
+
+def test_rejected_request_does_not_consume_other_buckets():
+    limiter = RateLimiter(InMemoryRateLimitBackend(), "key", user_rps=0.01, user_burst=2, user_tpm=600)
+    limiter.check(1, tokens=550)
+    with pytest.raises(RateLimitExceeded):
+        limiter.check(1, tokens=100)
+    # The request slot was not spent by the rejected call.
+    limiter.check(1, tokens=0)
+
+def test_global_limit_applies_across_users():
+    limiter = RateLimiter(InMemoryRateLimitBackend(), "key", global_rps=1)
+    limiter.check(1)
+    with pytest.raises(RateLimitExceeded):
+        limiter.check(2)
+
+def test_estimate_tokens():
+    assert estimate_tokens("a" * 400, 100) == 201
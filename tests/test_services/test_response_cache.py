@@ -0,0 +1,54 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from app.services.lru_cache import LRUCache
+from app.services.response_cache import CachedText, ResponseCache, build_request_key
+
+def test_lru_cache_evicts_least_recently_used_by_bytes():
+    cache = LRUCache(max_bytes=10)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    cache.get("a")
+    cache.set("c", "cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+    assert cache.current_bytes == 8
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(max_bytes=100, ttl=0.01)
+    cache.set("a", "value")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.current_bytes == 0
+
+def test_build_request_key_normalizes_whitespace():
+    assert build_request_key("  Hello   world ", "gpt") == build_request_key("Hello world", "gpt")
+    assert build_request_key("Hello world", "gpt") != build_request_key("Hello world", "other")
+    assert build_request_key("Hello", "gpt", {"max_tokens": 5}) != build_request_key("Hello", "gpt")
+
+def test_response_cache_counts_hits_and_misses():
+    cache = ResponseCache(LRUCache(max_bytes=1024))
+    assert cache.get("k") is None
+    cache.set("k", "v")
+    assert cache.get("k").text == "v"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_ratio"] == 0.5
+
+def test_response_cache_falls_back_to_shared_backend():
+    shared = MagicMock()
+    shared.get.return_value = ("from shared", "gpt-4o")
+    cache = ResponseCache(LRUCache(max_bytes=1024), shared=shared, ttl=60)
+
+    assert cache.get("k") == CachedText("from shared", "gpt-4o")
+    assert cache.local.get("k") == CachedText("from shared", "gpt-4o")
+
+    cache.set("other", "v", "gpt-4o-mini")
+    shared.set.assert_called_once_with("other", "v", 60, "gpt-4o-mini")
+
+def test_lru_cache_sizes_cached_text_by_its_strings():
+    cache = LRUCache(max_bytes=100)
+    cache.set("k", CachedText("abcd", "gpt"))
+    assert cache.current_bytes == 7
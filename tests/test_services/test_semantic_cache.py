@@ -0,0 +1,128 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+from app.services.ai_service import AIService
+
+pytest.importorskip("numpy")
+from app.services.semantic_cache import FlatIndex, HashingEmbedder, SemanticCache, scope_key
+
+SCOPE = scope_key("gpt-4o-mini")
+
+def make_cache(capacity=100, index=None, embedder=None, ttl=None):
+    embedder = embedder or HashingEmbedder(256)
+    return SemanticCache(embedder, index or FlatIndex(embedder.dim, capacity), threshold=0.9, ttl=ttl)
+
+class OrderAwareEmbedder(HashingEmbedder):
+    # Stands in for a sentence-transformers model in the guard tests.
+    word_order = True
+
+def test_near_duplicate_prompt_hits():
+    cache = make_cache()
+    cache.set("What is the capital of France?", SCOPE, "Paris")
+
+    assert cache.get("what is the  capital of france", SCOPE).text == "Paris"
+    assert cache.get("What is the capital of France!!", SCOPE).text == "Paris"
+    assert cache.get("What is the capital of Germany?", SCOPE) is None
+    assert cache.stats()["hits"] == 2
+
+def test_scope_must_match():
+    cache = make_cache()
+    cache.set("What is the capital of France?", SCOPE, "Paris")
+    assert cache.get("What is the capital of France?", scope_key("gpt-4o")) is None
+    assert cache.get("What is the capital of France?", scope_key("gpt-4o-mini", {"max_tokens": 5})) is None
+
+def test_oldest_entries_are_overwritten_at_capacity():
+    cache = make_cache(capacity=2)
+    cache.set("first prompt about cats", SCOPE, "1")
+    cache.set("second prompt about dogs", SCOPE, "2")
+    cache.set("third prompt about birds", SCOPE, "3")
+
+    assert cache.get("first prompt about cats", SCOPE) is None
+    assert cache.get("third prompt about birds", SCOPE).text == "3"
+    assert cache.stats()["entries"] == 2
+
+def test_save_and_load(tmp_path):
+    cache = make_cache()
+    cache.set_many(["Tell me a joke", "Write a haiku about autumn leaves"], SCOPE, ["joke", "haiku"], ["small", "large"])
+    cache.save(str(tmp_path))
+
+    restored = make_cache()
+    assert restored.load(str(tmp_path))
+    assert restored.get("write a haiku about autumn leaves.", SCOPE) == ("haiku", "large")
+
+def test_save_replaces_snapshot_and_skips_unchanged_caches(tmp_path):
+    cache = make_cache()
+    cache.set("Tell me a joke", SCOPE, "joke")
+    cache.save_if_changed(str(tmp_path))
+    first = os.path.realpath(tmp_path / "current")
+
+    # A loaded but unchanged copy (a preloading master) never saves.
+    stale = make_cache()
+    stale.load(str(tmp_path))
+    stale.save_if_changed(str(tmp_path))
+    assert os.path.realpath(tmp_path / "current") == first
+
+    cache.set("Write a haiku", SCOPE, "haiku")
+    cache.save_if_changed(str(tmp_path))
+    assert os.path.realpath(tmp_path / "current") != first
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith("snapshot-")] == [os.path.basename(os.path.realpath(tmp_path / "current"))]
+    restored = make_cache()
+    assert restored.load(str(tmp_path))
+    assert restored.get("Write a haiku", SCOPE).text == "haiku"
+
+def test_hashing_embedder_ignores_word_order():
+    embedder = HashingEmbedder(256)
+    assert float(embedder("the cat chased the dog") @ embedder("the dog chased the cat")) > 0.999
+
+SUMMARY = (
+    "Summarize the quarterly report for the board in three bullet points. Revenue {verb} by {share} percent "
+    "compared with last quarter, driven mostly by subscriptions in the European market, while operating "
+    "costs stayed flat and headcount was unchanged across all departments."
+)
+
+@pytest.mark.parametrize("embedder", [HashingEmbedder(256), OrderAwareEmbedder(256)])
+@pytest.mark.parametrize("stored, asked", [
+    ("Alice owes Bob 50 dollars", "Bob owes Alice 50 dollars"),
+    (SUMMARY.format(verb="grew", share=12), SUMMARY.format(verb="grew", share=40)),
+])
+def test_swapped_names_and_changed_figures_miss(embedder, stored, asked):
+    cache = make_cache(embedder=embedder)
+    cache.set(stored, SCOPE, "answer")
+    assert cache.get(asked, SCOPE) is None
+
+def test_changed_verb_misses_with_hashing_embedder():
+    cache = make_cache()
+    cache.set(SUMMARY.format(verb="grew", share=12), SCOPE, "answer")
+    assert cache.get(SUMMARY.format(verb="fell", share=12), SCOPE) is None
+
+def test_order_aware_embedder_allows_paraphrases_with_same_facts():
+    cache = make_cache(embedder=OrderAwareEmbedder(256))
+    cache.set("What is the capital of France?", SCOPE, "Paris")
+    assert cache.get("What's the capital of France?", SCOPE).text == "Paris"
+
+def test_expired_entries_miss(tmp_path):
+    cache = make_cache(ttl=-1)
+    cache.set("Tell me a joke", SCOPE, "joke")
+    assert cache.get("Tell me a joke", SCOPE) is None
+
+    cache.save(str(tmp_path))
+    restored = make_cache(ttl=60)
+    assert restored.load(str(tmp_path))
+    assert restored.get("Tell me a joke", SCOPE) is None
+
+def test_hnsw_index_matches_flat_results():
+    pytest.importorskip("hnswlib")
+    from app.services.semantic_cache import HnswIndex
+    cache = make_cache(index=HnswIndex(256, 100))
+    cache.set_many([f"prompt number {i} about topic {i * 7}" for i in range(50)], SCOPE, [str(i) for i in range(50)])
+    assert cache.get("Prompt number 17 about topic 119", SCOPE).text == "17"
+
+def test_ai_service_serves_semantic_hits():
+    provider_mock = MagicMock()
+    provider_mock.model = "gpt-4o-mini"
+    provider_mock.generate_text.return_value = "Paris"
+    ai_service = AIService(provider_mock, semantic_cache=make_cache())
+
+    ai_service.generate_text("What is the capital of France?")
+    assert ai_service.generate_text("what is the capital of France") == "Paris"
+    provider_mock.generate_text.assert_called_once()
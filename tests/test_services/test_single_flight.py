@@ -0,0 +1,64 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from app.services.ai_service import AIService
+from app.services.single_flight import SingleFlight
+
+def _run_concurrently(fn, count):
+    results = [None] * count
+    def worker(i):
+        results[i] = fn()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "shared"
+
+    results = _run_concurrently(lambda: flight.do("key", slow), 5)
+    assert results == ["shared"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "collapsed": 4}
+
+def test_errors_propagate_to_waiters():
+    flight = SingleFlight()
+    errors = []
+
+    def failing():
+        time.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    def call():
+        try:
+            flight.do("key", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    _run_concurrently(call, 3)
+    assert errors == ["upstream down"] * 3
+
+def test_sequential_calls_are_not_collapsed():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: "a") == "a"
+    assert flight.do("key", lambda: "b") == "b"
+    assert flight.stats()["collapsed"] == 0
+
+def test_ai_service_coalesces_identical_prompts():
+    provider_mock = MagicMock()
+    provider_mock.model = "test-model"
+    provider_mock.generate_text.side_effect = lambda prompt: time.sleep(0.1) or "Mocked"
+    ai_service = AIService(provider_mock, single_flight=SingleFlight())
+
+    results = _run_concurrently(lambda: ai_service.generate_text("Same prompt"), 4)
+    assert results == ["Mocked"] * 4
+    assert provider_mock.generate_text.call_count == 1
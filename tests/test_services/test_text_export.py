@@ -0,0 +1,27 @@
+from datetime import datetime
+import pytest
+from app.services.text_export import export_chunks, read_rows
+
+ROWS = [
+    {"id": i, "user_id": 1, "prompt": f"line\n{i}", "response": "r", "model": "gpt-4o-mini",
+     "params": {"temperature": 0.5} if i % 2 else None, "conversation_id": None,
+     "timestamp": datetime(2024, 1, 1, 12, 0, i)}
+    for i in range(5)
+]
+
+@pytest.mark.parametrize("fmt", ["ndjson", "parquet", "arrow"])
+def test_export_round_trip(tmp_path, fmt):
+    if fmt != "ndjson":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / f"export.{fmt}"
+    with open(path, "wb") as f:
+        for chunk in export_chunks(iter(ROWS), fmt, batch_size=2):
+            f.write(chunk)
+
+    assert list(read_rows(str(path), fmt, batch_size=2)) == ROWS
+
+def test_columnar_export_streams_per_batch():
+    pytest.importorskip("pyarrow")
+    chunks = list(export_chunks(iter(ROWS), "arrow", batch_size=2))
+    # Schema and each of the three batches arrive as separate chunks.
+    assert len(chunks) >= 3
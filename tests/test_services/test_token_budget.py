@@ -0,0 +1,28 @@
+import pytest
+from app.services import token_budget
+from app.services.token_budget import TokenBudgeter, PromptTooLong
+
+@pytest.fixture(autouse=True)
+def estimated_counts(monkeypatch):
+    # Use the character estimate whether or not tiktoken is installed.
+    monkeypatch.setattr(token_budget, "_encoding", lambda model: None)
+
+def test_prompt_within_budget_is_unchanged():
+    budgeter = TokenBudgeter({"small": 100})
+    assert budgeter.fit("x" * 200, "small", max_tokens=20) == "x" * 200
+
+def test_rejects_prompt_over_budget():
+    budgeter = TokenBudgeter({"small": 100})
+    with pytest.raises(PromptTooLong):
+        budgeter.fit("x" * 400, "small", max_tokens=20)
+
+def test_truncates_prompt_over_budget():
+    budgeter = TokenBudgeter({"small": 100}, overflow="truncate")
+    prompt = budgeter.fit("x" * 400, "small", max_tokens=20)
+    assert budgeter.count(prompt, "small") <= 100 - 20 - token_budget.MESSAGE_OVERHEAD_TOKENS
+    assert budgeter.truncated == 1
+
+def test_unknown_model_uses_default_context():
+    budgeter = TokenBudgeter({}, default_context=50)
+    with pytest.raises(PromptTooLong):
+        budgeter.fit("x" * 400, "other")
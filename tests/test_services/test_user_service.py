@@ -3,6 +3,7 @@ from unittest.mock import MagicMock
 from app.services.user_service import UserService
 from app.models import User
 from passlib.hash import bcrypt
+from app.services.lru_cache import LRUCache
 
 def test_register_user_success():
     repo_mock = MagicMock()
@@ -39,3 +40,21 @@ def test_verify_credentials_fail():
     
     user = service.verify_credentials("nope", "pass")
     assert user is None
+
+def test_get_profile_is_cached():
+    repo_mock = MagicMock()
+    repo_mock.find_by_id.return_value = User(id=3, username="cached")
+    service = UserService(repo_mock, cache=LRUCache(ttl=60))
+
+    assert service.get_profile(3) == {"id": 3, "username": "cached"}
+    assert service.get_profile(3) == {"id": 3, "username": "cached"}
+    repo_mock.find_by_id.assert_called_once_with(3)
+
+def test_get_profile_not_found_is_not_cached():
+    repo_mock = MagicMock()
+    repo_mock.find_by_id.return_value = None
+    service = UserService(repo_mock, cache=LRUCache(ttl=60))
+
+    assert service.get_profile(9) is None
+    assert service.get_profile(9) is None
+    assert repo_mock.find_by_id.call_count == 2
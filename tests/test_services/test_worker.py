@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import MagicMock
+from app.services.ai_service import Generation
+from app.worker import process_next_job
+
+def test_process_next_job_success():
+    job = MagicMock(id=1, user_id=7, prompt="Hi", use_cache=True, attempts=1, params={"max_tokens": 5})
+    job_repo = MagicMock()
+    job_repo.claim_next.return_value = job
+    gen_text_repo = MagicMock()
+    gen_text_repo.create_text.return_value = MagicMock(id=42)
+    ai_service = MagicMock()
+    ai_service.generate.return_value = Generation("Hello", "gpt-4o-mini", "Hi")
+
+    assert process_next_job(job_repo, gen_text_repo, ai_service) is True
+    ai_service.generate.assert_called_once_with("Hi", use_cache=True, params={"max_tokens": 5})
+    gen_text_repo.create_text.assert_called_once_with(
+        7, "Hi", "Hello", model="gpt-4o-mini", params={"max_tokens": 5}
+    )
+    job_repo.mark_succeeded.assert_called_once_with(job, 42)
+
+def test_process_next_job_retries_provider_errors():
+    job = MagicMock(id=1, attempts=1)
+    job_repo = MagicMock()
+    job_repo.claim_next.return_value = job
+    ai_service = MagicMock()
+    ai_service.generate.side_effect = RuntimeError("upstream down")
+
+    process_next_job(job_repo, MagicMock(), ai_service)
+    args, kwargs = job_repo.mark_failed.call_args
+    assert args == (job, "upstream down")
+    assert kwargs["retry_delay"] > 0
+
+def test_process_next_job_does_not_retry_invalid_prompts():
+    job = MagicMock(id=1, attempts=1)
+    job_repo = MagicMock()
+    job_repo.claim_next.return_value = job
+    ai_service = MagicMock()
+    ai_service.generate.side_effect = ValueError("Prompt cannot be empty")
+
+    process_next_job(job_repo, MagicMock(), ai_service)
+    job_repo.mark_failed.assert_called_once_with(job, "Prompt cannot be empty")
+
+def test_process_next_job_idle():
+    job_repo = MagicMock()
+    job_repo.claim_next.return_value = None
+    assert process_next_job(job_repo, MagicMock(), MagicMock()) is False
+
+def test_main_reuses_the_routes_ai_service(app, monkeypatch):
+    from app import main as app_main, worker
+    from app.routes import generated_text_routes
+    started = []
+    class FakeThread:
+        def __init__(self, target, args, name):
+            started.append(args)
+        def start(self):
+            pass
+        def join(self):
+            pass
+    monkeypatch.setattr(app_main, "create_app", lambda: app)
+    monkeypatch.setattr(worker.threading, "Thread", FakeThread)
+    monkeypatch.setattr(worker.signal, "signal", MagicMock())
+    monkeypatch.setattr("sys.argv", ["worker", "--workers", "2"])
+
+    worker.main()
+
+    assert [args[2] for args in started] == [generated_text_routes.ai_service] * 2